@@ -0,0 +1,154 @@
+"""
+Minimal benchmark harness: wall time, peak traced memory and scaling curves.
+
+A Benchmark pairs a setup function (untimed, builds the inputs for one
+parameter set) with the function under test. Every parameter set is run
+`repeat` times after one warm-up call; a separate run under tracemalloc
+records the peak Python/NumPy memory allocated by the call. Scaling is the
+slope of log(time) against log(size) between consecutive sizes, so 1.0 means
+linear and 2.0 quadratic.
+"""
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+class Benchmark:
+    """
+    One benchmarked hot path.
+
+    Parameters:
+        name (str): Benchmark name.
+        setup (callable): setup(**params) -> state passed to `run`.
+        run (callable): run(state) -> anything; the timed call.
+        params (list of dict): Parameter sets, e.g. universe sizes and history lengths.
+        size (str): Parameter used as the x-axis of the scaling curve.
+        quick (list of dict): Smaller parameter sets used with --quick.
+        slow (bool): Skipped unless slow benchmarks are requested.
+        teardown (callable): teardown(state), called after each parameter set.
+    """
+
+    def __init__(self, name, setup, run, params, size, quick=None, slow=False, teardown=None):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.params = params
+        self.size = size
+        self.quick = quick or params[:1]
+        self.slow = slow
+        self.teardown = teardown
+
+
+def measure(run, state, repeat=3, warmup=1, memory=True):
+    """
+    Times `run(state)` and optionally records its peak traced memory.
+
+    Returns:
+        dict: 'min_s', 'median_s', 'max_s' and 'peak_mib' (None without memory).
+    """
+    for _ in range(warmup):
+        run(state)
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run(state)
+        timings.append(time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run(state)
+            peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+
+    return {'min_s': min(timings), 'median_s': statistics.median(timings), 'max_s': max(timings), 'peak_mib': peak}
+
+
+def run_benchmarks(benchmarks, quick=False, repeat=3, memory=True, log=print):
+    """
+    Runs every parameter set of every benchmark.
+
+    Returns:
+        DataFrame: One row per (benchmark, parameter set) with the timings and memory.
+    """
+    rows = []
+    for benchmark in benchmarks:
+        for params in (benchmark.quick if quick else benchmark.params):
+            state = benchmark.setup(**params)
+            try:
+                result = measure(benchmark.run, state, repeat=repeat, memory=memory)
+            finally:
+                if benchmark.teardown is not None:
+                    benchmark.teardown(state)
+            label = ', '.join(f'{k}={v}' for k, v in params.items())
+            peak = '-' if result['peak_mib'] is None else f"{result['peak_mib']:.1f} MiB"
+            log(f"{benchmark.name:<24} {label:<40} {result['median_s'] * 1e3:>10.2f} ms  {peak:>12}")
+            fixed = ', '.join(f'{k}={v}' for k, v in params.items() if k != benchmark.size)
+            rows.append({'benchmark': benchmark.name, 'size': params[benchmark.size], 'fixed': fixed,
+                         'params': label, **result})
+    return pd.DataFrame(rows)
+
+
+def scaling(results):
+    """
+    Log-log slope of the median time between consecutive sizes of each benchmark.
+
+    Returns:
+        DataFrame: benchmark, from_size, to_size and exponent.
+    """
+    rows = []
+    # Only compare runs that differ in the size parameter alone
+    for (name, _), same in results.groupby(['benchmark', 'fixed'], sort=False):
+        same = same.sort_values('size')
+        sizes, times = same['size'].to_numpy(dtype=float), same['median_s'].to_numpy()
+        for i in range(1, len(same)):
+            if sizes[i] == sizes[i - 1]:
+                continue
+            exponent = np.log(times[i] / times[i - 1]) / np.log(sizes[i] / sizes[i - 1])
+            rows.append({'benchmark': name, 'from_size': sizes[i - 1], 'to_size': sizes[i], 'exponent': exponent})
+    return pd.DataFrame(rows, columns=['benchmark', 'from_size', 'to_size', 'exponent'])
+
+
+def save_results(results, path):
+    """
+    Writes the results with the environment they were measured in, for later comparison.
+    """
+    payload = {
+        'created': pd.Timestamp.now().isoformat(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'results': results.to_dict(orient='records'),
+    }
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2, default=float)
+
+
+def compare(results, baseline_path, threshold=1.2):
+    """
+    Compares median times with a saved baseline.
+
+    Returns:
+        DataFrame: benchmark, params, baseline and current medians, ratio and
+            whether the ratio exceeds `threshold`.
+    """
+    with open(baseline_path) as f:
+        baseline = pd.DataFrame(json.load(f)['results'])
+
+    merged = results.merge(baseline[['benchmark', 'params', 'median_s']], on=['benchmark', 'params'],
+                           suffixes=('', '_baseline'))
+    merged['ratio'] = merged['median_s'] / merged['median_s_baseline']
+    merged['regression'] = merged['ratio'] > threshold
+    return merged[['benchmark', 'params', 'median_s_baseline', 'median_s', 'ratio', 'regression']]
@@ -0,0 +1,220 @@
+"""
+Benchmarks of the loading, forecasting, optimization and simulation hot paths.
+
+Runs fully offline on synthetic GBM prices (benchmarks.synthetic); plotting
+is switched off so only the computation is timed.
+
+Usage (from the repository root):
+    python -m benchmarks.hotpaths                 # all fast benchmarks
+    python -m benchmarks.hotpaths --quick         # smallest size of each
+    python -m benchmarks.hotpaths --slow          # include model fitting (TensorFlow)
+    python -m benchmarks.hotpaths --only portfolio_calculations montecarlo_simulation
+    python -m benchmarks.hotpaths --output base.json
+    python -m benchmarks.hotpaths --compare base.json --threshold 1.2
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from benchmarks.harness import Benchmark, compare, run_benchmarks, save_results, scaling
+from benchmarks.synthetic import fake_source, gbm_prices, return_frame, tickers
+
+YEAR = 252
+
+
+def _setup_load(n_assets, warm):
+    cache_dir = tempfile.mkdtemp(prefix='bench-prices-')
+    state = {'cache_dir': cache_dir, 'tickers': tickers(n_assets), 'source': fake_source(), 'warm': warm}
+    if warm:
+        _run_load(dict(state, warm=False))
+    return state
+
+
+def _run_load(state):
+    from scripts.data_loader import load_universe
+
+    if not state['warm']:
+        # Cold start: every run fetches the full history from the source
+        shutil.rmtree(state['cache_dir'], ignore_errors=True)
+    return load_universe(state['tickers'], '2015-01-01', '2025-01-01', fields=['Close'],
+                         cache_dir=state['cache_dir'], source=state['source'])
+
+
+def _teardown_load(state):
+    shutil.rmtree(state['cache_dir'], ignore_errors=True)
+
+
+def _setup_lstm_data(n_days, time_step):
+    prices = gbm_prices(1, n_days).to_numpy()
+    scaled = (prices - prices.min()) / (prices.max() - prices.min())
+    return {'data': scaled, 'time_step': time_step}
+
+
+def _run_lstm_data(state):
+    from scripts.features import prepare_lstm_data
+
+    return prepare_lstm_data(state['data'], state['time_step'])
+
+
+def _setup_forecasting(n_days, forecast_days):
+    return {'series': gbm_prices(1, n_days).iloc[:, 0], 'forecast_days': forecast_days}
+
+
+def _run_forecasting(state):
+    from scripts.features import run_forecasting
+
+    return run_forecasting(state['series'], 'SYN', forecast_days=state['forecast_days'])
+
+
+def _setup_sarima(n_days, mode):
+    from scripts.features import fit_arima, split_data
+
+    train, _ = split_data(gbm_prices(1, n_days).iloc[:, 0])
+    arima_model = fit_arima(train)
+    return {'train': train, 'order': arima_model.order, 'arima_params': arima_model.arima_res_.params, 'mode': mode}
+
+
+def _run_sarima(state):
+    from scripts.features import fit_sarima, fit_sarima_fast
+
+    if state['mode'] == 'fast':
+        return fit_sarima_fast(state['train'], state['order'], arima_params=state['arima_params'])
+    return fit_sarima(state['train'], state['order'], (1, 1, 1, 12))
+
+
+def _setup_returns(n_assets, n_days):
+    return {'returns': return_frame(n_assets, n_days)}
+
+
+def _run_portfolio_calculations(state):
+    from scripts.covariance import clear_covariance_cache
+    from scripts.features import portfolio_calculations
+
+    # Time the covariance estimate too, not a cache hit
+    clear_covariance_cache()
+    return portfolio_calculations(state['returns'])
+
+
+def _setup_montecarlo(n_assets, n_days):
+    returns = return_frame(n_assets, n_days)
+    return {'df': returns, 'mean': returns.mean(), 'cov': returns.cov(), 'weights': np.full(n_assets, 1 / n_assets)}
+
+
+def _run_montecarlo(state):
+    from scripts.plots import montecarlo_simulation
+
+    return montecarlo_simulation(state['df'], state['mean'], state['cov'], state['weights'], seed=0)
+
+
+def _setup_simulation(num_simulations, num_days):
+    state = _setup_montecarlo(3, 2 * YEAR)
+    state.update(num_simulations=num_simulations, num_days=num_days)
+    return state
+
+
+def _run_simulation(state):
+    from scripts.simulation import simulate_portfolio
+
+    return simulate_portfolio(state['mean'], state['cov'], state['weights'], state['num_simulations'],
+                              state['num_days'], seed=0)
+
+
+def _run_frontier(state):
+    from scripts.frontier import efficient_frontier
+
+    returns = state['returns']
+    return efficient_frontier(returns.mean(), returns.cov(), n_points=25)
+
+
+def _setup_prices(n_assets, n_days):
+    return {'prices': gbm_prices(n_assets, n_days)}
+
+
+def _run_rolling(state):
+    from scripts.rolling import rolling_features
+
+    return rolling_features(state['prices'], windows=(30, 90))
+
+
+def _run_rebalance(state):
+    from scripts.rebalance import rebalance_backtest
+
+    return rebalance_backtest(state['returns'], lookback=YEAR, rebalance_every=21)
+
+
+BENCHMARKS = [
+    Benchmark('load_universe_cold', lambda n_assets: _setup_load(n_assets, warm=False), _run_load,
+              [{'n_assets': n} for n in (5, 25, 100)], size='n_assets', teardown=_teardown_load),
+    Benchmark('load_universe_warm', lambda n_assets: _setup_load(n_assets, warm=True), _run_load,
+              [{'n_assets': n} for n in (5, 25, 100)], size='n_assets', teardown=_teardown_load),
+    Benchmark('prepare_lstm_data', _setup_lstm_data, _run_lstm_data,
+              [{'n_days': n, 'time_step': 60} for n in (1_000, 5_000, 25_000)], size='n_days'),
+    Benchmark('portfolio_calculations', _setup_returns, _run_portfolio_calculations,
+              [{'n_assets': n, 'n_days': 10 * YEAR} for n in (3, 10, 50, 200)]
+              + [{'n_assets': 10, 'n_days': n * YEAR} for n in (2, 20)], size='n_assets'),
+    Benchmark('montecarlo_simulation', _setup_montecarlo, _run_montecarlo,
+              [{'n_assets': 3, 'n_days': n * YEAR} for n in (5, 10, 20)], size='n_days'),
+    Benchmark('simulate_portfolio', _setup_simulation, _run_simulation,
+              [{'num_simulations': n, 'num_days': YEAR} for n in (10_000, 50_000, 200_000)], size='num_simulations'),
+    Benchmark('efficient_frontier', _setup_returns, _run_frontier,
+              [{'n_assets': n, 'n_days': 5 * YEAR} for n in (5, 20, 50)], size='n_assets'),
+    Benchmark('rolling_features', _setup_prices, _run_rolling,
+              [{'n_assets': n, 'n_days': 10 * YEAR} for n in (10, 100, 500)], size='n_assets'),
+    Benchmark('rebalance_backtest', _setup_returns, _run_rebalance,
+              [{'n_assets': n, 'n_days': 10 * YEAR} for n in (5, 20, 50)], size='n_assets'),
+    Benchmark('fit_sarima', _setup_sarima, _run_sarima,
+              [{'n_days': n, 'mode': mode} for mode in ('fixed', 'fast') for n in (1_000, 2_500)], size='n_days',
+              slow=True),
+    Benchmark('run_forecasting', _setup_forecasting, _run_forecasting,
+              [{'n_days': n, 'forecast_days': 30} for n in (500, 1_000)], size='n_days', slow=True),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline benchmarks of the scripts package hot paths.')
+    parser.add_argument('--quick', action='store_true', help='only the smallest size of each benchmark')
+    parser.add_argument('--slow', action='store_true', help='include benchmarks that fit forecasting models')
+    parser.add_argument('--only', nargs='+', metavar='NAME', help='benchmarks to run')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per parameter set')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc run')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare with a JSON file written by --output')
+    parser.add_argument('--threshold', type=float, default=1.2, help='slowdown ratio flagged as a regression')
+    args = parser.parse_args(argv)
+
+    from scripts.rendering import configure_plotting
+
+    configure_plotting(mode='off')
+
+    selected = [b for b in BENCHMARKS if (args.only and b.name in args.only) or (not args.only and (args.slow or not b.slow))]
+    if not selected:
+        parser.error(f"no benchmark selected; available: {', '.join(b.name for b in BENCHMARKS)}")
+
+    print(f"{'benchmark':<24} {'parameters':<40} {'median':>13}  {'peak memory':>12}")
+    results = run_benchmarks(selected, quick=args.quick, repeat=args.repeat, memory=not args.no_memory)
+
+    curves = scaling(results)
+    if len(curves):
+        print("\nScaling (log-log slope of median time, 1 = linear):")
+        print(curves.to_string(index=False, float_format=lambda x: f'{x:.2f}'))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        save_results(results, args.output)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        comparison = compare(results, args.compare, args.threshold)
+        print(f"\nCompared with {args.compare}:")
+        print(comparison.to_string(index=False, float_format=lambda x: f'{x:.4f}'))
+        if comparison['regression'].any():
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
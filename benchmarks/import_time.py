@@ -0,0 +1,97 @@
+"""
+Import-time benchmark for the scripts package.
+
+Every module is imported in a fresh interpreter, several times, and the
+median wall time is reported together with the heavy backends the import
+pulled in. Modules listed in LIGHT_MODULES must not load any backend from
+HEAVY_BACKENDS at import time; the script exits with status 1 when one does
+or when an import exceeds --budget seconds, so it can guard against
+regressions in CI.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5] [--budget 1.0] [modules ...]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_BACKENDS = ('tensorflow', 'keras', 'pmdarima', 'statsmodels', 'sklearn', 'matplotlib', 'seaborn',
+                  'scipy.optimize', 'scipy.stats', 'yfinance')
+
+# Modules whose import must stay free of every heavy backend
+LIGHT_MODULES = (
+    'scripts.returns',
+    'scripts.portfolio',
+    'scripts.covariance',
+    'scripts.frontier',
+    'scripts.simulation',
+    'scripts.rebalance',
+    'scripts.rolling',
+    'scripts.forecast_portfolio',
+    'scripts.price_store',
+    'scripts.data_loader',
+    'scripts.rendering',
+    'scripts.plots',
+    'scripts.features',
+    'scripts.global_lstm',
+    'scripts.walk_forward',
+    'scripts.order_search',
+    'scripts.model_cache',
+)
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in {heavy!r} if name in sys.modules)
+print(json.dumps({{'seconds': elapsed, 'heavy': heavy}}))
+"""
+
+
+def measure_import(module, repeat=5):
+    """
+    Imports `module` in `repeat` fresh interpreters.
+
+    Returns:
+        dict: Median and minimum seconds, and the heavy backends that were loaded.
+    """
+    timings, heavy = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_BACKENDS)],
+                                cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        timings.append(probe['seconds'])
+        heavy = probe['heavy']
+    return {'median': statistics.median(timings), 'min': min(timings), 'heavy': heavy}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=LIGHT_MODULES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=1.0, help='maximum median import time in seconds')
+    args = parser.parse_args(argv)
+
+    failures = []
+    print(f"{'module':<28}{'median s':>10}{'min s':>10}  heavy backends loaded")
+    for module in args.modules:
+        result = measure_import(module, args.repeat)
+        print(f"{module:<28}{result['median']:>10.3f}{result['min']:>10.3f}  {', '.join(result['heavy']) or '-'}")
+        if module in LIGHT_MODULES and result['heavy']:
+            failures.append(f"{module} imports {', '.join(result['heavy'])} eagerly")
+        if result['median'] > args.budget:
+            failures.append(f"{module} takes {result['median']:.2f}s to import (budget {args.budget:.2f}s)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Offline synthetic market data for benchmarks.
+
+Prices follow a correlated geometric Brownian motion on a business-day
+calendar, and fake_source wraps them in the price-source signature used by
+scripts.price_store, so loading code can run without yfinance or network
+access. Everything is deterministic given the seed.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from scripts.portfolio import RETURN_SUFFIX
+from scripts.price_store import normalize_bars
+
+START_DATE = '2015-01-02'
+
+
+def tickers(n_assets):
+    return [f'SYN{i:04d}' for i in range(n_assets)]
+
+
+def gbm_prices(n_assets, n_days, seed=0, start_date=START_DATE, mu=0.0003, sigma=0.015, correlation=0.3):
+    """
+    Simulates close prices for `n_assets` correlated assets.
+
+    Parameters:
+        n_assets (int): Number of assets.
+        n_days (int): Number of business days.
+        seed (int): Random seed.
+        start_date (str): First date.
+        mu (float): Daily drift.
+        sigma (float): Daily volatility, scaled by a per-asset factor in [0.5, 2].
+        correlation (float): Pairwise correlation of the daily shocks.
+
+    Returns:
+        DataFrame: Date-indexed prices with one column per ticker.
+    """
+    rng = np.random.default_rng(seed)
+    scale = sigma * rng.uniform(0.5, 2.0, n_assets)
+
+    # One common factor gives every pair the same correlation
+    common = rng.standard_normal((n_days, 1))
+    shocks = np.sqrt(correlation) * common + np.sqrt(1 - correlation) * rng.standard_normal((n_days, n_assets))
+    log_returns = (mu - 0.5 * scale ** 2) + scale * shocks
+
+    prices = 100 * np.exp(np.cumsum(log_returns, axis=0))
+    index = pd.bdate_range(start_date, periods=n_days, name='Date')
+    return pd.DataFrame(prices, index=index, columns=tickers(n_assets))
+
+
+def ohlcv_bars(close, seed=0):
+    """
+    Builds Open/High/Low/Close/Adj Close/Volume bars around a close series.
+    """
+    rng = np.random.default_rng(seed)
+    close = np.asarray(close, dtype=float)
+    spread = np.abs(rng.normal(0, 0.005, (len(close), 2)))
+    open_ = close * (1 + rng.normal(0, 0.003, len(close)))
+    bars = pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread[:, 0]),
+        'Low': np.minimum(open_, close) * (1 - spread[:, 1]),
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(1_000_000, 50_000_000, len(close)).astype(float),
+    })
+    return bars
+
+
+def stock_frames(n_assets, n_days, seed=0):
+    """
+    Synthetic stand-ins for the frames loadData returns: one OHLCV frame per ticker with a Date index.
+
+    Returns:
+        dict: Ticker -> DataFrame.
+    """
+    prices = gbm_prices(n_assets, n_days, seed)
+    frames = {}
+    for i, ticker in enumerate(prices.columns):
+        bars = ohlcv_bars(prices[ticker], seed + i)
+        bars.index = prices.index
+        frames[ticker] = bars
+    return frames
+
+
+def return_frame(n_assets, n_days, seed=0):
+    """
+    Daily returns laid out like calculate_returns output ('<TICKER>_daily_return' columns).
+    """
+    returns = gbm_prices(n_assets, n_days + 1, seed).pct_change().iloc[1:]
+    returns.columns = [f'{ticker}{RETURN_SUFFIX}' for ticker in returns.columns]
+    return returns
+
+
+def fake_source(seed=0, history_start='2000-01-03', latency=0.0):
+    """
+    Builds an offline price source with the signature of scripts.price_store.yfinance_source.
+
+    Each ticker gets its own deterministic GBM path over business days from
+    `history_start`, so repeated and overlapping requests return consistent
+    bars. The source counts its calls in `source.calls`.
+
+    Parameters:
+        seed (int): Base seed, combined with a hash of the ticker.
+        history_start (str): First date of every synthetic history.
+        latency (float): Seconds to sleep per call, to mimic a remote API.
+
+    Returns:
+        callable: source(ticker, start_date, end_date) -> bars DataFrame.
+    """
+    import time
+
+    def source(ticker, start_date, end_date):
+        source.calls += 1
+        if latency:
+            time.sleep(latency)
+
+        end = pd.Timestamp(end_date)
+        index = pd.bdate_range(history_start, end - pd.Timedelta(days=1), name='Date')
+        ticker_seed = seed + zlib.crc32(ticker.encode())
+        rng = np.random.default_rng(ticker_seed)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+
+        bars = ohlcv_bars(close, ticker_seed)
+        bars.index = index
+        bars = bars.loc[bars.index >= pd.Timestamp(start_date)]
+        return normalize_bars(bars)
+
+    source.calls = 0
+    return source
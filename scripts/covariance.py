@@ -0,0 +1,212 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+COVARIANCE_METHODS = ('sample', 'ledoit_wolf', 'ewma')
+
+
+def _complete_rows(returns):
+    # Ledoit-Wolf and EWMA need rows where every asset has a return
+    values = np.asarray(returns, dtype=float)
+    complete = ~np.isnan(values).any(axis=1)
+    if not complete.all():
+        print(f"Covariance: dropped {len(values) - complete.sum()} of {len(values)} rows with a missing return")
+    return values[complete]
+
+
+def sample_covariance(returns):
+    """
+    Unbiased sample covariance, each pair of assets over the rows where both have a return.
+
+    Without missing values this is np.cov; with them it matches DataFrame.cov(),
+    so one asset's gaps do not discard the other assets' history.
+    """
+    values = np.asarray(returns, dtype=float)
+    if not np.isnan(values).any():
+        return np.cov(values, rowvar=False)
+    return pd.DataFrame(values).cov().to_numpy()
+
+
+def ledoit_wolf_covariance(returns):
+    """
+    Ledoit-Wolf shrinkage of the sample covariance towards a scaled identity.
+
+    Shrinkage keeps the estimate well conditioned when the number of assets is
+    large relative to the history, which the optimizers rely on.
+    """
+    from sklearn.covariance import ledoit_wolf
+
+    covariance, _ = ledoit_wolf(_complete_rows(returns))
+    return covariance
+
+
+def ewma_covariance(returns, decay=0.94):
+    """
+    Exponentially weighted covariance (RiskMetrics style) with the given decay per bar.
+    """
+    values = _complete_rows(returns)
+    weights = decay ** np.arange(len(values) - 1, -1, -1)
+    weights /= weights.sum()
+
+    centered = values - weights @ values
+    return (centered * weights[:, None]).T @ centered
+
+
+class StreamingCovariance:
+    """
+    Running mean and covariance updated in O(N^2) per new bar (Welford / Chan).
+
+    Blocks of rows are merged with Chan's parallel update, and can also be
+    removed again, so the estimator can track a sliding window. With `decay`
+    set, it becomes an exponentially weighted estimator instead: every new bar
+    down-weights the history by `decay`, and removal is not supported.
+
+    Parameters:
+        n_assets (int): Number of assets.
+        decay (float): Optional EWMA decay per bar, e.g. 0.94.
+    """
+
+    def __init__(self, n_assets, decay=None):
+        self.decay = decay
+        self.count = 0
+        self._mean = np.zeros(n_assets)
+        self._m2 = np.zeros((n_assets, n_assets))
+
+    def update(self, rows):
+        """
+        Adds one row (N,) or a block of rows (k, N).
+        """
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+
+        if self.decay is not None:
+            alpha = 1 - self.decay
+            for row in rows:
+                if self.count == 0:
+                    self._mean = row.copy()
+                else:
+                    diff = row - self._mean
+                    self._mean += alpha * diff
+                    self._m2 = self.decay * (self._m2 + alpha * np.outer(diff, diff))
+                self.count += 1
+            return self
+
+        n_b = len(rows)
+        mean_b = rows.mean(axis=0)
+        centered = rows - mean_b
+        m2_b = centered.T @ centered
+
+        n = self.count + n_b
+        delta = mean_b - self._mean
+        self._mean = self._mean + delta * n_b / n
+        self._m2 = self._m2 + m2_b + np.outer(delta, delta) * self.count * n_b / n
+        self.count = n
+        return self
+
+    def remove(self, rows):
+        """
+        Removes a block of rows previously added (sample mode only).
+        """
+        if self.decay is not None:
+            raise ValueError("Rows cannot be removed from an exponentially weighted estimate")
+
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        n_b = len(rows)
+        n_a = self.count - n_b
+        if n_a <= 0:
+            return self.reset()
+
+        mean_b = rows.mean(axis=0)
+        centered = rows - mean_b
+        mean_a = (self.count * self._mean - n_b * mean_b) / n_a
+        delta = mean_b - mean_a
+
+        self._m2 = self._m2 - centered.T @ centered - np.outer(delta, delta) * n_a * n_b / self.count
+        self._mean = mean_a
+        self.count = n_a
+        return self
+
+    def reset(self):
+        self.count = 0
+        self._mean = np.zeros_like(self._mean)
+        self._m2 = np.zeros_like(self._m2)
+        return self
+
+    def mean(self):
+        return self._mean.copy()
+
+    def cov(self):
+        if self.decay is not None:
+            return self._m2.copy()
+        return self._m2 / (self.count - 1)
+
+
+_cache = OrderedDict()
+_CACHE_SIZE = 32
+
+
+def _returns_key(returns, method, kwargs):
+    digest = hashlib.sha256(method.encode())
+    if isinstance(returns, pd.DataFrame):
+        digest.update(pd.util.hash_pandas_object(returns, index=True).to_numpy().tobytes())
+        digest.update(repr(list(returns.columns)).encode())
+    else:
+        values = np.ascontiguousarray(returns, dtype=float)
+        digest.update(str(values.shape).encode())
+        digest.update(values.tobytes())
+    digest.update(repr(sorted(kwargs.items())).encode())
+    return digest.hexdigest()
+
+
+def get_covariance(returns, method='sample', **kwargs):
+    """
+    Returns the covariance matrix of `returns`, cached by content.
+
+    The optimizers, Monte Carlo simulation and heatmaps all ask for the same
+    matrix; repeated calls with unchanged returns are served from a small LRU
+    cache instead of being recomputed.
+
+    Parameters:
+        returns (DataFrame or array): Daily asset returns, one column per asset.
+        method (str): 'sample', 'ledoit_wolf' or 'ewma'.
+        **kwargs: Passed to the estimator (e.g. decay for 'ewma').
+
+    Returns:
+        DataFrame (labelled like the columns of `returns`) or array.
+    """
+    if method not in COVARIANCE_METHODS:
+        raise ValueError(f"method must be one of {COVARIANCE_METHODS}, got {method!r}")
+
+    key = _returns_key(returns, method, kwargs)
+    if key in _cache:
+        _cache.move_to_end(key)
+        covariance = _cache[key]
+    else:
+        estimator = {'sample': sample_covariance, 'ledoit_wolf': ledoit_wolf_covariance, 'ewma': ewma_covariance}
+        covariance = estimator[method](returns, **kwargs)
+        _cache[key] = covariance
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    if isinstance(returns, pd.DataFrame):
+        return pd.DataFrame(covariance.copy(), index=returns.columns, columns=returns.columns)
+    return covariance.copy()
+
+
+def clear_covariance_cache():
+    """
+    Empties the get_covariance cache, e.g. to time the estimators themselves.
+    """
+    _cache.clear()
+
+
+def correlation_from_covariance(covariance):
+    """
+    Converts a covariance matrix (DataFrame or array) into a correlation matrix.
+    """
+    std = np.sqrt(np.diag(np.asarray(covariance, dtype=float)))
+    correlation = np.asarray(covariance, dtype=float) / np.outer(std, std)
+    if isinstance(covariance, pd.DataFrame):
+        return pd.DataFrame(correlation, index=covariance.index, columns=covariance.columns)
+    return correlation
@@ -1,6 +1,4 @@
 import pandas as pd # type: ignore
-import matplotlib.pyplot as plt # type: ignore
-import seaborn as sns # type: ignore
 import numpy as np # type: ignore
 
 def preprocess_data(data,ticker):
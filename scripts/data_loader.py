@@ -1,29 +1,118 @@
 import pandas as pd # type: ignore
-import matplotlib.pyplot as plt # type: ignore
-import seaborn as sns # type: ignore
 import numpy as np # type: ignore
-import yfinance as yf # type: ignore
+import logging
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 
+from scripts.price_store import DEFAULT_CACHE_DIR, load_prices
 
-def loadData():
+logger = logging.getLogger(__name__)
+
+
+def loadData(cache_dir=DEFAULT_CACHE_DIR, source=None):
+    """
+    Loads TSLA, BND and SPY daily bars, reading the local price cache first.
+
+    Parameters:
+        cache_dir (str): Folder of the Parquet price cache. None always downloads.
+        source (callable): Price source (see scripts.price_store), defaults to yfinance.
+
+    Returns:
+        tuple: (tsla, bnd, spy) DataFrames indexed by Date.
+    """
     tickers = ["TSLA", "BND", "SPY"]
     start_date = "2015-01-01"
     end_date = "2025-01-31"
-    data_frames = {}
 
-    for ticker in tickers:
-        data = yf.download(ticker, start=start_date, end=end_date)
+    data_frames = load_frames(tickers, start_date, end_date, cache_dir=cache_dir, source=source)
+
+    return data_frames["TSLA"], data_frames["BND"], data_frames["SPY"]
 
-        # If 'Adj Close' is missing, assume it's the same as 'Close'
-        if 'Adj Close' not in data.columns:
-            data['Adj Close'] = data['Close']
 
-        # Ensure column order
-        data = data[['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']]
-        
-        data_frames[ticker] = data
+def _load_with_retry(ticker, start_date, end_date, cache_dir, source, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            return load_prices(ticker, start_date, end_date, cache_dir=cache_dir, source=source)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = backoff * 2 ** attempt
+            logger.warning("Error loading %s (%s), retrying in %.1fs...", ticker, e, delay)
+            time.sleep(delay)
 
-    return data_frames["TSLA"], data_frames["BND"], data_frames["SPY"]
+
+def load_frames(tickers, start_date, end_date, cache_dir=DEFAULT_CACHE_DIR, source=None,
+                max_workers=8, retries=3, backoff=1.0, errors='raise'):
+    """
+    Loads daily bars for many tickers concurrently in a bounded thread pool.
+
+    Parameters:
+        tickers (list of str): Ticker symbols.
+        start_date (str or Timestamp): First date (inclusive).
+        end_date (str or Timestamp): Last date (exclusive).
+        cache_dir (str): Folder of the Parquet price cache. None always downloads.
+        source (callable): Price source, defaults to yfinance.
+        max_workers (int): Maximum number of concurrent downloads.
+        retries (int): Retries per ticker after the first failed attempt.
+        backoff (float): Base delay in seconds, doubled after every failed attempt.
+        errors (str): 'raise' to fail on the first ticker that cannot be loaded,
+            'skip' to leave failed tickers out of the result with a RuntimeWarning.
+
+    Returns:
+        dict: Ticker -> DataFrame indexed by Date, in the order of `tickers`.
+    """
+    if errors not in ('raise', 'skip'):
+        raise ValueError(f"errors must be 'raise' or 'skip', got {errors!r}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            ticker: executor.submit(_load_with_retry, ticker, start_date, end_date,
+                                    cache_dir, source, retries, backoff)
+            for ticker in dict.fromkeys(tickers)
+        }
+
+        data_frames, failed = {}, {}
+        for ticker, future in futures.items():
+            try:
+                data_frames[ticker] = future.result()
+            except Exception as e:
+                failed[ticker] = e
+
+    if failed:
+        message = ", ".join(f"{ticker}: {e}" for ticker, e in failed.items())
+        if errors == 'raise':
+            raise RuntimeError(f"Failed to load {len(failed)} ticker(s): {message}")
+        warnings.warn(f"Skipping {len(failed)} ticker(s) that failed to load: {message}", RuntimeWarning, stacklevel=2)
+
+    return data_frames
+
+
+def load_universe(tickers, start_date, end_date, fields=None, **kwargs):
+    """
+    Loads a ticker universe into a single wide panel aligned on Date.
+
+    Parameters:
+        tickers (list of str): Ticker symbols.
+        start_date (str or Timestamp): First date (inclusive).
+        end_date (str or Timestamp): Last date (exclusive).
+        fields (list of str): Price columns to keep, e.g. ['Adj Close']. Defaults to all.
+        **kwargs: Passed to load_frames (cache_dir, source, max_workers, retries, ...).
+
+    Returns:
+        DataFrame: Indexed by the union of all trading dates, with (ticker, field)
+            MultiIndex columns, so panel['TSLA'] gives the bars of one ticker.
+            A RuntimeError is raised when no ticker could be loaded.
+    """
+    data_frames = load_frames(tickers, start_date, end_date, **kwargs)
+    if not data_frames:
+        raise RuntimeError(f"None of the {len(set(tickers))} ticker(s) could be loaded")
+    if fields is not None:
+        data_frames = {ticker: data[list(fields)] for ticker, data in data_frames.items()}
+
+    panel = pd.concat(data_frames, axis=1, names=['Ticker', 'Price']).sort_index()
+    panel.index.name = 'Date'
+    return panel
 
 def format_date(data):
     data = data.reset_index()
@@ -1,60 +1,442 @@
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from pmdarima import auto_arima
-import tensorflow as tf
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
-import matplotlib.pyplot as plt
+import copy
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
-import scipy.optimize as sco
-import scipy.stats as stats
+from scripts.covariance import get_covariance
+from scripts.frontier import max_sharpe_portfolio
+from scripts.instrumentation import context, stage
+from scripts.lazy_imports import lazy_module
+from scripts.portfolio import (RETURN_SUFFIX, conditional_value_at_risk, portfolio_returns, return_columns,
+                               value_at_risk)
+from scripts.rendering import plotting_enabled, render
+from scripts.returns import align_prices, annualize_returns, compute_returns
+
+# Heavy backends load on first use; statsmodels, pmdarima, sklearn and keras
+# are imported inside the functions that need them
+tf = lazy_module('tensorflow')
+plt = lazy_module('matplotlib.pyplot')
 
 def plot_data(data, title):
+    if not plotting_enabled():
+        return
+
     plt.figure(figsize=(12, 6))
     plt.plot(data)
     plt.title(title)
     plt.xlabel('Date')
     plt.ylabel('Price')
-    plt.show()
+    render(title)
 
 def split_data(data, train_size=0.8):
     split_index = int(len(data) * train_size)
     return data[:split_index], data[split_index:]
 
-def fit_arima(train):
+def _cached(cache, kind, data, fit, **params):
+    # Serve the model from the model cache when one is given, fitting it on a miss
+    if cache is None:
+        return fit()
+    return cache.get_or_fit(cache.key(kind, data, **params), fit)
+
+
+def _search_arima(train):
+    from pmdarima import auto_arima
+
+    # Keep every valid fit of the stepwise search only to record its size; the first is the best
+    fits = auto_arima(train, seasonal=False, stepwise=True, return_valid_fits=True)
+    model = fits[0]
+    model.search_size_ = len(fits)
+    return model
+
+
+def fit_iterations(model):
+    """
+    Optimizer iterations of the last fit: MLE iterations for statsmodels/pmdarima
+    models, gradient steps for Keras models, None when unknown.
+    """
+    results = getattr(model, 'arima_res_', model)
+    retvals = getattr(results, 'mle_retvals', None)
+    if isinstance(retvals, dict) and 'iterations' in retvals:
+        return int(retvals['iterations'])
+    optimizer = getattr(model, 'optimizer', None)
+    if optimizer is not None and hasattr(optimizer, 'iterations'):
+        return int(optimizer.iterations)
+    return None
+
+
+def fit_arima(train, cache=None):
     try:
-        model = auto_arima(train, seasonal=False, stepwise=True)
+        fit = lambda: _search_arima(train)
+        model = _cached(cache, 'ARIMA', train, fit, seasonal=False, stepwise=True)
         return model
     except Exception as e:
-        print(f"Error fitting ARIMA model: {e}")
-        return None
+        # Fail loudly: a None model would only crash later at .predict
+        raise RuntimeError(f"Error fitting ARIMA model: {e}") from e
+
+def fit_sarima(train, order, seasonal_order, cache=None):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    fit = lambda: SARIMAX(train, order=order, seasonal_order=seasonal_order).fit()
+    return _cached(cache, 'SARIMA', train, fit, order=tuple(order), seasonal_order=tuple(seasonal_order))
+
+
+# Seasonal candidates of the fast SARIMA search: weekly (5) and monthly (21)
+# trading-day cycles, without seasonal differencing. (1, 0, 1, 21) is left out
+# because it alone costs as much as the rest of the grid.
+SEASONAL_GRID = ((1, 0, 0, 5), (0, 0, 1, 5), (1, 0, 1, 5), (1, 0, 0, 21), (0, 0, 1, 21))
+
+
+def _warm_start(model, arima_params):
+    # Start from the ARIMA estimates; seasonal terms start at zero, i.e. at the non-seasonal model
+    if not isinstance(arima_params, pd.Series):
+        return model.start_params
+    start = pd.Series(0.0, index=model.param_names)
+    shared = start.index.intersection(arima_params.index)
+    start[shared] = arima_params[shared]
+    return start.to_numpy()
+
+
+def _fit_seasonal_candidate(train, order, seasonal_order, arima_params, maxiter):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    # Differencing the data up front and concentrating the scale out of the
+    # likelihood shrink the state vector and the parameter search
+    model = SARIMAX(train, order=order, seasonal_order=seasonal_order, simple_differencing=True,
+                    concentrate_scale=True)
+    fit = model.fit(start_params=_warm_start(model, arima_params), maxiter=maxiter, disp=False)
+    # Only small results travel back from worker processes
+    return {'seasonal_order': seasonal_order, 'aic': fit.aic, 'params': fit.params, 'scale': fit.scale,
+            'mle_retvals': fit.mle_retvals}
+
+
+def fit_sarima_fast(train, order, seasonal_grid=SEASONAL_GRID, arima_params=None, maxiter=50, n_jobs=1,
+                    cache=None):
+    """
+    Fits SARIMA by searching a small seasonal grid with a fast likelihood.
+
+    Every candidate is estimated on the pre-differenced series with the scale
+    concentrated out, warm-started from the ARIMA parameters and capped at
+    `maxiter` optimizer iterations. The best candidate by AIC is then run once
+    through the Kalman filter of a regular SARIMAX model, so the returned
+    results forecast prices (not differences) and support update_sarima.
+
+    Parameters:
+        train (Series): Training prices.
+        order (tuple): Non-seasonal order, normally the one auto_arima selected.
+        seasonal_grid (tuple): Seasonal orders (P, D, Q, s) to try.
+        arima_params (Series): Fitted ARIMA parameters used as the starting point.
+        maxiter (int): Optimizer iteration cap per candidate.
+        n_jobs (int): Candidates fitted in parallel in spawned processes; 1 fits them here.
+            Starting the workers costs seconds, so this pays off for long histories
+            or large grids on idle cores, not inside an already parallel batch run.
+        cache (ModelCache): Optional fitted-model cache.
+
+    Returns:
+        SARIMAXResults: Filtered results with `mle_retvals` of the selected fit
+            (iterations summed over the grid).
+    """
+    def fit():
+        from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+        args = [(train, order, seasonal, arima_params, maxiter) for seasonal in seasonal_grid]
+        if n_jobs == 1 or len(args) == 1:
+            candidates = [_fit_seasonal_candidate(*a) for a in args]
+        else:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=min(n_jobs or len(args), len(args)), mp_context=context) as executor:
+                candidates = list(executor.map(_fit_seasonal_candidate, *zip(*args)))
+        best = min(candidates, key=lambda candidate: candidate['aic'])
+
+        model = SARIMAX(train, order=order, seasonal_order=best['seasonal_order'])
+        params = best['params'].reindex(model.param_names)
+        params['sigma2'] = best['scale']
+        results = model.filter(params.to_numpy())
+        results.mle_retvals = dict(best['mle_retvals'],
+                                   iterations=sum(c['mle_retvals']['iterations'] for c in candidates))
+        return results
+
+    return _cached(cache, 'SARIMA', train, fit, order=tuple(order), seasonal_grid=tuple(seasonal_grid),
+                   maxiter=maxiter, mode='fast')
+
+
+def _refilter_positional(results, new_obs):
+    # Re-filter the full sample on a positional index; this is still a single
+    # pass and, unlike a date index without a frequency, it can be forecast from
+    endog = np.concatenate((np.ravel(results.model.data.orig_endog), np.ravel(new_obs)))
+    return results.model.clone(pd.Series(endog)).filter(results.params)
+
+
+def _extend_results(results, new_obs):
+    # Run the Kalman filter over the new observations with the fitted parameters
+    index = getattr(results.model.data.orig_endog, 'index', None)
+    if isinstance(index, pd.DatetimeIndex) and index.freq is None:
+        # Trading calendars skip holidays, so such indexes have no frequency
+        return _refilter_positional(results, new_obs)
+    try:
+        return results.append(new_obs, refit=False)
+    except ValueError:
+        return _refilter_positional(results, new_obs)
+
+
+def update_arima(arima_model, new_obs):
+    """
+    Extends a fitted auto_arima model with new observations without refitting.
+
+    The selected order and fitted parameters are kept; only the state-space
+    filter is advanced, so forecasts start from the latest observation.
+    Returns a new model; `arima_model` is left unchanged.
+    """
+    updated = copy.copy(arima_model)
+    # pmdarima's __getstate__ hands copy the live __dict__, so give the copy its own
+    updated.__dict__ = dict(arima_model.__dict__)
+    updated.arima_res_ = _extend_results(arima_model.arima_res_, new_obs)
+    return updated
+
+
+def update_sarima(sarima_fit, new_obs):
+    """
+    Extends fitted SARIMAX results with new observations without refitting.
+    """
+    return _extend_results(sarima_fit, new_obs)
+
+
+def make_windows(data, time_step, horizon=1, target_col=0):
+    """
+    Builds LSTM input windows and multi-step targets as zero-copy strided views.
+
+    Parameters:
+        data (array): Series of shape (n,) or (n, n_features).
+        time_step (int): Look-back window length.
+        horizon (int): Number of future steps in each target.
+        target_col (int): Feature column the targets are taken from.
+
+    Returns:
+        tuple: X of shape (samples, time_step, n_features) and Y of shape
+            (samples, horizon). Both are read-only views into `data`.
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data.reshape(-1, 1)
+
+    samples = max(len(data) - time_step - horizon + 1, 0)
+    if samples == 0:
+        return (np.empty((0, time_step, data.shape[1]), dtype=data.dtype),
+                np.empty((0, horizon), dtype=data.dtype))
+
+    # (n - time_step + 1, n_features, time_step) -> (samples, time_step, n_features)
+    X = sliding_window_view(data, time_step, axis=0)[:samples].transpose(0, 2, 1)
+    Y = sliding_window_view(data[time_step:, target_col], horizon)[:samples]
+    return X, Y
 
-def fit_sarima(train, order, seasonal_order):
-    sarima_model = SARIMAX(train, order=order, seasonal_order=seasonal_order)
-    return sarima_model.fit()
 
 def prepare_lstm_data(data, time_step=1):
-    X, Y = [], []
-    for i in range(len(data) - time_step):
-        X.append(data[i:(i + time_step), 0])
-        Y.append(data[i + time_step, 0])
-    return np.array(X), np.array(Y)
-
-
-def build_and_train_lstm(X_train, y_train, epochs=10, batch_size=32):
-    model = Sequential()
-    model.add(LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], 1)))
-    model.add(LSTM(50, return_sequences=False))
-    model.add(Dense(1))
-    model.compile(optimizer='adam', loss='mean_squared_error')
-    model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size)
-    return model
+    X, Y = make_windows(data, time_step)
+    return X[:, :, 0], Y[:, 0]
+
+
+def window_batches(series_list, time_step, batch_size=32, horizon=1, target_col=0, shuffle=False, seed=None,
+                   with_ids=False):
+    """
+    Streams (X, Y) training batches over many series without materialising all windows.
+
+    Only one batch is copied out of the strided views at a time, so long
+    histories across many tickers never build the full 3-D tensor.
+
+    Parameters:
+        series_list (list of array): Scaled series, each (n,) or (n, n_features).
+        time_step (int): Look-back window length.
+        batch_size (int): Windows per batch.
+        horizon (int): Number of future steps in each target.
+        target_col (int): Feature column the targets are taken from.
+        shuffle (bool): Shuffle windows across all series.
+        seed (int): Seed for the shuffle.
+        with_ids (bool): Also yield the position in `series_list` of every window.
+
+    Yields:
+        tuple: X of shape (batch, time_step, n_features), Y of shape (batch, horizon),
+            and with `with_ids` the series ids of shape (batch,).
+    """
+    views = [make_windows(series, time_step, horizon, target_col) for series in series_list]
+
+    # Global (series, window) positions, shuffled as integers rather than as data
+    index = np.concatenate([
+        np.column_stack((np.full(len(X), i), np.arange(len(X)))) for i, (X, _) in enumerate(views)
+    ]) if views else np.empty((0, 2), dtype=int)
+    if shuffle:
+        index = index[np.random.default_rng(seed).permutation(len(index))]
+
+    for start in range(0, len(index), batch_size):
+        batch = index[start:start + batch_size]
+        # One fancy-indexed copy per series present in the batch
+        rows = [(i, batch[batch[:, 0] == i, 1]) for i in np.unique(batch[:, 0])]
+        X = np.concatenate([views[i][0][j] for i, j in rows])
+        Y = np.concatenate([views[i][1][j] for i, j in rows])
+        if with_ids:
+            yield X, Y, np.concatenate([np.full(len(j), i) for i, j in rows])
+        else:
+            yield X, Y
+
+
+def window_dataset(series_list, time_step, batch_size=32, horizon=1, target_col=0, shuffle=False, seed=None):
+    """
+    Wraps window_batches in a tf.data.Dataset that can be passed to model.fit.
+    """
+    n_features = 1 if np.ndim(series_list[0]) == 1 else np.shape(series_list[0])[1]
+    signature = (
+        tf.TensorSpec(shape=(None, time_step, n_features), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, horizon), dtype=tf.float32),
+    )
+    generator = lambda: ((X.astype(np.float32), Y.astype(np.float32)) for X, Y in
+                         window_batches(series_list, time_step, batch_size, horizon, target_col, shuffle, seed))
+    return tf.data.Dataset.from_generator(generator, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+
+def build_and_train_lstm(X_train, y_train, epochs=10, batch_size=32, cache=None):
+    # Multi-column targets train a direct multi-step model with one output per step
+    horizon = 1 if np.ndim(y_train) == 1 else np.shape(y_train)[1]
+
+    def fit():
+        from tensorflow.keras.layers import LSTM, Dense
+        from tensorflow.keras.models import Sequential
+
+        model = Sequential()
+        model.add(LSTM(50, return_sequences=True, input_shape=(X_train.shape[1], 1)))
+        model.add(LSTM(50, return_sequences=False))
+        model.add(Dense(horizon))
+        model.compile(optimizer='adam', loss='mean_squared_error')
+        model.fit(X_train, y_train, epochs=epochs, batch_size=batch_size)
+        return model
+
+    return _cached(cache, 'LSTM', (X_train, y_train), fit, epochs=epochs, batch_size=batch_size)
+
+
+def _rollout(model, windows, asset_ids, horizon):
+    steps = tf.TensorArray(tf.float32, size=horizon)
+    for t in tf.range(horizon):
+        inputs = windows if asset_ids is None else [windows, asset_ids]
+        next_value = model(inputs, training=False)[:, :1]
+        steps = steps.write(t, next_value[:, 0])
+        # Slide the window: drop the oldest value, append the prediction
+        windows = tf.concat([windows[:, 1:, :], next_value[:, tf.newaxis, :]], axis=1)
+    return tf.transpose(steps.stack())
+
+
+_compiled_rollout = None
+
+
+def _compiled():
+    # Trace the rollout loop once TensorFlow is actually needed
+    global _compiled_rollout
+    if _compiled_rollout is None:
+        _compiled_rollout = tf.function(_rollout, reduce_retracing=True)
+    return _compiled_rollout
+
+
+def recursive_lstm_forecast(lstm_model, windows, horizon, asset_ids=None):
+    """
+    Forecasts `horizon` steps autoregressively, feeding each prediction back as input.
+
+    The whole rollout runs as one compiled TensorFlow loop over a batch of
+    windows, so many origins (or assets, for the global model) are forecast
+    together instead of through `horizon` Python-level predict calls.
+
+    Parameters:
+        lstm_model (Model): One-step LSTM.
+        windows (array): Scaled input windows of shape (batch, time_step, 1).
+        horizon (int): Number of steps to forecast.
+        asset_ids (array): Asset ids of shape (batch,) for the global LSTM.
+
+    Returns:
+        array: Scaled forecasts of shape (batch, horizon).
+    """
+    windows = tf.convert_to_tensor(np.asarray(windows, dtype=np.float32))
+    if asset_ids is not None:
+        asset_ids = tf.convert_to_tensor(np.asarray(asset_ids, dtype=np.int32))
+    return _compiled()(lstm_model, windows, asset_ids, tf.constant(horizon)).numpy()
+
+
+def direct_lstm_forecast(lstm_model, windows, horizon):
+    """
+    Forecasts `horizon` steps in one shot with a direct multi-output LSTM.
+
+    Returns:
+        array: Scaled forecasts of shape (batch, horizon).
+    """
+    outputs = lstm_model.output_shape[-1]
+    if outputs < horizon:
+        raise ValueError(f"Direct LSTM predicts {outputs} steps, cannot forecast {horizon}")
+    return lstm_model.predict(np.asarray(windows, dtype=np.float32), verbose=0)[:, :horizon]
+
+
+def fine_tune_lstm(lstm_model, scaler, history, new_obs, time_step=60, epochs=2, batch_size=32, replay=250):
+    """
+    Fine-tunes a trained LSTM on the windows ending in the new observations.
+
+    Instead of retraining from random initialisation, the existing weights are
+    updated for a few epochs on the newest windows plus the last `replay`
+    windows of history, which keeps the model from forgetting older patterns.
+    The model is trained in place (copying its weights would double its memory);
+    pass a clone to keep the original. A ValueError is raised when history and
+    new_obs are too short for a single window.
+
+    Parameters:
+        lstm_model (Model): Trained Keras model.
+        scaler (MinMaxScaler): Scaler the model was trained with.
+        history (Series): Observations the model has already seen.
+        new_obs (Series): Newly arrived observations.
+        time_step (int): LSTM look-back window.
+        epochs (int): Fine-tuning epochs.
+        batch_size (int): Fine-tuning batch size.
+        replay (int): Number of older windows mixed into the update.
+
+    Returns:
+        Model: The updated model.
+    """
+    # time_step + horizon - 1 points of history make the first window whose
+    # target reaches the new bars; `replay` more add that many older windows
+    horizon = lstm_model.output_shape[-1]
+    recent = np.concatenate((np.ravel(history)[-(time_step + horizon + replay - 1):], np.ravel(new_obs)))
+    scaled = scaler.transform(recent.reshape(-1, 1))
+
+    X_new, y_new = make_windows(scaled, time_step, horizon=horizon)
+    if len(X_new) == 0:
+        raise ValueError(f"{len(recent)} observations make no windows of {time_step} steps plus a "
+                         f"{horizon}-step target; pass a longer history")
+
+    if lstm_model.optimizer is None:
+        lstm_model.compile(optimizer='adam', loss='mean_squared_error')
+    lstm_model.fit(X_new, y_new, epochs=epochs, batch_size=batch_size, verbose=0)
+    return lstm_model
+
+
+def update_models(fitted, history, new_obs, time_step=60, lstm_epochs=2):
+    """
+    Warm-starts every model in `fitted` (as returned by forecast_models) with new bars.
+
+    ARIMA and SARIMA keep their orders and parameters and only extend their
+    state; the LSTM is fine-tuned for a few epochs from its current weights.
+    The ARIMA and SARIMA entries of the result are new objects, but the LSTM
+    is fine-tuned in place, so `fitted['LSTM']` changes too.
+
+    Returns:
+        dict: The updated models, keyed like `fitted`.
+    """
+    updated = dict(fitted)
+    if 'ARIMA' in fitted:
+        updated['ARIMA'] = update_arima(fitted['ARIMA'], new_obs)
+    if 'SARIMA' in fitted:
+        updated['SARIMA'] = update_sarima(fitted['SARIMA'], new_obs)
+    if 'LSTM' in fitted:
+        updated['LSTM'] = fine_tune_lstm(fitted['LSTM'], fitted['scaler'], history, new_obs,
+                                         time_step=time_step, epochs=lstm_epochs)
+    return updated
 
 
 def calculate_metrics(actual, predicted, epsilon=1e-10):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error
+
     mae = mean_absolute_error(actual, predicted)
     rmse = np.sqrt(mean_squared_error(actual, predicted))
     
@@ -66,6 +448,9 @@ def calculate_metrics(actual, predicted, epsilon=1e-10):
 
 
 def plot_metrics(metrics, title):
+    if not plotting_enabled():
+        return
+
     model_names = ['ARIMA', 'SARIMA', 'LSTM']
     mae = [metrics['ARIMA'][0], metrics['SARIMA'][0], metrics['LSTM'][0]]
     rmse = [metrics['ARIMA'][1], metrics['SARIMA'][1], metrics['LSTM'][1]]
@@ -85,48 +470,135 @@ def plot_metrics(metrics, title):
     ax.set_xticklabels(model_names)
     ax.legend()
 
-    plt.show()
-
-
-def run_forecasting(stockData, asset_name,seasonal_order=(1, 1, 1, 12), forecast_days=360):
+    render(title, fig)
+
+
+MODEL_NAMES = ('ARIMA', 'SARIMA', 'LSTM')
+
+
+def forecast_models(train, test, forecast_days, seasonal_order=(1, 1, 1, 12), time_step=60,
+                    models=MODEL_NAMES, lstm_epochs=10, cache=None, lstm_mode='recursive', sarima_mode='fixed',
+                    sarima_jobs=1):
+    """
+    Fits the requested models on `train` and forecasts the next `forecast_days` values.
+
+    Parameters:
+        train (Series): Training prices.
+        test (Series): Prices following `train` (only used by the one_step LSTM mode).
+        forecast_days (int): Forecast horizon.
+        seasonal_order (tuple): SARIMA seasonal order (the 'fixed' SARIMA mode).
+        time_step (int): LSTM look-back window.
+        models (iterable of str): Any of 'ARIMA', 'SARIMA', 'LSTM'.
+        lstm_epochs (int): LSTM training epochs.
+        cache (ModelCache): Optional fitted-model cache (see scripts.model_cache).
+        lstm_mode (str): 'recursive' feeds predictions back in, 'direct' trains one output
+            per step, 'one_step' predicts each day from the observed test data (the
+            original behaviour, which leaks test data into the inputs).
+        sarima_mode (str): 'fixed' fits `seasonal_order` with default settings, 'fast'
+            searches SEASONAL_GRID with fit_sarima_fast.
+        sarima_jobs (int): Processes used by the 'fast' SARIMA search.
+
+    Returns:
+        tuple: (forecasts, fitted) dicts keyed by model name.
+    """
+    if lstm_mode not in ('recursive', 'direct', 'one_step'):
+        raise ValueError(f"lstm_mode must be 'recursive', 'direct' or 'one_step', got {lstm_mode!r}")
+    if sarima_mode not in ('fixed', 'fast'):
+        raise ValueError(f"sarima_mode must be 'fixed' or 'fast', got {sarima_mode!r}")
+
+    forecasts, fitted = {}, {}
+
+    if 'ARIMA' in models or 'SARIMA' in models:
+        with stage('fit_arima') as info:
+            arima_model = fit_arima(train, cache=cache)
+            info.update(iterations=fit_iterations(arima_model), order=arima_model.order,
+                        search_size=getattr(arima_model, 'search_size_', None))
+        if 'ARIMA' in models:
+            fitted['ARIMA'] = arima_model
+            with stage('predict_arima'):
+                forecasts['ARIMA'] = np.ravel(arima_model.predict(n_periods=forecast_days)[:forecast_days])
+
+    if 'SARIMA' in models:
+        order = arima_model.order
+        with stage('fit_sarima', mode=sarima_mode) as info:
+            if sarima_mode == 'fast':
+                arima_params = getattr(arima_model.arima_res_, 'params', None)
+                sarima_fit = fit_sarima_fast(train, order, arima_params=arima_params, n_jobs=sarima_jobs, cache=cache)
+            else:
+                sarima_fit = fit_sarima(train, order=order, seasonal_order=seasonal_order, cache=cache)
+            retvals = getattr(sarima_fit, 'mle_retvals', None) or {}
+            info.update(iterations=fit_iterations(sarima_fit), converged=retvals.get('converged'),
+                        seasonal_order=sarima_fit.model.seasonal_order)
+        fitted['SARIMA'] = sarima_fit
+        with stage('predict_sarima'):
+            forecasts['SARIMA'] = np.ravel(sarima_fit.forecast(steps=forecast_days)[:forecast_days])
+
+    if 'LSTM' in models:
+        from sklearn.preprocessing import MinMaxScaler
+
+        #scaling
+        with stage('lstm_scaling'):
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            scaled_train = scaler.fit_transform(train.values.reshape(-1, 1))
+            scaled_test = scaler.transform(test.values.reshape(-1, 1))
+
+        with stage('lstm_windowing') as info:
+            if lstm_mode == 'direct':
+                X_train, y_train = make_windows(scaled_train, time_step, horizon=forecast_days)
+            else:
+                X_train, y_train = make_windows(scaled_train, time_step)
+            info['windows'] = len(X_train)
+
+        with stage('lstm_training') as info:
+            lstm_model = build_and_train_lstm(X_train, y_train, epochs=lstm_epochs, cache=cache)
+            info.update(iterations=fit_iterations(lstm_model), epochs=lstm_epochs)
+
+        with stage('lstm_prediction', mode=lstm_mode):
+            last_window = scaled_train[-time_step:].reshape(1, time_step, 1)
+            if lstm_mode == 'recursive':
+                lstm_forecast = recursive_lstm_forecast(lstm_model, last_window, forecast_days).reshape(-1, 1)
+            elif lstm_mode == 'direct':
+                lstm_forecast = direct_lstm_forecast(lstm_model, last_window, forecast_days).reshape(-1, 1)
+            else:
+                # One-step-ahead on observed test data; not comparable to the ARIMA/SARIMA forecasts
+                inputs = np.concatenate((scaled_train[-time_step:], scaled_test[:forecast_days]))
+                X_test, y_test = make_windows(inputs, time_step)
+                lstm_forecast = lstm_model.predict(X_test)
+            lstm_forecast = scaler.inverse_transform(lstm_forecast)
+
+        fitted['LSTM'] = lstm_model
+        fitted['scaler'] = scaler
+        forecasts['LSTM'] = np.ravel(lstm_forecast[:forecast_days])
+
+    return forecasts, fitted
+
+
+def run_forecasting(stockData, asset_name,seasonal_order=(1, 1, 1, 12), forecast_days=360, cache=None,
+                    lstm_mode='recursive', sarima_mode='fixed'):
+    # Every stage below is reported to the scripts.instrumentation hooks, tagged with the asset
+    with context(asset=asset_name), stage('run_forecasting'):
+        return _run_forecasting(stockData, asset_name, seasonal_order, forecast_days, cache, lstm_mode, sarima_mode)
+
+
+def _run_forecasting(stockData, asset_name, seasonal_order, forecast_days, cache, lstm_mode, sarima_mode):
     print(f"Running forecasting for {asset_name}...")
     
-    plot_data(stockData, f'{asset_name} Stock Prices')
+    with stage('plot_data'):
+        plot_data(stockData, f'{asset_name} Stock Prices')
 
     # Split data
     train, test = split_data(stockData)
 
-    #scaling
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_train = scaler.fit_transform(train.values.reshape(-1, 1))
-    scaled_test = scaler.transform(test.values.reshape(-1, 1))
-
-
-    arima_model = fit_arima(train)
-    arima_forecast = arima_model.predict(n_periods=forecast_days)
-
-    order = arima_model.order
-    sarima_fit = fit_sarima(train, order=order, seasonal_order=seasonal_order)
-    sarima_forecast = sarima_fit.forecast(steps=forecast_days)
+    forecasts, fitted = forecast_models(train, test, forecast_days, seasonal_order=seasonal_order, cache=cache,
+                                        lstm_mode=lstm_mode, sarima_mode=sarima_mode)
+    arima_forecast = forecasts['ARIMA']
+    sarima_forecast = forecasts['SARIMA']
+    lstm_forecast = forecasts['LSTM']
 
-    X_train, y_train = prepare_lstm_data(scaled_train, time_step=60)
-    X_train = X_train.reshape(X_train.shape[0], X_train.shape[1], 1)
-
-    lstm_model = build_and_train_lstm(X_train, y_train)
-
-    inputs = np.concatenate((scaled_train[-60:], scaled_test[:forecast_days]))
-    X_test, y_test = prepare_lstm_data(inputs, time_step=60)
-    X_test = X_test.reshape(X_test.shape[0], X_test.shape[1], 1)
-    lstm_forecast = lstm_model.predict(X_test)
-    lstm_forecast = scaler.inverse_transform(lstm_forecast)
-
-    arima_forecast = np.ravel(arima_forecast[:forecast_days])  
-    sarima_forecast = np.ravel(sarima_forecast[:forecast_days]) 
-    lstm_forecast = np.ravel(lstm_forecast[:forecast_days])
-
-    arima_metrics = calculate_metrics(test.values[:forecast_days], arima_forecast)
-    sarima_metrics = calculate_metrics(test.values[:forecast_days], sarima_forecast)
-    lstm_metrics = calculate_metrics(test.values[:forecast_days], lstm_forecast)
+    with stage('metrics'):
+        arima_metrics = calculate_metrics(test.values[:forecast_days], arima_forecast)
+        sarima_metrics = calculate_metrics(test.values[:forecast_days], sarima_forecast)
+        lstm_metrics = calculate_metrics(test.values[:forecast_days], lstm_forecast)
 
     print(f"{asset_name} - ARIMA - MAE: {arima_metrics[0]}, RMSE: {arima_metrics[1]}, MAPE: {arima_metrics[2]}")
     print(f"{asset_name} - SARIMA - MAE: {sarima_metrics[0]}, RMSE: {sarima_metrics[1]}, MAPE: {sarima_metrics[2]}")
@@ -138,23 +610,21 @@ def run_forecasting(stockData, asset_name,seasonal_order=(1, 1, 1, 12), forecast
         'LSTM': lstm_metrics
     }
     
-    plot_metrics(metrics, f'Model Performance Metrics for {asset_name}')
+    with stage('plot_metrics'):
+        plot_metrics(metrics, f'Model Performance Metrics for {asset_name}')
 
     results = {
         'arima_forecast': arima_forecast,
         'sarima_forecast': sarima_forecast,
         'lstm_forecast': lstm_forecast,
         'test_data': test.values[:forecast_days],
+        'last_price': train.values[-1],
         'metrics': {
             'ARIMA': arima_metrics,
             'SARIMA': sarima_metrics,
             'LSTM': lstm_metrics
         },
-        'models': {
-            'ARIMA': arima_model,
-            'SARIMA': sarima_fit,
-            'LSTM': lstm_model
-        }
+        'models': fitted
     }
 
     return results
@@ -177,6 +647,9 @@ def plot_forecasts_vs_actual(results, asset_name,name):
     asset_data = asset_data.reset_index()
     test_data_dates = asset_data['Date']
     
+    if not plotting_enabled():
+        return
+
     # Plot the actual and forecast data
     plt.figure(figsize=(14, 8))
     
@@ -199,7 +672,7 @@ def plot_forecasts_vs_actual(results, asset_name,name):
         plt.legend()
         plt.xticks(rotation=45)
         plt.tight_layout()
-        plt.show()
+        render(f'{name} forecast vs actual')
 
 
 def summarize_model_performance(results, stockData,name):
@@ -226,54 +699,36 @@ def reset_index(stockData):
     return stockData
 
 
-def merge_data(stockData):
-    # Rename the 'Close' columns to the respective asset names
-    tsla_df = stockData['tesla'].rename(columns={'Close': 'TSLA'})
-    bnd_df = stockData['bond'].rename(columns={'Close': 'BND'})
-    spy_df = stockData['spy'].rename(columns={'Close': 'SPY'})
+ASSET_NAMES = {'tesla': 'TSLA', 'bond': 'BND', 'spy': 'SPY'}
+ASSET_LABELS = {'TSLA': 'Tesla'}
 
-    # Merge the DataFrames on 'Date'
-    df = tsla_df[['Date', 'TSLA']].merge(bnd_df[['Date', 'BND']], on='Date', how='outer')
-    df = df.merge(spy_df[['Date', 'SPY']], on='Date', how='outer')
 
-    # Sort by Date if needed
-    df = df.sort_values('Date').reset_index(drop=True)
+def merge_data(stockData):
+    # Align the 'Close' columns of every asset on Date in one pass
+    frames = {ASSET_NAMES.get(key, key): data for key, data in stockData.items()}
+    prices = align_prices(frames, field='Close', how='outer')
 
-    return df
+    return prices.reset_index()
 
 
-def calculate_returns(df):
-    # Calculate daily returns for each asset
-    df['TSLA_daily_return'] = df['TSLA'].pct_change()
-    df['BND_daily_return'] = df['BND'].pct_change()
-    df['SPY_daily_return'] = df['SPY'].pct_change()
+def calculate_returns(df, kind='simple'):
+    # Every column except Date and previously computed returns is an asset price
+    assets = [c for c in df.columns if c != 'Date' and not c.endswith('_daily_return')]
 
-    # Calculate the average daily return for each asset
-    avg_daily_return_tsla = df['TSLA_daily_return'].mean()
-    avg_daily_return_bnd = df['BND_daily_return'].mean()
-    avg_daily_return_spy = df['SPY_daily_return'].mean()
+    # Calculate daily returns for all assets at once
+    returns = compute_returns(df[assets], kind=kind)
+    for asset in assets:
+        df[f'{asset}_daily_return'] = returns[asset]
 
     # Compound the average daily returns to annualize them
-    trading_days_per_year = 252  # Typically 252 trading days in a year
+    annual_returns = annualize_returns(returns, kind=kind)
 
-    annual_return_tsla = (1 + avg_daily_return_tsla) ** trading_days_per_year - 1
-    annual_return_bnd = (1 + avg_daily_return_bnd) ** trading_days_per_year - 1
-    annual_return_spy = (1 + avg_daily_return_spy) ** trading_days_per_year - 1
-
-    # Display the annual returns
-    annual_returns = {
-        'TSLA': annual_return_tsla,
-        'BND': annual_return_bnd,
-        'SPY': annual_return_spy
-    }
-    return annual_returns
+    return annual_returns.to_dict()
 
 
-def portfolio_annual_return(df):
-    weights = [0.5, 0.3, 0.2]
-    weighted_daily_return = (weights[0] * df['TSLA_daily_return'] + 
-                            weights[1] * df['BND_daily_return'] + 
-                            weights[2] * df['SPY_daily_return'])
+def portfolio_annual_return(df, weights=(0.5, 0.3, 0.2)):
+    # Weights follow the order of the '<ASSET>_daily_return' columns
+    weighted_daily_return = portfolio_returns(df[return_columns(df)], weights)
 
     # Calculate annualized portfolio return (assuming 252 trading days in a year)
     portfolio_annual_return = (1 + weighted_daily_return.mean())**252 - 1
@@ -281,6 +736,8 @@ def portfolio_annual_return(df):
 
 
 def optimal_portfolio_no_sharpe(expected_returns,cov_matrix,df):
+    import scipy.optimize as sco
+
     # Define the objective function to minimize (negative return)
     def negative_return(weights):
         portfolio_return = np.dot(weights, expected_returns)
@@ -294,13 +751,12 @@ def optimal_portfolio_no_sharpe(expected_returns,cov_matrix,df):
     initial_weights = [1 / len(expected_returns)] * len(expected_returns)
 
     # Optimize weights to maximize portfolio return
-    optimized = sco.minimize(negative_return, initial_weights, constraints=constraints, bounds=bounds)
+    optimized = sco.minimize(negative_return, initial_weights, jac=lambda w: -np.asarray(expected_returns),
+                             constraints=constraints, bounds=bounds)
     optimal_weights = optimized.x
 
     # Calculate the weighted daily return using the optimized weights
-    weighted_daily_return = (optimal_weights[0] * df['TSLA_daily_return'] + 
-                            optimal_weights[1] * df['BND_daily_return'] + 
-                            optimal_weights[2] * df['SPY_daily_return'])
+    weighted_daily_return = portfolio_returns(df[return_columns(df)], optimal_weights)
 
     # Calculate annualized portfolio return (assuming 252 trading days in a year)
     portfolio_annual_return = (1 + weighted_daily_return.mean())**252 - 1
@@ -310,27 +766,11 @@ def optimal_portfolio_no_sharpe(expected_returns,cov_matrix,df):
 
 
 def optimal_portfolio_sharpe(expected_returns,cov_matrix,df):
-    # Define the objective function to minimize (negative Sharpe Ratio)
-    def negative_sharpe(weights):
-        portfolio_return = np.dot(weights, expected_returns)
-        portfolio_volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-        return -portfolio_return / portfolio_volatility  # Maximizing Sharpe Ratio
-
-    # Constraints and bounds for optimization
-    constraints = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1}  # Weights sum to 1
-    bounds = tuple((0, 1) for _ in range(len(expected_returns)))  # Weights between 0 and 1
-
-    # Initial guess for weights
-    initial_weights = [1 / len(expected_returns)] * len(expected_returns)
-
-    # Optimize weights
-    optimized = sco.minimize(negative_sharpe, initial_weights, constraints=constraints, bounds=bounds)
-    optimal_weights = optimized.x
+    # Maximize the Sharpe ratio (weights in [0, 1] summing to 1) with analytic gradients
+    optimal_weights = max_sharpe_portfolio(expected_returns, cov_matrix)
 
     # Calculate the weighted daily return using the optimized weights
-    weighted_daily_return = (optimal_weights[0] * df['TSLA_daily_return'] + 
-                            optimal_weights[1] * df['BND_daily_return'] + 
-                            optimal_weights[2] * df['SPY_daily_return'])
+    weighted_daily_return = portfolio_returns(df[return_columns(df)], optimal_weights)
 
     # Calculate annualized portfolio return (assuming 252 trading days in a year)
     portfolio_annual_return = (1 + weighted_daily_return.mean())**252 - 1
@@ -350,31 +790,19 @@ def portfolio_variance(optimal_weights,cov_matrix):
 
 
 
-def total_portfolio(df,weighted_daily_return):
-    # Drop missing values
-    df['TSLA_daily_return'].dropna(inplace=True)
+def total_portfolio(df,weighted_daily_return, confidence_level=0.95):
+    returns = df[return_columns(df)]
 
     average_portfolio_return = weighted_daily_return.mean()
 
     # 2. Measure the standard deviation of portfolio returns to understand volatility
     portfolio_volatility = weighted_daily_return.std()
 
-    # 3. Measure the potential loss in value of Tesla stock at a given confidence interval (Value at Risk - VaR)
-    try:
-        # Historical VaR approach (using the 5th percentile for 95% confidence)
-        confidence_level = 0.95
-        var_Tesla = np.percentile(df['TSLA_daily_return'], (1 - confidence_level) * 100)
-    except Exception as e:
-        # Fallback in case of errors (e.g., if not enough data)
-        var_Tesla = df['TSLA_daily_return'].mean() 
-
-    # Alternatively, using the parametric VaR approach (assuming returns are normally distributed)
-    try:
-        mean_Tesla_return = df['TSLA_daily_return'].mean()
-        std_Tesla_return = df['TSLA_daily_return'].std()
-        var_Tesla_parametric = stats.norm.ppf(1 - confidence_level) * std_Tesla_return + mean_Tesla_return
-    except Exception as e:
-        var_Tesla_parametric = df['TSLA_daily_return'].mean()  # Fallback to mean return
+    # 3. Value at Risk of every asset and of the portfolio, historical (5th percentile
+    #    for 95% confidence) and parametric (assuming normally distributed returns)
+    asset_var, asset_var_parametric = value_at_risk(returns, confidence_level)
+    portfolio_var, portfolio_var_parametric = value_at_risk(weighted_daily_return.to_numpy()[:, None], confidence_level)
+    portfolio_cvar = conditional_value_at_risk(weighted_daily_return.dropna().to_numpy()[:, None], portfolio_var)
 
     # 4. Calculate the Sharpe Ratio for the portfolio (assuming a risk-free rate of 0 for simplicity)
     sharpe_ratio = average_portfolio_return / portfolio_volatility
@@ -388,25 +816,33 @@ def total_portfolio(df,weighted_daily_return):
     results = {
         "Average Portfolio Return (Daily)": average_portfolio_return,
         "Portfolio Volatility (Daily)": portfolio_volatility,
-        "Tesla VaR (95% confidence)": var_Tesla,
-        "Tesla VaR (Parametric 95% confidence)": var_Tesla_parametric,
+        "Portfolio VaR (95% confidence)": portfolio_var[0],
+        "Portfolio VaR (Parametric 95% confidence)": portfolio_var_parametric[0],
+        "Portfolio CVaR (95% confidence)": portfolio_cvar[0],
+    }
+    asset_vars = {}
+    for column, var, var_parametric in zip(returns.columns, asset_var, asset_var_parametric):
+        asset = column[:-len(RETURN_SUFFIX)]
+        asset_vars[asset] = var
+        results[f"{ASSET_LABELS.get(asset, asset)} VaR (95% confidence)"] = var
+        results[f"{ASSET_LABELS.get(asset, asset)} VaR (Parametric 95% confidence)"] = var_parametric
+    results.update({
         "Sharpe Ratio (Daily)": sharpe_ratio,
         "Annualized Portfolio Return": annualized_portfolio_return,
         "Annualized Portfolio Volatility": annualized_portfolio_volatility,
         "Annualized Sharpe Ratio": annualized_sharpe_ratio
-    }
+    })
 
-    return results, var_Tesla, sharpe_ratio, annualized_sharpe_ratio, portfolio_volatility, average_portfolio_return
+    # Historical VaR per ticker, e.g. for daily_plot_VaR
+    return results, asset_vars, sharpe_ratio, annualized_sharpe_ratio, portfolio_volatility, average_portfolio_return
 
 
 def portfolio_calculations(df):
-    mean_returns = df[['TSLA_daily_return', 'BND_daily_return', 'SPY_daily_return']].mean()
-
-    # Calculate the covariance matrix of returns
-    cov_matrix = df[['TSLA_daily_return', 'BND_daily_return', 'SPY_daily_return']].cov()
+    returns = df[return_columns(df)]
+    mean_returns = returns.mean()
 
-    # Define the number of assets
-    num_assets = len(mean_returns)
+    # Covariance matrix of returns, shared with the heatmaps through the covariance cache
+    cov_matrix = get_covariance(returns)
 
     # Function to calculate portfolio performance (return, volatility)
     def portfolio_performance(weights, mean_returns, cov_matrix):
@@ -414,30 +850,8 @@ def portfolio_calculations(df):
         volatility = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))  # Portfolio volatility
         return returns, volatility
 
-    # Objective function: Minimize the negative Sharpe ratio
-    def negative_sharpe_ratio(weights, mean_returns, cov_matrix, risk_free_rate=0):
-        portfolio_return, portfolio_volatility = portfolio_performance(weights, mean_returns, cov_matrix)
-        return -(portfolio_return - risk_free_rate) / portfolio_volatility
-
-    # Constraints: Weights must sum to 1 (full investment)
-    def weight_constraint(weights):
-        return np.sum(weights) - 1
-
-    # Initial guess (equal distribution of weights)
-    initial_guess = np.array([1/num_assets] * num_assets)
-
-    # Bounds for each weight: between 0 and 1
-    bounds = tuple((0, 1) for asset in range(num_assets))
-
-    # Constraints: weights must sum to 1
-    constraints = ({'type': 'eq', 'fun': weight_constraint})
-
-    # Perform the optimization to maximize the Sharpe ratio
-    optimized_result = sco.minimize(negative_sharpe_ratio, initial_guess, args=(mean_returns, cov_matrix),
-                                    method='SLSQP', bounds=bounds, constraints=constraints)
-
-    # Extract the optimized weights
-    optimized_weights = optimized_result.x
+    # Maximize the Sharpe ratio (weights in [0, 1] summing to 1) with analytic gradients
+    optimized_weights = max_sharpe_portfolio(mean_returns, cov_matrix, risk_free_rate=0)
 
     # Calculate the optimized portfolio performance
     optimized_return, optimized_volatility = portfolio_performance(optimized_weights, mean_returns, cov_matrix)
@@ -451,7 +865,7 @@ def portfolio_calculations(df):
 
     # Display results
     optimized_results = {
-        "Optimized Portfolio Weights (TSLA, BND, SPY)": optimized_weights,
+        f"Optimized Portfolio Weights ({', '.join(c[:-len(RETURN_SUFFIX)] for c in returns.columns)})": optimized_weights,
         "Optimized Portfolio Return (Annualized)": annualized_optimized_return,
         "Optimized Portfolio Volatility (Annualized)": annualized_optimized_volatility,
         "Optimized Sharpe Ratio": optimized_sharpe_ratio
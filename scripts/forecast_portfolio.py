@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from scripts.covariance import get_covariance
+from scripts.frontier import max_sharpe_portfolio, min_variance_portfolio
+from scripts.portfolio import portfolio_statistics
+
+MODEL_FORECAST_KEYS = {'ARIMA': 'arima_forecast', 'SARIMA': 'sarima_forecast', 'LSTM': 'lstm_forecast'}
+
+
+def _path_returns(path, last_price):
+    # Daily returns implied by a price path that starts after `last_price`
+    prices = np.concatenate(([last_price], np.ravel(path)))
+    return prices[1:] / prices[:-1] - 1
+
+
+def forecast_return_paths(results_by_asset, model):
+    """
+    Converts the forecast price paths of one model into daily return paths.
+
+    Parameters:
+        results_by_asset (dict): Asset name -> results dict from run_forecasting
+            (needs '<model>_forecast' and 'last_price').
+        model (str): 'ARIMA', 'SARIMA', 'LSTM' or 'ensemble' (mean of all three).
+
+    Returns:
+        DataFrame: Forecast step x asset daily returns.
+    """
+    paths = {}
+    for asset, results in results_by_asset.items():
+        if model == 'ensemble':
+            path = np.mean([np.ravel(results[key]) for key in MODEL_FORECAST_KEYS.values()], axis=0)
+        else:
+            path = results[MODEL_FORECAST_KEYS[model]]
+        paths[asset] = _path_returns(path, results['last_price'])
+    return pd.DataFrame(paths)
+
+
+def realized_return_paths(results_by_asset):
+    """
+    Daily returns of the observed test data the forecasts were scored against.
+    """
+    return pd.DataFrame({asset: _path_returns(results['test_data'], results['last_price'])
+                         for asset, results in results_by_asset.items()})
+
+
+def forecast_error_covariance(results_by_asset, model, method='ledoit_wolf', fallback_returns=None):
+    """
+    Covariance of the forecast errors (realized minus forecast daily returns) across assets.
+
+    Forecast errors capture how uncertain each asset's expected return is and
+    how those errors co-move, which is the risk that matters once allocations
+    are driven by the forecasts. Ledoit-Wolf shrinkage is the default because
+    forecast horizons are short relative to the number of assets.
+
+    Forecasts past the last observed bar have no realized returns to compare
+    with. With fewer than two overlapping steps the covariance of
+    `fallback_returns` (e.g. the historical daily returns) is used instead,
+    or a ValueError is raised when none is given.
+    """
+    forecast = forecast_return_paths(results_by_asset, model)
+    realized = realized_return_paths(results_by_asset)
+    steps = min(len(forecast), len(realized))
+    if steps < 2:
+        if fallback_returns is None:
+            raise ValueError(f"{model} forecasts overlap the realized data on {steps} step(s); at least 2 are "
+                             f"needed for a forecast-error covariance, pass fallback_returns to use another estimate")
+        print(f"{model}: {steps} realized forecast step(s), using the covariance of the fallback returns")
+        return get_covariance(fallback_returns[list(forecast.columns)].dropna(), method)
+    errors = realized.iloc[:steps] - forecast.iloc[:steps]
+    return get_covariance(errors, method)
+
+
+def optimize_scenarios(expected_returns, cov_matrices, strategy='max_sharpe', bounds=(0, 1), risk_free_rate=0):
+    """
+    Optimizes one portfolio per scenario, warm-starting each from the previous solution.
+
+    Parameters:
+        expected_returns (DataFrame): Scenario x asset expected daily returns.
+        cov_matrices (dict or DataFrame): Scenario -> covariance, or one covariance for all.
+        strategy (str): 'max_sharpe' or 'min_variance'.
+        bounds (tuple): (min, max) weight of every asset.
+        risk_free_rate (float): Daily risk-free rate.
+
+    Returns:
+        DataFrame: Scenario x asset optimal weights.
+    """
+    weights, previous = {}, None
+    for scenario, mean in expected_returns.iterrows():
+        cov = cov_matrices[scenario] if isinstance(cov_matrices, dict) else cov_matrices
+        if strategy == 'max_sharpe':
+            previous = max_sharpe_portfolio(mean, cov, risk_free_rate, bounds, initial_weights=previous)
+        elif strategy == 'min_variance':
+            previous = min_variance_portfolio(mean, cov, bounds, initial_weights=previous)
+        else:
+            raise ValueError(f"strategy must be 'max_sharpe' or 'min_variance', got {strategy!r}")
+        weights[scenario] = previous
+    return pd.DataFrame(weights, index=expected_returns.columns).T
+
+
+def forecast_allocation(results_by_asset, models=('ARIMA', 'SARIMA', 'LSTM', 'ensemble'), historical_returns=None,
+                        strategy='max_sharpe', cov_method='ledoit_wolf', bounds=(0, 1), risk_free_rate=0):
+    """
+    Turns stored forecasts for every asset into optimized allocations, one per scenario.
+
+    Each model (and the ensemble of all three) is a scenario: its forecast paths
+    give the expected daily return of every asset and its forecast errors give
+    the covariance. Forecasts are reused from `results_by_asset`, nothing is
+    refitted. When `historical_returns` is given, every allocation is also
+    evaluated on that history in one batched call, and its covariance stands in
+    for scenarios whose forecasts have not been realized yet.
+
+    Parameters:
+        results_by_asset (dict): Asset name -> results dict from run_forecasting.
+        models (tuple): Scenarios to optimize.
+        historical_returns (DataFrame): Optional daily returns (columns in asset order).
+        strategy (str): 'max_sharpe' or 'min_variance'.
+        cov_method (str): 'sample', 'ledoit_wolf' or 'ewma' for the forecast-error covariance.
+        bounds (tuple): (min, max) weight of every asset.
+        risk_free_rate (float): Daily risk-free rate.
+
+    Returns:
+        dict: 'expected_returns' (scenario x asset), 'weights' (scenario x asset) and,
+            with `historical_returns`, 'statistics' (scenario x metric).
+    """
+    expected_returns = pd.DataFrame({model: forecast_return_paths(results_by_asset, model).mean()
+                                     for model in models}).T
+    cov_matrices = {model: forecast_error_covariance(results_by_asset, model, cov_method, historical_returns)
+                    for model in models}
+
+    weights = optimize_scenarios(expected_returns, cov_matrices, strategy, bounds, risk_free_rate)
+    allocation = {'expected_returns': expected_returns, 'weights': weights}
+
+    if historical_returns is not None:
+        statistics = portfolio_statistics(historical_returns, weights.to_numpy(), risk_free_rate)
+        statistics.index = weights.index
+        allocation['statistics'] = statistics
+
+    return allocation
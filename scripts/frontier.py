@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+
+def _as_arrays(mean_returns, cov_matrix):
+    return np.asarray(mean_returns, dtype=float), np.asarray(cov_matrix, dtype=float)
+
+
+# SLSQP's ftol is an absolute tolerance on the objective. With the default of
+# 1e-6 a variance of daily returns (~1e-4) stops the search at its starting
+# point, so the variance objective works on a unit-scale covariance and the
+# tolerance is tightened.
+SLSQP_OPTIONS = {'ftol': 1e-10, 'maxiter': 500}
+
+
+def _unit_scale(cov):
+    # Same minimiser, objective values of order one
+    scale = np.mean(np.diag(cov))
+    return cov / scale if scale > 0 else cov
+
+
+def _budget_constraint(n_assets):
+    # Weights sum to 1, with its constant gradient
+    return {'type': 'eq', 'fun': lambda w: np.sum(w) - 1, 'jac': lambda w: np.ones(n_assets)}
+
+
+def _variance(w, cov):
+    # Portfolio variance and its gradient, for SLSQP with jac=True
+    cov_w = cov @ w
+    return w @ cov_w, 2 * cov_w
+
+
+def _negative_sharpe(w, mu, cov, risk_free_rate):
+    # Negative Sharpe ratio and its gradient, for SLSQP with jac=True
+    cov_w = cov @ w
+    volatility = np.sqrt(w @ cov_w)
+    excess = w @ mu - risk_free_rate
+    value = -excess / volatility
+    gradient = -(mu / volatility - excess * cov_w / volatility ** 3)
+    return value, gradient
+
+
+def closed_form_frontier(mean_returns, cov_matrix, target_returns):
+    """
+    Solves the unconstrained (short sales allowed) frontier for many targets at once.
+
+    With A = 1'S^-1 1, B = 1'S^-1 mu, C = mu'S^-1 mu and D = AC - B^2 the
+    minimum-variance weights for target t are
+    ((C - tB) S^-1 1 + (tA - B) S^-1 mu) / D, so every point is a linear
+    combination of the same two solves.
+
+    Returns:
+        tuple: Weights of shape (n_targets, n_assets) and volatilities (n_targets,).
+    """
+    mu, cov = _as_arrays(mean_returns, cov_matrix)
+    targets = np.atleast_1d(np.asarray(target_returns, dtype=float))
+
+    inv_ones, inv_mu = np.linalg.solve(cov, np.column_stack((np.ones(len(mu)), mu))).T
+    A, B, C = inv_ones.sum(), inv_mu.sum(), mu @ inv_mu
+    D = A * C - B ** 2
+
+    weights = (np.outer(C - targets * B, inv_ones) + np.outer(targets * A - B, inv_mu)) / D
+    volatility = np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+    return weights, volatility
+
+
+def min_variance_portfolio(mean_returns, cov_matrix, bounds=(0, 1), initial_weights=None):
+    """
+    Finds the minimum-variance portfolio with SLSQP and an analytic gradient.
+
+    Returns:
+        array: Optimal weights.
+    """
+    import scipy.optimize as sco
+
+    mu, cov = _as_arrays(mean_returns, cov_matrix)
+    n_assets = len(mu)
+    x0 = np.full(n_assets, 1 / n_assets) if initial_weights is None else initial_weights
+
+    result = sco.minimize(_variance, x0, args=(_unit_scale(cov),), jac=True, method='SLSQP',
+                          bounds=[bounds] * n_assets, constraints=[_budget_constraint(n_assets)],
+                          options=SLSQP_OPTIONS)
+    return result.x
+
+
+def max_sharpe_portfolio(mean_returns, cov_matrix, risk_free_rate=0, bounds=(0, 1), initial_weights=None):
+    """
+    Finds the maximum-Sharpe portfolio with SLSQP and an analytic gradient.
+
+    Returns:
+        array: Optimal weights.
+    """
+    import scipy.optimize as sco
+
+    mu, cov = _as_arrays(mean_returns, cov_matrix)
+    n_assets = len(mu)
+    x0 = np.full(n_assets, 1 / n_assets) if initial_weights is None else initial_weights
+
+    result = sco.minimize(_negative_sharpe, x0, args=(mu, cov, risk_free_rate), jac=True, method='SLSQP',
+                          bounds=[bounds] * n_assets, constraints=[_budget_constraint(n_assets)],
+                          options=SLSQP_OPTIONS)
+    return result.x
+
+
+def efficient_frontier(mean_returns, cov_matrix, n_points=50, bounds=(0, 1), risk_free_rate=0):
+    """
+    Traces the efficient frontier by solving a sequence of warm-started QPs.
+
+    Each point minimises w'Sw subject to the budget, the bounds and a target
+    return, starting from the solution of the previous target. Targets run
+    from the minimum-variance portfolio's return to the highest attainable
+    return, so neighbouring solutions are close and SLSQP converges in a few
+    iterations. The minimum-variance and maximum-Sharpe portfolios are returned
+    as points on the same frontier.
+
+    Parameters:
+        mean_returns (Series or array): Expected return per asset.
+        cov_matrix (DataFrame or array): Covariance matrix of the assets.
+        n_points (int): Number of frontier points.
+        bounds (tuple): (min, max) weight of every asset.
+        risk_free_rate (float): Risk-free rate used for the Sharpe ratio.
+
+    Returns:
+        dict: 'frontier' (DataFrame with return, volatility, sharpe and one weight
+            column per asset), 'min_variance' and 'max_sharpe' (Series of weights).
+    """
+    import scipy.optimize as sco
+
+    assets = list(mean_returns.index) if hasattr(mean_returns, 'index') else list(range(len(mean_returns)))
+    mu, cov = _as_arrays(mean_returns, cov_matrix)
+    n_assets = len(mu)
+    lower, upper = bounds
+
+    min_variance = min_variance_portfolio(mu, cov, bounds)
+
+    # Highest return reachable within the bounds: start every asset at `lower`
+    # and fill the best ones up to `upper`
+    w_max = np.full(n_assets, lower, dtype=float)
+    remaining = 1 - w_max.sum()
+    for i in np.argsort(mu)[::-1]:
+        add = min(upper - lower, remaining)
+        w_max[i] += add
+        remaining -= add
+    max_return = w_max @ mu
+
+    targets = np.linspace(min_variance @ mu, max_return, n_points)
+    unit_cov = _unit_scale(cov)
+    weights = np.empty((n_points, n_assets))
+    x0 = min_variance
+    for k, target in enumerate(targets):
+        constraints = [
+            _budget_constraint(n_assets),
+            {'type': 'eq', 'fun': lambda w, t=target: w @ mu - t, 'jac': lambda w: mu},
+        ]
+        result = sco.minimize(_variance, x0, args=(unit_cov,), jac=True, method='SLSQP',
+                              bounds=[bounds] * n_assets, constraints=constraints, options=SLSQP_OPTIONS)
+        weights[k] = x0 = result.x
+
+    returns = weights @ mu
+    volatility = np.sqrt(np.einsum('ij,jk,ik->i', weights, cov, weights))
+    sharpe = (returns - risk_free_rate) / volatility
+
+    # Refine the best frontier point into the exact tangency portfolio
+    max_sharpe = max_sharpe_portfolio(mu, cov, risk_free_rate, bounds, initial_weights=weights[np.argmax(sharpe)])
+
+    frontier = pd.DataFrame(weights, columns=assets)
+    frontier.insert(0, 'sharpe', sharpe)
+    frontier.insert(0, 'volatility', volatility)
+    frontier.insert(0, 'return', returns)
+
+    return {
+        'frontier': frontier,
+        'min_variance': pd.Series(min_variance, index=assets),
+        'max_sharpe': pd.Series(max_sharpe, index=assets),
+    }
@@ -0,0 +1,129 @@
+import numpy as np
+
+from scripts.features import window_batches
+from scripts.lazy_imports import lazy_module
+
+tf = lazy_module('tensorflow')
+
+
+def scale_series(series_dict):
+    """
+    Scales every asset to [0, 1] with its own MinMaxScaler.
+
+    Parameters:
+        series_dict (dict): Asset name -> price Series or 1-D array.
+
+    Returns:
+        tuple: (scaled, scalers) dicts keyed by asset name.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaled, scalers = {}, {}
+    for asset, series in series_dict.items():
+        scaler = MinMaxScaler(feature_range=(0, 1))
+        scaled[asset] = scaler.fit_transform(np.asarray(series, dtype=float).reshape(-1, 1))
+        scalers[asset] = scaler
+    return scaled, scalers
+
+
+def build_global_lstm(time_step, n_assets, embedding_dim=4, units=50, horizon=1):
+    """
+    Builds one LSTM shared by all assets, conditioned on a learned asset embedding.
+
+    The embedding is repeated along the window and concatenated to the scaled
+    prices, so the shared layers can specialise per asset.
+    """
+    from tensorflow.keras.layers import LSTM, Concatenate, Dense, Embedding, Flatten, Input, RepeatVector
+    from tensorflow.keras.models import Model
+
+    window = Input(shape=(time_step, 1), name='window')
+    asset = Input(shape=(1,), dtype='int32', name='asset')
+
+    embedding = Embedding(n_assets, embedding_dim)(asset)
+    embedding = RepeatVector(time_step)(Flatten()(embedding))
+
+    x = Concatenate()([window, embedding])
+    x = LSTM(units, return_sequences=True)(x)
+    x = LSTM(units, return_sequences=False)(x)
+    output = Dense(horizon)(x)
+
+    model = Model(inputs=[window, asset], outputs=output)
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+def pooled_dataset(scaled, time_step, batch_size=256, horizon=1, shuffle=True, seed=None):
+    """
+    Streams windows pooled from all assets as ((window, asset_id), target) batches.
+    """
+    series_list = list(scaled.values())
+    signature = (
+        (tf.TensorSpec(shape=(None, time_step, 1), dtype=tf.float32),
+         tf.TensorSpec(shape=(None,), dtype=tf.int32)),
+        tf.TensorSpec(shape=(None, horizon), dtype=tf.float32),
+    )
+
+    def generator():
+        for X, Y, ids in window_batches(series_list, time_step, batch_size, horizon,
+                                        shuffle=shuffle, seed=seed, with_ids=True):
+            yield (X.astype(np.float32), ids.astype(np.int32)), Y.astype(np.float32)
+
+    return tf.data.Dataset.from_generator(generator, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+
+def train_global_lstm(series_dict, time_step=60, epochs=10, batch_size=256, embedding_dim=4, horizon=1, seed=None):
+    """
+    Trains a single LSTM over windows pooled from every asset.
+
+    Parameters:
+        series_dict (dict): Asset name -> training prices.
+        time_step (int): Look-back window length.
+        epochs (int): Training epochs.
+        batch_size (int): Windows per batch, mixed across assets.
+        embedding_dim (int): Size of the asset embedding.
+        horizon (int): Number of future steps predicted at once.
+        seed (int): Seed for the window shuffle.
+
+    Returns:
+        dict: 'model', 'scalers' (per asset), 'asset_ids' (asset -> embedding row)
+            and 'time_step', as expected by predict_global_lstm.
+    """
+    scaled, scalers = scale_series(series_dict)
+    model = build_global_lstm(time_step, len(scaled), embedding_dim=embedding_dim, horizon=horizon)
+    model.fit(pooled_dataset(scaled, time_step, batch_size, horizon, seed=seed), epochs=epochs)
+
+    return {
+        'model': model,
+        'scalers': scalers,
+        'asset_ids': {asset: i for i, asset in enumerate(scaled)},
+        'time_step': time_step,
+    }
+
+
+def predict_global_lstm(global_model, series_dict):
+    """
+    Predicts the next value(s) for many assets in one batched predict call.
+
+    Parameters:
+        global_model (dict): As returned by train_global_lstm.
+        series_dict (dict): Asset name -> recent prices (at least `time_step` values).
+
+    Returns:
+        dict: Asset name -> array of `horizon` forecasts in price units.
+    """
+    time_step = global_model['time_step']
+    scalers, asset_ids = global_model['scalers'], global_model['asset_ids']
+    assets = list(series_dict)
+
+    windows = np.stack([
+        scalers[asset].transform(np.asarray(series_dict[asset], dtype=float)[-time_step:].reshape(-1, 1))
+        for asset in assets
+    ]).astype(np.float32)
+    ids = np.array([asset_ids[asset] for asset in assets], dtype=np.int32)
+
+    predictions = global_model['model'].predict([windows, ids], verbose=0)
+
+    return {
+        asset: scalers[asset].inverse_transform(predictions[i].reshape(-1, 1)).ravel()
+        for i, asset in enumerate(assets)
+    }
@@ -0,0 +1,174 @@
+import contextvars
+import sys
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module; peak RSS is then reported as None
+    resource = None
+
+# Hooks receive one record dict per finished stage
+_hooks = []
+_context = contextvars.ContextVar('stage_context', default={})
+
+
+def add_hook(hook):
+    """
+    Registers `hook(record)` to be called with every finished stage record.
+    """
+    _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def peak_rss_mib():
+    """
+    Peak resident set size of this process so far, in MiB (None where unsupported).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+@contextmanager
+def context(**fields):
+    """
+    Adds fields (e.g. asset='TSLA') to every stage record emitted inside the block.
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Measures one pipeline stage and emits a record to the registered hooks.
+
+    The block receives a dict it can fill with extra fields, e.g. the number of
+    fit iterations. When no hook is registered nothing is measured.
+
+    Record fields: stage, parent (enclosing stage or None), wall_s, cpu_s
+    (process CPU time, all threads), peak_rss_mib (process high-water mark at
+    the end of the stage), rss_growth_mib (how much the stage raised that
+    mark), iterations, any context() fields and whatever the block added.
+    A stage that raises is recorded with error set to the exception.
+    """
+    info = {}
+    if not _hooks:
+        yield info
+        return
+
+    outer = _context.get()
+    token = _context.set({**outer, 'parent': name})
+    rss_before = peak_rss_mib()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    error = None
+    try:
+        yield info
+    except BaseException as e:
+        error = repr(e)
+        raise
+    finally:
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        rss_after = peak_rss_mib()
+        _context.reset(token)
+
+        record = dict(outer)
+        record.update({
+            'stage': name,
+            'parent': outer.get('parent'),
+            'wall_s': wall,
+            'cpu_s': cpu,
+            'peak_rss_mib': rss_after,
+            'rss_growth_mib': None if rss_after is None else rss_after - rss_before,
+            'iterations': None,
+            'error': error,
+        })
+        record.update(fields)
+        record.update(info)
+        for hook in list(_hooks):
+            hook(record)
+
+
+class StageRecorder:
+    """
+    Hook that collects stage records and aggregates them into a report.
+
+    Use it as a context manager to register it for the duration of a block:
+
+        with StageRecorder() as recorder:
+            for name, prices in assets.items():
+                run_forecasting(prices, name)
+        print(recorder.report())
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def __enter__(self):
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc):
+        remove_hook(self)
+        return False
+
+    def frame(self):
+        """
+        All records as a DataFrame, one row per stage execution.
+        """
+        return pd.DataFrame(self.records)
+
+    def report(self, by='stage'):
+        """
+        Aggregates the records per stage (or per any record field, e.g. ['asset', 'stage']).
+
+        Returns:
+            DataFrame: calls, total/mean/max wall time, total CPU time, CPU/wall ratio,
+                highest peak RSS, largest RSS growth and total iterations, slowest first.
+        """
+        frame = self.frame()
+        if frame.empty:
+            return frame
+        frame['iterations'] = pd.to_numeric(frame['iterations'], errors='coerce')
+
+        report = frame.groupby(by, sort=False).agg(
+            calls=('wall_s', 'size'),
+            wall_total_s=('wall_s', 'sum'),
+            wall_mean_s=('wall_s', 'mean'),
+            wall_max_s=('wall_s', 'max'),
+            cpu_total_s=('cpu_s', 'sum'),
+            peak_rss_mib=('peak_rss_mib', 'max'),
+            rss_growth_max_mib=('rss_growth_mib', 'max'),
+            iterations=('iterations', lambda values: values.sum(min_count=1)),
+            errors=('error', 'count'),
+        )
+        report.insert(report.columns.get_loc('cpu_total_s') + 1, 'cpu_per_wall',
+                      report['cpu_total_s'] / report['wall_total_s'])
+        return report.sort_values('wall_total_s', ascending=False)
+
+
+def print_hook(record):
+    """
+    Hook printing one line per finished stage.
+    """
+    asset = f"{record['asset']} " if 'asset' in record else ''
+    iterations = f", {record['iterations']} iterations" if record.get('iterations') is not None else ''
+    rss = f", peak RSS {record['peak_rss_mib']:.0f} MiB" if record.get('peak_rss_mib') is not None else ''
+    print(f"[{asset}{record['stage']}] {record['wall_s']:.3f}s wall, {record['cpu_s']:.3f}s CPU{rss}{iterations}")
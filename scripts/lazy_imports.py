@@ -0,0 +1,41 @@
+import importlib
+import sys
+
+
+class LazyModule:
+    """
+    Module placeholder that imports the real module on first attribute access.
+
+    Lets plotting and modelling code keep module-level aliases such as `plt`
+    or `tf` without paying for matplotlib or TensorFlow until a function that
+    needs them actually runs.
+
+    Parameters:
+        name (str): Dotted module name, e.g. 'matplotlib.pyplot'.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_module(name):
+    """
+    Returns a LazyModule for `name`, or the module itself if it is already imported.
+    """
+    return sys.modules.get(name) or LazyModule(name)
@@ -0,0 +1,167 @@
+import hashlib
+import os
+import pickle
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MODEL_CACHE_DIR = os.path.join('data', 'models')
+
+# Libraries whose version changes invalidate cached models of a given kind
+MODEL_LIBRARIES = {
+    'ARIMA': ('numpy', 'statsmodels', 'pmdarima'),
+    'SARIMA': ('numpy', 'statsmodels'),
+    'LSTM': ('numpy', 'tensorflow', 'keras'),
+}
+
+
+def _library_version(name):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return 'missing'
+
+
+def is_keras_model(model):
+    """
+    True for Keras models, which are saved in the native .keras format instead of pickled.
+    """
+    return type(model).__module__.startswith(('keras', 'tensorflow'))
+
+
+def save_model_file(model, directory, name):
+    """
+    Writes `model` atomically to directory/<name>.keras (Keras models) or directory/<name>.pkl.
+
+    Returns:
+        str: Path written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    keras_format = is_keras_model(model)
+    path = os.path.join(directory, name + ('.keras' if keras_format else '.pkl'))
+    # Keras picks the format from the extension, so the temporary name keeps it
+    tmp_path = os.path.join(directory, f"tmp-{os.getpid()}-{os.path.basename(path)}")
+    if keras_format:
+        model.save(tmp_path)
+    else:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_model_file(path):
+    """
+    Reads a model written by save_model_file.
+    """
+    if path.endswith('.keras'):
+        from tensorflow.keras.models import load_model
+
+        return load_model(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class ModelCache:
+    """
+    Persistent, size-bounded cache of fitted models.
+
+    Models are keyed on a hash of the training data, the hyperparameters and
+    the versions of the libraries that fitted them. Keras models are stored in
+    the native .keras format, everything else is pickled. When the cache grows
+    beyond `max_bytes` the least recently used entries are evicted.
+
+    Parameters:
+        cache_dir (str): Folder holding the cached models.
+        max_bytes (int): Maximum total size of the cache on disk.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_MODEL_CACHE_DIR, max_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def key(self, kind, data, **params):
+        """
+        Builds the cache key of a `kind` model ('ARIMA', 'SARIMA', 'LSTM') fitted on `data`.
+        """
+        digest = hashlib.sha256()
+        digest.update(kind.encode())
+
+        for array in data if isinstance(data, tuple) else (data,):
+            # Fitted statsmodels results remember the index, so it is part of the key
+            if hasattr(array, 'index'):
+                digest.update(pd.util.hash_pandas_object(array.index).to_numpy().tobytes())
+            array = np.ascontiguousarray(np.asarray(array, dtype=float))
+            digest.update(str(array.shape).encode())
+            digest.update(array.tobytes())
+
+        digest.update(repr(sorted(params.items())).encode())
+        for library in MODEL_LIBRARIES.get(kind, ()):
+            digest.update(f"{library}={_library_version(library)}".encode())
+
+        return f"{kind.lower()}-{digest.hexdigest()[:32]}"
+
+    def _path(self, key, keras_format):
+        return os.path.join(self.cache_dir, key + ('.keras' if keras_format else '.pkl'))
+
+    def get(self, key):
+        """
+        Returns the cached model for `key`, or None on a miss.
+        """
+        for keras_format in (False, True):
+            path = self._path(key, keras_format)
+            if not os.path.exists(path):
+                continue
+            try:
+                model = load_model_file(path)
+            except Exception as e:
+                print(f"Ignoring unreadable cached model {path}: {e}")
+                return None
+
+            # Touch the file so eviction sees it as recently used
+            os.utime(path)
+            return model
+        return None
+
+    def put(self, key, model):
+        """
+        Stores `model` under `key` and evicts old entries if the cache is full.
+        """
+        save_model_file(model, self.cache_dir, key)
+        self.evict()
+
+    def evict(self):
+        """
+        Removes least recently used models until the cache fits in `max_bytes`.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('tmp-'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_or_fit(self, key, fit):
+        """
+        Returns the cached model for `key`, calling `fit()` and caching its result on a miss.
+        """
+        model = self.get(key)
+        if model is None:
+            model = fit()
+            self.put(key, model)
+        return model
@@ -0,0 +1,160 @@
+import itertools
+import multiprocessing
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+
+def differencing_order(series, max_d=2, test='kpss'):
+    """
+    Estimates the order of differencing with a unit-root test, once per asset.
+    """
+    from pmdarima.arima import ndiffs
+
+    return ndiffs(np.asarray(series, dtype=float), test=test, max_d=max_d)
+
+
+def fit_candidate(series, order, information_criterion='aic', return_model=False):
+    """
+    Fits one ARIMA(p, d, q) candidate.
+
+    Returns:
+        tuple: (score, fit seconds, fitted model or None).
+    """
+    from pmdarima.arima import ARIMA
+
+    start = time.process_time()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = ARIMA(order=order, suppress_warnings=True).fit(series)
+    score = getattr(model, information_criterion)()
+    return score, time.process_time() - start, model if return_model else None
+
+
+def candidate_orders(d, max_p=3, max_q=3):
+    return [(p, d, q) for p, q in itertools.product(range(max_p + 1), range(max_q + 1))]
+
+
+def select_orders(series_dict, max_p=3, max_q=3, max_d=2, time_budget=60.0, information_criterion='aic',
+                  max_workers=None):
+    """
+    Selects ARIMA orders for many assets with one shared process pool.
+
+    The differencing order of every asset is found once with a unit-root test
+    and reused by all of its (p, d, q) candidates. Candidates of all assets are
+    interleaved in the pool; once the fitting time spent on an asset exceeds
+    `time_budget` seconds its remaining candidates are cancelled and the best
+    order found so far is kept. The winning order is then refitted and returned.
+
+    This is a standalone batch API: fit_arima, forecast_models and run_batch
+    keep using auto_arima's stepwise search. Use the selected orders with
+    fit_sarima, or pass the returned models on directly.
+
+    Parameters:
+        series_dict (dict): Asset name -> training Series.
+        max_p (int): Largest AR order tried.
+        max_q (int): Largest MA order tried.
+        max_d (int): Largest differencing order tried by the unit-root test.
+        time_budget (float): CPU seconds of candidate fitting allowed per asset.
+        information_criterion (str): 'aic', 'aicc', 'bic' or 'hqic'.
+        max_workers (int): Process pool size. 1 runs sequentially in this process.
+
+    Returns:
+        tuple: (models, report) where `models` maps each successful asset to its
+            fitted pmdarima ARIMA, and `report` is a DataFrame with the selected
+            order, score, number of candidates fitted/failed/skipped, fitting time
+            and the error of every asset that failed, including a failed final refit.
+    """
+    status = {}
+    tasks = []
+    for asset, series in series_dict.items():
+        status[asset] = {'asset': asset, 'order': None, 'score': np.inf, 'fitted': 0, 'failed': 0,
+                         'skipped': 0, 'fit_seconds': 0.0, 'error': None}
+        try:
+            d = differencing_order(series, max_d=max_d)
+        except Exception as e:
+            status[asset]['error'] = f"unit-root test failed: {e}"
+            continue
+        tasks.append([(asset, order) for order in candidate_orders(d, max_p, max_q)])
+
+    # Round-robin across assets so every asset makes progress at the same pace
+    tasks = [task for group in itertools.zip_longest(*tasks) for task in group if task is not None]
+
+    def record(asset, order, result=None, error=None):
+        entry = status[asset]
+        if error is not None:
+            entry['failed'] += 1
+            entry['error'] = entry['error'] or f"{order}: {error}"
+            return
+        score, seconds, _ = result
+        entry['fitted'] += 1
+        entry['fit_seconds'] += seconds
+        if np.isfinite(score) and score < entry['score']:
+            entry['score'], entry['order'] = score, order
+
+    if max_workers == 1:
+        for asset, order in tasks:
+            if status[asset]['fit_seconds'] > time_budget:
+                status[asset]['skipped'] += 1
+                continue
+            try:
+                record(asset, order, fit_candidate(series_dict[asset], order, information_criterion))
+            except Exception as e:
+                record(asset, order, error=e)
+        finals, final_errors = {}, {}
+        for asset, entry in status.items():
+            if entry['order'] is None:
+                continue
+            try:
+                finals[asset] = fit_candidate(series_dict[asset], entry['order'], information_criterion, True)[2]
+            except Exception as e:
+                final_errors[asset] = e
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = {
+                executor.submit(fit_candidate, series_dict[asset], order, information_criterion): (asset, order)
+                for asset, order in tasks
+            }
+            for future in as_completed(futures):
+                asset, order = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    record(asset, order, future.result())
+                except Exception as e:
+                    record(asset, order, error=e)
+
+                # Out of budget: drop this asset's candidates that have not started yet
+                if status[asset]['fit_seconds'] > time_budget:
+                    for other, (other_asset, _) in futures.items():
+                        if other_asset == asset and other.cancel():
+                            status[asset]['skipped'] += 1
+
+            final_futures = {
+                asset: executor.submit(fit_candidate, series_dict[asset], entry['order'], information_criterion, True)
+                for asset, entry in status.items() if entry['order'] is not None
+            }
+            finals, final_errors = {}, {}
+            for asset, future in final_futures.items():
+                try:
+                    finals[asset] = future.result()[2]
+                except Exception as e:
+                    final_errors[asset] = e
+
+    # A winner that cannot be refitted leaves the asset without a model
+    for asset, error in final_errors.items():
+        status[asset]['error'] = f"final refit of {status[asset]['order']} failed: {error}"
+
+    report = pd.DataFrame.from_records(list(status.values())).set_index('asset')
+    report['score'] = report['score'].replace(np.inf, np.nan)
+    report['status'] = np.where(report.index.isin(list(finals)), 'ok', 'failed')
+
+    failed = report.index[report['status'] == 'failed']
+    if len(failed):
+        print(f"Order search failed for {len(failed)} asset(s): {', '.join(map(str, failed))}")
+
+    return finals, report
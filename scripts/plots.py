@@ -1,12 +1,57 @@
-import pandas as pd  # type: ignore
-import matplotlib.pyplot as plt  # type: ignore
-import seaborn as sns  # type: ignore
-import matplotlib.pyplot as plt
-from scipy.stats import zscore
-import seaborn as sns
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.seasonal import seasonal_decompose # type: ignore
+from scripts.covariance import correlation_from_covariance, get_covariance
+from scripts.lazy_imports import lazy_module
+from scripts.portfolio import RETURN_SUFFIX, return_columns
+from scripts.rendering import plotting_enabled, render
+from scripts.rolling import rolling_features
+from scripts.simulation import simulate_portfolio_returns
+
+# matplotlib and seaborn load on the first chart actually drawn
+plt = lazy_module('matplotlib.pyplot')
+sns = lazy_module('seaborn')
+
+
+def _dates(data):
+    return pd.to_datetime(data['Date']) if 'Date' in data.columns else data.index
+
+
+def _observed_features(stockData, tickers, field, **kwargs):
+    # One rolling_features pass over all tickers, keeping only the dates each ticker was observed on
+    prices = {ticker: pd.Series(data[field].to_numpy(), index=_dates(data)) for data, ticker in zip(stockData, tickers)}
+    features = rolling_features(prices, field=field, **kwargs)
+    return features[features['price'].notna()]
+
+
+def _ticker_features(stockData, tickers, field, **kwargs):
+    # The same pass split back into one frame per ticker aligned with that ticker's rows
+    features = _observed_features(stockData, tickers, field, **kwargs)
+    return [features.xs(ticker, level='Ticker').reindex(_dates(data)) for data, ticker in zip(stockData, tickers)]
+
+
+def join_features(stockData, tickers, features, dropna=False):
+    """
+    Joins tidy (Date, Ticker) features onto each ticker's price frame.
+
+    Parameters:
+        stockData (list of DataFrames): Price frames with a 'Date' column or a Date index.
+        tickers (list of str): Corresponding stock ticker symbols.
+        features (DataFrame): Features indexed by (Date, Ticker), e.g. from dailyReturn.
+        dropna (bool): Drop the rows where any feature is missing.
+
+    Returns:
+        list of DataFrames: Copies of the frames with the feature columns added.
+    """
+    joined = []
+    for data, ticker in zip(stockData, tickers):
+        values = features.xs(ticker, level='Ticker').reindex(_dates(data))
+        data = data.copy()
+        for column in values.columns:
+            data[column] = values[column].to_numpy()
+        if dropna:
+            data = data[values.notna().all(axis=1).to_numpy()]
+        joined.append(data)
+    return joined
 
 
 def closePriceOverTime(stockData, tickers):
@@ -16,7 +61,16 @@ def closePriceOverTime(stockData, tickers):
     Parameters:
         stockData (list of DataFrames): List of stock price DataFrames (each with 'Date' and 'Adj Close' columns).
         tickers (list of str): Corresponding stock ticker symbols.
+
+    Returns:
+        DataFrame: Date-indexed adjusted close prices, one column per ticker.
     """
+    prices = pd.concat({ticker: pd.Series(data['Adj Close'].to_numpy(), index=_dates(data))
+                        for data, ticker in zip(stockData, tickers)}, axis=1).sort_index()
+    prices.index.name = 'Date'
+    if not plotting_enabled():
+        return prices
+
     sns.set_style("whitegrid")
 
     for data, ticker in zip(stockData, tickers):
@@ -37,47 +91,69 @@ def closePriceOverTime(stockData, tickers):
         # Force x-axis range from 2015 to 2025
         plt.xlim(pd.Timestamp("2015-01-01"), pd.Timestamp("2025-01-31"))
 
-        plt.show()
+        render(f'{ticker}_adjusted_close')
 
+    return prices
 
 
 def dailyReturn(stockData,tickers):
+    """
+    Plots the daily returns of every ticker.
+
+    Returns:
+        DataFrame: 'Daily_Return' indexed by (Date, Ticker); join_features adds it to the price frames.
+    """
     # Calculate daily percentage change for volatility analysis
-    for data, ticker in zip(stockData, tickers):
-        data['Daily_Return'] = data['Close'].pct_change()
-        data['Daily_Return'].fillna(0, inplace=True)
-        
+    features = _observed_features(stockData, tickers, 'Close', windows=(), stats=())
+    returns = features[['return']].fillna(0).rename(columns={'return': 'Daily_Return'})
+    for ticker in tickers:
+        if not plotting_enabled():
+            break
+        daily = returns.xs(ticker, level='Ticker')['Daily_Return']
+
         # Plot daily returns
         plt.figure(figsize=(12, 6))
-        plt.plot(data['Date'], data['Daily_Return'], label=f'{ticker} Daily Returns')
+        plt.plot(daily.index, daily, label=f'{ticker} Daily Returns')
         plt.title(f'{ticker} Daily Returns Over Time')
         plt.xlabel('Date')
         plt.ylabel('Daily Return')
         plt.legend()
         plt.xlim(pd.Timestamp("2015-01-01"), pd.Timestamp("2025-01-31"))
-        plt.show()
+        render(f'{ticker}_daily_returns')
 
+    return returns
 
 
 def rollingAvgAndStd(stockData,tickers):
+    """
+    Plots the 30-day rolling mean and standard deviation of every ticker's close.
+
+    Returns:
+        DataFrame: 'Rolling_Mean' and 'Rolling_Std' indexed by (Date, Ticker);
+            join_features adds them to the price frames.
+    """
     # Calculate rolling averages and standard deviations
-    for data, ticker in zip(stockData,tickers):
-        data['Rolling_Mean'] = data['Close'].rolling(window=30).mean()
-        data['Rolling_Std'] = data['Close'].rolling(window=30).std()
-        data['Rolling_Mean'].fillna(0, inplace=True) 
-        data['Rolling_Std'].fillna(0, inplace=True)
-        
+    features = _observed_features(stockData, tickers, 'Close', windows=(30,), stats=('mean', 'std'))
+    rolling = features[['mean_30', 'std_30']].fillna(0).rename(columns={'mean_30': 'Rolling_Mean', 'std_30': 'Rolling_Std'})
+    for ticker in tickers:
+        if not plotting_enabled():
+            break
+        close = features.xs(ticker, level='Ticker')['price']
+        feature = rolling.xs(ticker, level='Ticker')
+
         # Plot rolling mean and std
         plt.figure(figsize=(12, 6))
-        plt.plot(data['Date'], data['Close'], label='Close Price')
-        plt.plot(data['Date'], data['Rolling_Mean'], label='30-Day Rolling Mean')
-        plt.plot(data['Date'], data['Rolling_Std'], label='30-Day Rolling Std', linestyle='--')
+        plt.plot(close.index, close, label='Close Price')
+        plt.plot(feature.index, feature['Rolling_Mean'], label='30-Day Rolling Mean')
+        plt.plot(feature.index, feature['Rolling_Std'], label='30-Day Rolling Std', linestyle='--')
         plt.title(f'{ticker} Volatility with Rolling Mean & Standard Deviation')
         plt.xlabel('Date')
         plt.ylabel('Price / Volatility')
         plt.legend()
         plt.xlim(pd.Timestamp("2015-01-01"), pd.Timestamp("2025-01-31"))
-        plt.show()
+        render(f'{ticker}_rolling_mean_std')
+
+    return rolling
 
 
 def detect_outliers(stockData, tickers):
@@ -88,7 +164,10 @@ def detect_outliers(stockData, tickers):
         stockData (list of DataFrames): List of stock price DataFrames (each with 'Date' and 'Adj Close' columns).
         tickers (list of str): Corresponding stock ticker symbols.
     """
-    for data, ticker in zip(stockData, tickers):
+    # Full-sample mean and std of every ticker in one pass
+    features = _ticker_features(stockData, tickers, 'Adj Close', windows=(None,), stats=('mean', 'std'))
+
+    for data, ticker, feature in zip(stockData, tickers, features):
         data = data.copy()  # Avoid modifying the original DataFrame
         
         # Ensure Date column exists and is set as index
@@ -97,20 +176,21 @@ def detect_outliers(stockData, tickers):
             data = data.set_index('Date')
 
         # Compute Z-score
-        data['Z-Score'] = (data['Adj Close'] - data['Adj Close'].mean()) / data['Adj Close'].std()
+        data['Z-Score'] = (data['Adj Close'] - feature['mean_full'].iloc[-1]) / feature['std_full'].iloc[-1]
         outliers = data[data['Z-Score'].abs() > 3]  # Outliers: Z-score > 3 or < -3
 
         # Plot Adjusted Close Price with outliers
-        plt.figure(figsize=(12, 6))
-        plt.plot(data.index, data['Adj Close'], label=f'{ticker} Adjusted Close Price', color='blue', linewidth=1.5)
-        plt.scatter(outliers.index, outliers['Adj Close'], color='red', label='Outliers', zorder=5)
-        plt.title(f'{ticker} Outliers in Adjusted Close Price', fontsize=14)
-        plt.xlabel('Date', fontsize=12)
-        plt.ylabel('Adjusted Close Price', fontsize=12)
-        plt.legend()
-        plt.xticks(rotation=45)
-        plt.grid(True)
-        plt.show()
+        if plotting_enabled():
+            plt.figure(figsize=(12, 6))
+            plt.plot(data.index, data['Adj Close'], label=f'{ticker} Adjusted Close Price', color='blue', linewidth=1.5)
+            plt.scatter(outliers.index, outliers['Adj Close'], color='red', label='Outliers', zorder=5)
+            plt.title(f'{ticker} Outliers in Adjusted Close Price', fontsize=14)
+            plt.xlabel('Date', fontsize=12)
+            plt.ylabel('Adjusted Close Price', fontsize=12)
+            plt.legend()
+            plt.xticks(rotation=45)
+            plt.grid(True)
+            render(f'{ticker}_outliers')
 
         # Print Outliers DataFrame in requested format
         print(f"\nOutliers for {ticker}:")
@@ -174,11 +254,21 @@ def remove_outliers(stockData, tickers, threshold=3):
 
 
 def calc_daily_return(stockData,tickers):
-    for data, ticker in zip(stockData, tickers):
-        data['Daily Return'] = data['Adj Close'].pct_change() * 100 
-        data.dropna(inplace=True)
+    """
+    Daily percentage change of every ticker's adjusted close.
+
+    Returns:
+        DataFrame: 'Daily Return' in percent indexed by (Date, Ticker), without the
+            first day of each ticker; join_features(..., dropna=True) adds it to the
+            price frames.
+    """
+    features = _observed_features(stockData, tickers, 'Adj Close', windows=(), stats=())
+    return (features[['return']] * 100).rename(columns={'return': 'Daily Return'}).dropna()
 
 def plot_daily_percentage(stockData, tickers):
+    if not plotting_enabled():
+        return
+
     for data, ticker in zip(stockData, tickers):
         plt.figure(figsize=(10, 6))
         plt.plot(data.index, data['Daily Return'], label=f'{ticker} Daily Returns')
@@ -191,7 +281,7 @@ def plot_daily_percentage(stockData, tickers):
 
         # Format the x-axis to show readable dates
         plt.xticks(rotation=45)  # Rotate labels for better readability
-        plt.show()
+        render(f'{ticker}_daily_percentage')
 
 
 def plot_significant_anomalies(stockData,tickers):
@@ -202,16 +292,17 @@ def plot_significant_anomalies(stockData,tickers):
         low_returns = data[data['Daily Return'] < -threshold]
 
         # Plot high and low returns
-        plt.figure(figsize=(10, 6))
-        plt.plot(data['Daily Return'],  label=f'{ticker} Daily Returns')
-        plt.scatter(high_returns.index, high_returns['Daily Return'], color='green', label='High Returns', zorder=5)
-        plt.scatter(low_returns.index, low_returns['Daily Return'], color='red', label='Low Returns', zorder=5)
-        plt.title(f'{ticker}Days with Unusually High/Low Returns')
-        plt.xlabel('Date')
-        plt.ylabel('Daily Return (%)')
-        plt.legend()
-        plt.grid(True)
-        plt.show()
+        if plotting_enabled():
+            plt.figure(figsize=(10, 6))
+            plt.plot(data['Daily Return'],  label=f'{ticker} Daily Returns')
+            plt.scatter(high_returns.index, high_returns['Daily Return'], color='green', label='High Returns', zorder=5)
+            plt.scatter(low_returns.index, low_returns['Daily Return'], color='red', label='Low Returns', zorder=5)
+            plt.title(f'{ticker}Days with Unusually High/Low Returns')
+            plt.xlabel('Date')
+            plt.ylabel('Daily Return (%)')
+            plt.legend()
+            plt.grid(True)
+            render(f'{ticker}_return_anomalies')
 
         print(f"{ticker}High Returns for:")
         print(high_returns[['Daily Return']])
@@ -224,30 +315,54 @@ def plot_significant_anomalies(stockData,tickers):
 
     
 def timeSeriesDecomposition(stockData,tickers):
+    """
+    Decomposes every ticker's close into trend, seasonal (yearly) and residual parts and plots them.
+
+    Returns:
+        dict: Ticker -> statsmodels DecomposeResult.
+    """
     # Time Series Decomposition
+    from statsmodels.tsa.seasonal import seasonal_decompose
+
+    decompositions = {}
     for data, ticker in zip(stockData,tickers):
-        decomposition = seasonal_decompose(data['Close'], model='additive', period=252)
-        plt.figure(figsize=(12,6))
-        decomposition.plot()
+        decomposition = decompositions[ticker] = seasonal_decompose(data['Close'], model='additive', period=252)
+        if not plotting_enabled():
+            continue
+        fig = decomposition.plot()
+        fig.set_size_inches(12, 6)
         plt.suptitle(f'{ticker} Time Series Decomposition')
         plt.xlim(pd.Timestamp("2015-01-01"), pd.Timestamp("2025-01-31"))
-        plt.show()
+        render(f'{ticker}_decomposition', fig)
 
+    return decompositions
 
 
 def volatility_rolling(window_size,stockData,tickers):
+    """
+    Rolling mean and standard deviation of every ticker's adjusted close, plotted per ticker.
+
+    Returns:
+        DataFrame: 'Rolling_Mean' and 'Rolling_Std' indexed by (Date, Ticker);
+            join_features adds them to the price frames.
+    """
     # Analyze volatility for each asset
-    for data, ticker in zip(stockData,tickers):
-        # Calculate the rolling mean and standard deviation for the adjusted close price
-        rolling_mean = data['Adj Close'].rolling(window=window_size).mean()
-        rolling_std = data['Adj Close'].rolling(window=window_size).std()
+    # Calculate the rolling mean and standard deviation of the adjusted close price for all assets at once
+    features = _observed_features(stockData, tickers, 'Adj Close', windows=(window_size,), stats=('mean', 'std'))
+    rolling = features[[f'mean_{window_size}', f'std_{window_size}']].set_axis(['Rolling_Mean', 'Rolling_Std'], axis=1)
+
+    for data, ticker in zip(stockData, tickers):
+        if not plotting_enabled():
+            break
+        rolling_mean = rolling.xs(ticker, level='Ticker')['Rolling_Mean']
+        rolling_std = rolling.xs(ticker, level='Ticker')['Rolling_Std']
 
         # Plot the adjusted close price along with rolling mean and rolling standard deviation
         plt.figure(figsize=(12, 8))
 
         # Plot the adjusted close price
         plt.subplot(311)
-        plt.plot(data['Adj Close'], label=f'{ticker} Adjusted Close', color='black')
+        plt.plot(_dates(data), data['Adj Close'], label=f'{ticker} Adjusted Close', color='black')
         plt.title(f'{ticker} - Adjusted Close Price')
         plt.legend()
 
@@ -264,8 +379,9 @@ def volatility_rolling(window_size,stockData,tickers):
         plt.legend()
 
         plt.tight_layout()
-        plt.show()
+        render(f'{ticker}_rolling_volatility')
 
+    return rolling
 
 
 def varAndSharpeRatio(stockData, tickers):
@@ -287,23 +403,24 @@ def varAndSharpeRatio(stockData, tickers):
         sharpe_ratio = mean_return / std_dev_return * np.sqrt(252)  # 252 trading days
         Sharpe_ratios[ticker] = sharpe_ratio
 
-    # ✅ Create VaR Bar Chart
-    plt.figure(figsize=(8, 6))
-    plt.bar(VaRs.keys(), VaRs.values(), color='red')
-    plt.xlabel('Ticker')
-    plt.ylabel('VaR (Lower is Riskier)')
-    plt.title('Value at Risk (VaR) at 5% Confidence Level')
-    plt.grid(axis='y')
-    plt.show()
-
-    # ✅ Create Sharpe Ratio Bar Chart
-    plt.figure(figsize=(8, 6))
-    plt.bar(Sharpe_ratios.keys(), Sharpe_ratios.values(), color='purple')
-    plt.xlabel('Ticker')
-    plt.ylabel('Sharpe Ratio (Higher is Better)')
-    plt.title('Sharpe Ratios of Stocks')
-    plt.grid(axis='y')
-    plt.show()
+    if plotting_enabled():
+        # ✅ Create VaR Bar Chart
+        plt.figure(figsize=(8, 6))
+        plt.bar(VaRs.keys(), VaRs.values(), color='red')
+        plt.xlabel('Ticker')
+        plt.ylabel('VaR (Lower is Riskier)')
+        plt.title('Value at Risk (VaR) at 5% Confidence Level')
+        plt.grid(axis='y')
+        render('value_at_risk')
+
+        # ✅ Create Sharpe Ratio Bar Chart
+        plt.figure(figsize=(8, 6))
+        plt.bar(Sharpe_ratios.keys(), Sharpe_ratios.values(), color='purple')
+        plt.xlabel('Ticker')
+        plt.ylabel('Sharpe Ratio (Higher is Better)')
+        plt.title('Sharpe Ratios of Stocks')
+        plt.grid(axis='y')
+        render('sharpe_ratios')
 
     # ✅ Print Values
     print("\nValue at Risk (VaR) at 5% Confidence Level:")
@@ -314,10 +431,14 @@ def varAndSharpeRatio(stockData, tickers):
     for ticker, value in Sharpe_ratios.items():
         print(f"{ticker}: {value:.4f}")
 
+    return VaRs, Sharpe_ratios
+
 
 def correlation_returns(daily_returns):
-    # Calculate the correlation matrix
-    corr_matrix = daily_returns.corr()
+    # Calculate the correlation matrix from the (cached) covariance matrix
+    corr_matrix = correlation_from_covariance(get_covariance(daily_returns))
+    if not plotting_enabled():
+        return corr_matrix
 
     # Plotting the correlation matrix heatmap
     plt.figure(figsize=(8, 6))
@@ -325,58 +446,78 @@ def correlation_returns(daily_returns):
     plt.title('Correlation Matrix Heatmap')
     plt.xticks(rotation=45)
     plt.yticks(rotation=45)
-    plt.show()
+    render('correlation_heatmap')
+    return corr_matrix
 
 
 def covariance_returns(daily_returns):
-    # Calculate the covariance matrix
-    cov_matrix = daily_returns.cov()
-
+    # Calculate the covariance matrix (cached, shared with the optimizers)
+    cov_matrix = get_covariance(daily_returns)
+    if not plotting_enabled():
+        return cov_matrix
 
     plt.figure(figsize=(8, 6))
     sns.heatmap(cov_matrix, annot=True, fmt=".8f", cmap='coolwarm', square=True, cbar_kws={"shrink": .8})
     plt.title('Covariance Matrix Heatmap')
     plt.xticks(rotation=45)
     plt.yticks(rotation=45)
-    plt.show()
+    render('covariance_heatmap')
+    return cov_matrix
+
+def daily_plot_VaR(df, asset_vars, asset='TSLA'):
+    """
+    Plots the daily return distribution of `asset` with its VaR.
+
+    Parameters:
+        df (DataFrame): Frame with '<TICKER>_daily_return' columns.
+        asset_vars (dict): Ticker -> historical VaR, as returned by total_portfolio.
+        asset (str): Ticker to plot.
+    """
+    if asset not in asset_vars:
+        raise KeyError(f"No VaR for {asset!r}; available: {sorted(asset_vars)}")
+    if not plotting_enabled():
+        return
 
-def daily_plot_VaR(df,var_Tesla):
+    var = asset_vars[asset]
     plt.figure(figsize=(10, 6))
-    plt.hist(df['TSLA_daily_return'].dropna(), bins=50, color='blue', edgecolor='black', alpha=0.7)
-    plt.axvline(var_Tesla, color='red', linestyle='dashed', linewidth=2, label=f'VaR (95%): {var_Tesla:.4f}')
-    plt.title("Tesla's Daily Returns Distribution with VaR at 95% Confidence")
+    plt.hist(df[f'{asset}{RETURN_SUFFIX}'].dropna(), bins=50, color='blue', edgecolor='black', alpha=0.7)
+    plt.axvline(var, color='red', linestyle='dashed', linewidth=2, label=f'VaR (95%): {var:.4f}')
+    plt.title(f"{asset} Daily Returns Distribution with VaR at 95% Confidence")
     plt.xlabel('Daily Return')
     plt.ylabel('Frequency')
     plt.legend()
-    plt.show()
+    render(f'{asset.lower()}_var_distribution')
 
 
 
 def daily_annual_sharpe_ratio(sharpe_ratios):
+    if not plotting_enabled():
+        return
+
     # Plot the Sharpe ratios
     plt.figure(figsize=(8, 5))
     plt.bar(sharpe_ratios.keys(), sharpe_ratios.values(), color=['coral', 'skyblue'])
     plt.title("Comparison of Daily and Annualized Sharpe Ratios")
     plt.ylabel("Sharpe Ratio")
     plt.ylim(0, max(sharpe_ratios.values()) * 1.2)
-    plt.show()
+    render('daily_annual_sharpe_ratio')
 
 
 
-def montecarlo_simulation(df,mean_returns,cov_matrix,optimized_weights):
+def montecarlo_simulation(df,mean_returns,cov_matrix,optimized_weights, seed=None):
     dataset_size = len(df)  # Number of rows (days) in your dataset
     num_days = len(df)  # The number of data points (days) in the dataset
 
+    # Only a few paths are drawn for the chart; use scripts.simulation.simulate_portfolio for risk numbers
     num_simulations = min(1000, int(dataset_size / 10))
 
-    simulated_portfolios = np.zeros((num_simulations, num_days))
-
-    for i in range(num_simulations):
-        # Generate random returns for each asset (TSLA, BND, SPY)
-        random_returns = np.random.multivariate_normal(mean_returns, cov_matrix, num_days)
-        
-        # Calculate the portfolio returns for each day (weighted sum of returns)
-        simulated_portfolios[i] = np.dot(random_returns, optimized_weights)
+    # Generate all paths in one batched draw of the portfolio return distribution
+    simulated_portfolios = simulate_portfolio_returns(mean_returns, cov_matrix, optimized_weights,
+                                                      num_simulations, num_days, seed=seed)
+    # Compound the daily returns of each simulation to see the total portfolio growth over time
+    cumulative_returns = np.cumprod(1 + simulated_portfolios, axis=1) - 1
+    if not plotting_enabled():
+        return simulated_portfolios, cumulative_returns
 
     # Plot the simulated portfolio returns
     plt.figure(figsize=(10, 6))
@@ -384,10 +525,7 @@ def montecarlo_simulation(df,mean_returns,cov_matrix,optimized_weights):
     plt.title('Monte Carlo Simulation: Simulated Portfolio Performance')
     plt.xlabel('Days')
     plt.ylabel('Portfolio Daily Return')
-    plt.show()
-
-      # Calculate the cumulative return for each simulation to see the total portfolio growth over time
-    cumulative_returns = np.cumsum(simulated_portfolios, axis=1)
+    render('montecarlo_daily_returns')
 
     # Plot the cumulative returns to visualize portfolio growth over time
     plt.figure(figsize=(10, 6))
@@ -395,75 +533,82 @@ def montecarlo_simulation(df,mean_returns,cov_matrix,optimized_weights):
     plt.title('Monte Carlo Simulation: Cumulative Portfolio Return')
     plt.xlabel('Days')
     plt.ylabel('Cumulative Portfolio Return')
-    plt.show()
+    render('montecarlo_cumulative_returns')
+    return simulated_portfolios, cumulative_returns
 
 
 
 def cumulative_returns_indiv_assets(df, weighted_daily_return):
-    cumulative_returns = (1 + weighted_daily_return).cumprod()
-    cumulative_returns_TESLA = (1 + df['TSLA_daily_return']).cumprod()
-    cumulative_returns_BND = (1 + df['BND_daily_return']).cumprod()
-    cumulative_returns_SPY = (1 + df['SPY_daily_return']).cumprod()
-
-    # Plot cumulative returns
-    plt.figure(figsize=(10, 6))
-    plt.plot(cumulative_returns, label="Optimized Portfolio", color='skyblue')
-    plt.plot(cumulative_returns_TESLA, label="Tesla (TSLA)", color='gray')
-    plt.plot(cumulative_returns_BND, label="Bond (BND)", color='green')
-    plt.plot(cumulative_returns_SPY, label="S&P 500 (SPY)", color='orange')
+    """
+    Cumulative returns of the optimized portfolio and of every asset in `df`.
 
-    plt.title("Cumulative Returns of Portfolio and Individual Assets")
-    plt.xlabel("Days")
-    plt.ylabel("Cumulative Return")
-    plt.legend(loc="upper left")
-    plt.grid(True)
-    plt.show()
+    Parameters:
+        df (DataFrame): Frame with one '<ASSET>_daily_return' column per asset.
+        weighted_daily_return (Series): Daily returns of the optimized portfolio.
 
-def cumulative_returns_indiv_assets(df, weighted_daily_return):
-    cumulative_returns = (1 + weighted_daily_return).cumprod()
-    cumulative_returns_TESLA = (1 + df['TSLA_daily_return']).cumprod()
-    cumulative_returns_BND = (1 + df['BND_daily_return']).cumprod()
-    cumulative_returns_SPY = (1 + df['SPY_daily_return']).cumprod()
+    Returns:
+        DataFrame: 'Portfolio' and one column per asset, growth of 1 over time.
+    """
+    columns = return_columns(df)
+    cumulative_returns = (1 + df[columns]).cumprod().rename(columns=lambda c: c[:-len(RETURN_SUFFIX)])
+    cumulative_returns.insert(0, 'Portfolio', (1 + weighted_daily_return).cumprod())
+    if not plotting_enabled():
+        return cumulative_returns
 
     # Plot cumulative returns
     plt.figure(figsize=(10, 6))
-    plt.plot(cumulative_returns, label="Optimized Portfolio", color='skyblue')
-    plt.plot(cumulative_returns_TESLA, label="Tesla (TSLA)", color='red')
-    plt.plot(cumulative_returns_BND, label="Bond (BND)", color='green')
-    plt.plot(cumulative_returns_SPY, label="S&P 500 (SPY)", color='orange')
+    plt.plot(cumulative_returns['Portfolio'], label="Optimized Portfolio", color='skyblue')
+    for asset in cumulative_returns.columns[1:]:
+        plt.plot(cumulative_returns[asset], label=asset)
 
     plt.title("Cumulative Returns of Portfolio and Individual Assets")
     plt.xlabel("Days")
     plt.ylabel("Cumulative Return")
     plt.legend(loc="upper left")
     plt.grid(True)
-    plt.show()
-
+    render('cumulative_returns')
+    return cumulative_returns
 
 
 def risk_return_analysis(df, mean_returns, average_portfolio_return, portfolio_volatility):
-    # Plot Risk vs Return for the assets and portfolio
-    returns = [mean_returns['TSLA_daily_return'], mean_returns['BND_daily_return'], mean_returns['SPY_daily_return'], average_portfolio_return]
-    volatility = [df['TSLA_daily_return'].std(), df['BND_daily_return'].std(), df['SPY_daily_return'].std(), portfolio_volatility]
+    """
+    Daily volatility and expected return of every asset in `df` and of the portfolio.
+
+    Parameters:
+        df (DataFrame): Frame with one '<ASSET>_daily_return' column per asset.
+        mean_returns (Series): Expected daily return, indexed by the return columns.
+        average_portfolio_return (float): Expected daily return of the portfolio.
+        portfolio_volatility (float): Daily volatility of the portfolio.
+
+    Returns:
+        DataFrame: 'Return' and 'Volatility' per asset, with the portfolio as the last row.
+    """
+    # Risk vs Return for the assets and portfolio
+    columns = return_columns(df)
+    risk_return = pd.DataFrame({'Return': mean_returns[columns].to_numpy(), 'Volatility': df[columns].std().to_numpy()},
+                               index=[c[:-len(RETURN_SUFFIX)] for c in columns])
+    risk_return.loc['Portfolio'] = [average_portfolio_return, portfolio_volatility]
+    if not plotting_enabled():
+        return risk_return
 
     plt.figure(figsize=(10, 6))
 
     # Scatter plot for individual assets with separate colors and labels
-    plt.scatter(volatility[0], returns[0], color='skyblue', label='Tesla', s=100)
-    plt.scatter(volatility[1], returns[1], color='green', label='Bond', s=100)
-    plt.scatter(volatility[2], returns[2], color='orange', label='SPY', s=100)
+    for asset, row in risk_return.iloc[:-1].iterrows():
+        plt.scatter(row['Volatility'], row['Return'], label=asset, s=100)
 
     # Scatter plot for the optimized portfolio
     plt.scatter(portfolio_volatility, average_portfolio_return, color='blue', label="Optimized Portfolio", marker='x', s=100)
 
     # Add labels and legend
-    for i, txt in enumerate(['TSLA', 'BND', 'SPY', 'Portfolio']):
-        plt.annotate(txt, (volatility[i], returns[i]), textcoords="offset points", xytext=(0,10), ha='center')
+    for asset, row in risk_return.iterrows():
+        plt.annotate(asset, (row['Volatility'], row['Return']), textcoords="offset points", xytext=(0,10), ha='center')
 
     plt.title("Risk vs Return Analysis")
     plt.xlabel("Volatility (Risk)")
     plt.ylabel("Expected Return")
     plt.legend()
     plt.grid(True)
-    plt.show()
+    render('risk_return')
+    return risk_return
 
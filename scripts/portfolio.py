@@ -0,0 +1,102 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+RETURN_SUFFIX = '_daily_return'
+
+
+def return_columns(df):
+    """
+    Returns the '<ASSET>_daily_return' columns of a frame built by calculate_returns.
+    """
+    return [c for c in df.columns if str(c).endswith(RETURN_SUFFIX)]
+
+
+def portfolio_returns(returns, weights):
+    """
+    Computes weighted portfolio returns for one or many weight vectors in one matrix multiply.
+
+    Parameters:
+        returns (DataFrame or array): Asset returns of shape (T, N).
+        weights (array): Weights of shape (N,) or a batch of shape (K, N).
+
+    Returns:
+        Series of length T for a single weight vector (array if `returns` is an
+        array), otherwise an array of shape (T, K).
+    """
+    weights = np.asarray(weights, dtype=float)
+    values = np.asarray(returns, dtype=float) @ weights.T
+
+    if weights.ndim == 1 and isinstance(returns, pd.DataFrame):
+        return pd.Series(values, index=returns.index)
+    return values
+
+
+def value_at_risk(returns, confidence_level=0.95):
+    """
+    Historical and parametric (normal) VaR of every column, as return quantiles.
+
+    Returns:
+        tuple: (historical, parametric) arrays with one value per column.
+    """
+    values = np.asarray(returns, dtype=float)
+    historical = np.nanquantile(values, 1 - confidence_level, axis=0)
+    parametric = (NormalDist().inv_cdf(1 - confidence_level) * np.nanstd(values, axis=0, ddof=1)
+                  + np.nanmean(values, axis=0))
+    return historical, parametric
+
+
+def conditional_value_at_risk(returns, var):
+    """
+    Mean of the returns at or below VaR, per column.
+    """
+    values = np.asarray(returns, dtype=float)
+    tail = values <= var
+    return np.where(tail, values, 0).sum(axis=0) / np.maximum(tail.sum(axis=0), 1)
+
+
+def portfolio_statistics(returns, weights, risk_free_rate=0, confidence_level=0.95,
+                         periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Computes return, volatility, Sharpe ratio, VaR and CVaR for one or many portfolios.
+
+    Everything is evaluated with array operations over the (T, K) matrix of
+    portfolio returns, so scoring thousands of candidate weightings costs one
+    matrix multiply plus a few reductions. Rows with missing asset returns are
+    dropped first.
+
+    Parameters:
+        returns (DataFrame or array): Daily asset returns of shape (T, N).
+        weights (array): Weights of shape (N,) or a batch of shape (K, N).
+        risk_free_rate (float): Daily risk-free rate.
+        confidence_level (float): Confidence level of VaR and CVaR.
+        periods_per_year (int): Periods used to annualize.
+
+    Returns:
+        DataFrame: One row per weight vector.
+    """
+    values = np.asarray(returns, dtype=float)
+    values = values[~np.isnan(values).any(axis=1)]
+    batch = np.atleast_2d(np.asarray(weights, dtype=float))
+
+    portfolio = values @ batch.T
+    mean = portfolio.mean(axis=0)
+    volatility = portfolio.std(axis=0, ddof=1)
+    historical_var, parametric_var = value_at_risk(portfolio, confidence_level)
+
+    annual_return = (1 + mean) ** periods_per_year - 1
+    annual_volatility = volatility * np.sqrt(periods_per_year)
+
+    return pd.DataFrame({
+        'Average Return (Daily)': mean,
+        'Volatility (Daily)': volatility,
+        'Sharpe Ratio (Daily)': (mean - risk_free_rate) / volatility,
+        'Annualized Return': annual_return,
+        'Annualized Volatility': annual_volatility,
+        'Annualized Sharpe Ratio': annual_return / annual_volatility,
+        'VaR (Historical)': historical_var,
+        'VaR (Parametric)': parametric_var,
+        'CVaR': conditional_value_at_risk(portfolio, historical_var),
+    })
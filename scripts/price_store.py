@@ -0,0 +1,159 @@
+import json
+import os
+
+import pandas as pd # type: ignore
+
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+DEFAULT_CACHE_DIR = os.path.join('data', 'prices')
+
+
+def yfinance_source(ticker, start_date, end_date):
+    """
+    Downloads daily bars for one ticker from Yahoo Finance.
+
+    Parameters:
+        ticker (str): Ticker symbol.
+        start_date (str or Timestamp): First date to fetch (inclusive).
+        end_date (str or Timestamp): Last date to fetch (exclusive, as in yfinance).
+
+    Returns:
+        DataFrame: Bars indexed by Date with the columns in PRICE_COLUMNS.
+    """
+    import yfinance as yf # type: ignore
+
+    data = yf.download(ticker, start=start_date, end=end_date, progress=False)
+
+    # Newer yfinance versions return (Price, Ticker) columns even for one ticker
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+
+    return normalize_bars(data)
+
+
+def csv_source(directory):
+    """
+    Builds an offline price source reading '<directory>/<ticker>.csv' files.
+
+    Useful as a stand-in for yfinance in tests, fixtures and air-gapped runs.
+    Each CSV needs a 'Date' column and at least a 'Close' column.
+
+    Parameters:
+        directory (str): Folder holding one CSV file per ticker.
+
+    Returns:
+        callable: A source with the same signature as yfinance_source.
+    """
+    def source(ticker, start_date, end_date):
+        data = pd.read_csv(os.path.join(directory, f"{ticker}.csv"), parse_dates=['Date'], index_col='Date')
+        data = data.loc[(data.index >= pd.Timestamp(start_date)) & (data.index < pd.Timestamp(end_date))]
+        return normalize_bars(data)
+
+    return source
+
+
+def normalize_bars(data):
+    data = data.copy()
+    data.index = pd.to_datetime(data.index)
+    data.index.name = 'Date'
+
+    # If 'Adj Close' is missing, assume it's the same as 'Close'
+    if 'Adj Close' not in data.columns:
+        data['Adj Close'] = data['Close']
+    for column in PRICE_COLUMNS:
+        if column not in data.columns:
+            data[column] = float('nan')
+
+    # Ensure column order
+    return data[PRICE_COLUMNS].sort_index()
+
+
+def _paths(cache_dir, ticker):
+    base = os.path.join(cache_dir, ticker)
+    return base + '.parquet', base + '.json'
+
+
+def read_cache(ticker, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Reads the cached bars of a ticker.
+
+    Returns:
+        tuple: (DataFrame or None, (start, end) covered range or None).
+    """
+    data_path, meta_path = _paths(cache_dir, ticker)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    data = pd.read_parquet(data_path)
+    return data, (pd.Timestamp(meta['start']), pd.Timestamp(meta['end']))
+
+
+def write_cache(ticker, data, start, end, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Stores the bars of a ticker together with the [start, end) range they cover.
+
+    Files are written to a temporary name first and then renamed, so a crashed
+    run never leaves a half-written cache behind.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    data_path, meta_path = _paths(cache_dir, ticker)
+
+    data.to_parquet(data_path + '.tmp')
+    os.replace(data_path + '.tmp', data_path)
+
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump({'start': str(pd.Timestamp(start).date()), 'end': str(pd.Timestamp(end).date())}, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def load_prices(ticker, start_date, end_date, cache_dir=DEFAULT_CACHE_DIR, source=None):
+    """
+    Returns daily bars for a ticker, reading the on-disk cache first.
+
+    Only the part of [start_date, end_date) that is not already cached is
+    requested from the source; the new bars are appended to the cache.
+
+    Parameters:
+        ticker (str): Ticker symbol.
+        start_date (str or Timestamp): First date (inclusive).
+        end_date (str or Timestamp): Last date (exclusive).
+        cache_dir (str): Folder holding the Parquet cache. None disables caching.
+        source (callable): Price source, defaults to yfinance_source.
+
+    Returns:
+        DataFrame: Bars indexed by Date with the columns in PRICE_COLUMNS.
+    """
+    source = source or yfinance_source
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+
+    # Never mark today's (possibly incomplete) bar or future dates as cached
+    covered_until = min(end, pd.Timestamp.today().normalize())
+
+    if cache_dir is None:
+        return source(ticker, start, end)
+
+    cached, covered = read_cache(ticker, cache_dir)
+
+    if cached is None:
+        data = source(ticker, start, end)
+        covered_start, covered_end = start, covered_until
+    else:
+        covered_start, covered_end = covered
+        pieces = [cached]
+
+        # Fetch only the ranges on either side of what we already have
+        if start < covered_start:
+            pieces.insert(0, source(ticker, start, covered_start))
+        if end > covered_end:
+            pieces.append(source(ticker, covered_end, end))
+
+        frames = [p for p in pieces if not p.empty]
+        data = pd.concat(frames) if frames else cached
+        data = data[~data.index.duplicated(keep='last')].sort_index()
+        covered_start, covered_end = min(start, covered_start), max(covered_until, covered_end)
+
+    if (covered_start, covered_end) != covered:
+        write_cache(ticker, data, covered_start, covered_end, cache_dir)
+
+    return data.loc[(data.index >= start) & (data.index < end)]
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from scripts.covariance import StreamingCovariance
+from scripts.frontier import max_sharpe_portfolio, min_variance_portfolio
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _target_weights(strategy, mean, cov, previous, bounds, risk_free_rate):
+    if callable(strategy):
+        return np.asarray(strategy(mean, cov, previous), dtype=float)
+    if strategy == 'max_sharpe':
+        return max_sharpe_portfolio(mean, cov, risk_free_rate, bounds, initial_weights=previous)
+    if strategy == 'min_variance':
+        return min_variance_portfolio(mean, cov, bounds, initial_weights=previous)
+    if strategy == 'equal_weight':
+        return np.full(len(mean), 1 / len(mean))
+    raise ValueError(f"Unknown strategy {strategy!r}")
+
+
+def max_drawdown(equity):
+    """
+    Returns the drawdown series of an equity curve and its maximum.
+    """
+    drawdown = 1 - equity / equity.cummax()
+    return drawdown, drawdown.max()
+
+
+def rebalance_backtest(returns, lookback=252, rebalance_every=21, strategy='max_sharpe', cost_bps=10.0,
+                       bounds=(0, 1), risk_free_rate=0):
+    """
+    Backtests a portfolio re-optimized on a rolling lookback window.
+
+    The window mean and covariance are maintained by a StreamingCovariance:
+    moving the window adds the new rows and removes the oldest ones in
+    O(k * N^2) instead of recomputing the covariance from scratch.
+
+    On every rebalance date the strategy is re-optimized on the previous
+    `lookback` days, warm-started from the current (drifted) weights, and
+    transaction costs are charged on the traded weight. Between rebalances the
+    weights drift with the asset returns; each holding period is evaluated as
+    one vectorized block.
+
+    Parameters:
+        returns (DataFrame): Daily asset returns, e.g. the '<ASSET>_daily_return'
+            columns built by calculate_returns. Rows with missing values are dropped.
+        lookback (int): Days of history used for each optimization.
+        rebalance_every (int): Days between rebalances.
+        strategy (str or callable): 'max_sharpe', 'min_variance', 'equal_weight' or
+            a function (mean, cov, previous_weights) -> weights.
+        cost_bps (float): Transaction cost in basis points of traded value.
+        bounds (tuple): (min, max) weight of every asset.
+        risk_free_rate (float): Daily risk-free rate for the Sharpe ratio.
+
+    Returns:
+        dict: 'equity' (Series), 'returns' (net daily returns), 'drawdown' (Series),
+            'weights' (target weights per rebalance date), 'turnover' (per
+            rebalance date) and 'summary' (dict of headline statistics).
+    """
+    returns = returns.dropna()
+    values = returns.to_numpy(dtype=float)
+    n_days, n_assets = values.shape
+    if n_days <= lookback:
+        raise ValueError(f"Need more than {lookback} days of returns, got {n_days}")
+
+    moments = StreamingCovariance(n_assets)
+    moments.update(values[:lookback])
+
+    weights = np.zeros(n_assets)
+    net_returns = np.empty(n_days - lookback)
+    rebalance_dates, target_history, turnover = [], [], []
+    window_end = lookback
+
+    for start in range(lookback, n_days, rebalance_every):
+        # Slide the estimation window to [start - lookback, start)
+        if start > window_end:
+            moments.update(values[window_end:start])
+            moments.remove(values[window_end - lookback:start - lookback])
+            window_end = start
+
+        previous = weights if weights.sum() > 0 else None
+        target = _target_weights(strategy, moments.mean(), moments.cov(), previous, bounds, risk_free_rate)
+        traded = np.abs(target - weights).sum()
+
+        rebalance_dates.append(returns.index[start])
+        target_history.append(target)
+        turnover.append(traded)
+
+        # Hold until the next rebalance, letting the weights drift with the assets
+        end = min(start + rebalance_every, n_days)
+        growth = np.cumprod(1 + values[start:end], axis=0)
+        value = growth @ target
+        period_returns = np.diff(np.concatenate(([1.0], value))) / np.concatenate(([1.0], value[:-1]))
+        period_returns[0] -= traded * cost_bps / 1e4 * (1 + period_returns[0])
+        net_returns[start - lookback:end - lookback] = period_returns
+
+        weights = target * growth[-1] / value[-1]
+
+    index = returns.index[lookback:]
+    net_returns = pd.Series(net_returns, index=index)
+    equity = (1 + net_returns).cumprod()
+    drawdown, worst_drawdown = max_drawdown(equity)
+    turnover = pd.Series(turnover, index=rebalance_dates)
+
+    annual_return = equity.iloc[-1] ** (TRADING_DAYS_PER_YEAR / len(equity)) - 1
+    annual_volatility = net_returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    return {
+        'equity': equity,
+        'returns': net_returns,
+        'drawdown': drawdown,
+        'weights': pd.DataFrame(target_history, index=rebalance_dates, columns=returns.columns),
+        'turnover': turnover,
+        'summary': {
+            'Total Return': equity.iloc[-1] - 1,
+            'Annualized Return': annual_return,
+            'Annualized Volatility': annual_volatility,
+            'Sharpe Ratio': (net_returns.mean() - risk_free_rate) / net_returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR),
+            'Max Drawdown': worst_drawdown,
+            'Average Turnover': turnover.mean(),
+            'Total Costs': (turnover * cost_bps / 1e4).sum(),
+            'Rebalances': len(turnover),
+        },
+    }
@@ -0,0 +1,163 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+PLOT_MODES = ('show', 'save', 'off')
+DEFAULT_FIGURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'figures')
+
+# Global plotting switch. 'show' keeps the interactive notebook behaviour,
+# 'save' renders with the Agg backend in the background and writes files,
+# 'off' skips drawing entirely. Batch jobs can set PORTFOLIO_PLOT_MODE instead
+# of calling configure_plotting.
+_settings = {
+    'mode': os.environ.get('PORTFOLIO_PLOT_MODE', 'show'),
+    'output_dir': os.environ.get('PORTFOLIO_FIGURE_DIR', DEFAULT_FIGURE_DIR),
+    'formats': ('png',),
+    'dpi': 100,
+    'executor': 'thread',
+    'max_workers': 2,
+}
+_lock = threading.Lock()
+_pool = None
+_pending = []
+_names = {}
+
+
+def _use_agg():
+    # Switches the backend whether or not pyplot has been imported yet
+    import matplotlib
+
+    matplotlib.use('Agg', force=True)
+
+
+def _shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+def configure_plotting(mode=None, output_dir=None, formats=None, dpi=None, executor=None, max_workers=None):
+    """
+    Sets how every chart in plots.py and features.py is rendered.
+
+    Parameters:
+        mode (str): 'show' (plt.show, blocking), 'save' (write files off the
+            critical path) or 'off' (skip plotting).
+        output_dir (str): Directory the 'save' mode writes to.
+        formats (tuple): File formats written for every figure, e.g. ('png', 'svg').
+        dpi (int): Resolution of raster formats.
+        executor (str): 'thread' or 'process' pool used by the 'save' mode.
+        max_workers (int): Size of that pool.
+    """
+    if mode is not None and mode not in PLOT_MODES:
+        raise ValueError(f"mode must be one of {PLOT_MODES}, got {mode!r}")
+    if executor is not None and executor not in ('thread', 'process'):
+        raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+
+    wait_for_plots()
+    with _lock:
+        updates = {'mode': mode, 'output_dir': output_dir, 'formats': formats, 'dpi': dpi,
+                   'executor': executor, 'max_workers': max_workers}
+        _settings.update({k: v for k, v in updates.items() if v is not None})
+        if output_dir is not None:
+            _names.clear()
+        _shutdown_pool()
+
+    if _settings['mode'] == 'save':
+        _use_agg()
+
+
+def plotting_enabled():
+    """
+    False when plotting is switched off; callers skip building figures altogether.
+    """
+    return _settings['mode'] != 'off'
+
+
+def _file_stem(name):
+    stem = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower() or 'figure'
+    # Keep one file per call even when several figures share a title
+    count = _names.get(stem, 0)
+    _names[stem] = count + 1
+    return stem if count == 0 else f'{stem}_{count + 1}'
+
+
+def _save_figure(fig, paths, dpi):
+    for path in paths:
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    return paths
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        if _settings['executor'] == 'process':
+            # Figures are pickled to spawned workers, which never share pyplot state with this process
+            _pool = ProcessPoolExecutor(max_workers=_settings['max_workers'],
+                                        mp_context=multiprocessing.get_context('spawn'))
+        else:
+            _pool = ThreadPoolExecutor(max_workers=_settings['max_workers'], thread_name_prefix='plot')
+    return _pool
+
+
+def render(name, fig=None):
+    """
+    Finishes a figure according to the plotting mode; call it where plt.show() used to be.
+
+    In 'save' mode the figure is detached from pyplot and written in the
+    background to '<output_dir>/<name>.<format>'; call wait_for_plots() before
+    reading the files.
+
+    Parameters:
+        name (str): Figure name, used for the file name.
+        fig (Figure): Figure to render, defaults to the current pyplot figure.
+
+    Returns:
+        Future resolving to the written paths in 'save' mode, otherwise None.
+    """
+    import matplotlib.pyplot as plt
+
+    mode = _settings['mode']
+    if mode == 'show':
+        plt.show()
+        return None
+
+    fig = plt.gcf() if fig is None else fig
+    plt.close(fig)
+    if mode == 'off':
+        return None
+
+    with _lock:
+        os.makedirs(_settings['output_dir'], exist_ok=True)
+        stem = os.path.join(_settings['output_dir'], _file_stem(name))
+        paths = [f'{stem}.{fmt}' for fmt in _settings['formats']]
+        future = _executor().submit(_save_figure, fig, paths, _settings['dpi'])
+        _pending.append(future)
+    return future
+
+
+def wait_for_plots():
+    """
+    Blocks until every queued figure is written.
+
+    Returns:
+        list: Paths written since the last call. Raises the first rendering error, if any.
+    """
+    with _lock:
+        pending = list(_pending)
+        _pending.clear()
+
+    wait(pending)
+    written = []
+    for future in pending:
+        written.extend(future.result())
+    return written
+
+
+if _settings['mode'] not in PLOT_MODES:
+    raise ValueError(f"PORTFOLIO_PLOT_MODE must be one of {PLOT_MODES}, got {_settings['mode']!r}")
+if _settings['mode'] == 'save':
+    _use_agg()
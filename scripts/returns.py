@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _price_series(data, field):
+    if 'Date' in data.columns:
+        data = data.set_index('Date')
+    series = data[field]
+    series.index = pd.to_datetime(series.index)
+    return series
+
+
+def align_prices(frames, field='Close', how='outer'):
+    """
+    Aligns the prices of N assets on a shared trading calendar in one pass.
+
+    Parameters:
+        frames (dict): Asset name -> DataFrame with a Date index or 'Date' column.
+        field (str): Price column to use from every frame.
+        how (str): 'outer' keeps the union of trading dates, 'inner' the intersection.
+
+    Returns:
+        DataFrame: Date-indexed prices with one column per asset.
+    """
+    prices = pd.concat({name: _price_series(data, field) for name, data in frames.items()},
+                       axis=1, join=how)
+    prices = prices.sort_index()
+    prices.index.name = 'Date'
+    return prices
+
+
+def compute_returns(prices, kind='simple'):
+    """
+    Computes simple or log returns for every asset as one 2-D array operation.
+
+    Parameters:
+        prices (DataFrame): Date-indexed prices, one column per asset.
+        kind (str): 'simple' for P_t / P_{t-1} - 1, 'log' for ln(P_t / P_{t-1}).
+
+    Returns:
+        DataFrame: Returns with the same shape as `prices`; the first row is NaN.
+    """
+    values = prices.to_numpy(dtype=float)
+    returns = np.full_like(values, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if kind == 'simple':
+            returns[1:] = values[1:] / values[:-1] - 1
+        elif kind == 'log':
+            returns[1:] = np.diff(np.log(values), axis=0)
+        else:
+            raise ValueError(f"kind must be 'simple' or 'log', got {kind!r}")
+
+    return pd.DataFrame(returns, index=prices.index, columns=prices.columns)
+
+
+def annualize_returns(returns, kind='simple', periods_per_year=TRADING_DAYS_PER_YEAR):
+    """
+    Annualizes the average periodic return of every asset at once.
+
+    Simple returns are compounded, (1 + mean) ** periods - 1; log returns are
+    scaled and converted back, exp(mean * periods) - 1.
+
+    Returns:
+        Series: Annualized return per asset.
+    """
+    mean = np.nanmean(returns.to_numpy(dtype=float), axis=0)
+
+    if kind == 'simple':
+        annual = (1 + mean) ** periods_per_year - 1
+    elif kind == 'log':
+        annual = np.expm1(mean * periods_per_year)
+    else:
+        raise ValueError(f"kind must be 'simple' or 'log', got {kind!r}")
+
+    return pd.Series(annual, index=returns.columns)
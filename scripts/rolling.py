@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+
+from scripts.returns import align_prices
+
+ROLLING_STATS = ('mean', 'std', 'zscore', 'ewma_vol')
+
+
+def _window_label(window):
+    # None is the full sample seen so far
+    return 'full' if window is None else str(window)
+
+
+def _as_price_frame(prices, field='Close'):
+    if isinstance(prices, pd.DataFrame):
+        return prices
+    # Asset name -> Series or DataFrame with `field`
+    frames = {name: data.to_frame(field) if isinstance(data, pd.Series) else data for name, data in prices.items()}
+    return align_prices(frames, field)
+
+
+def _moments(values, window):
+    # Rolling mean and std of columns without missing values
+    shift = values[0] if len(values) else np.zeros(values.shape[1])
+    centered = values - shift
+
+    def cumulative(a):
+        out = np.zeros((a.shape[0] + 1, a.shape[1]))
+        np.cumsum(a, axis=0, out=out[1:])
+        return out
+
+    s1, s2 = cumulative(centered), cumulative(centered ** 2)
+    n = np.arange(1, len(values) + 1, dtype=float)[:, None]
+
+    if window is None:
+        sum1, sum2 = s1[1:], s2[1:]
+        complete = n > 0
+    else:
+        lag = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+        n = n - lag[:, None]
+        sum1, sum2 = s1[1:] - s1[lag], s2[1:] - s2[lag]
+        complete = n == window
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sum1 / n
+        variance = np.maximum(sum2 - sum1 * mean, 0) / (n - 1)
+    mean = np.where(complete, mean + shift, np.nan)
+    std = np.where(complete & (n > 1), np.sqrt(variance), np.nan)
+    return mean, std
+
+
+def rolling_moments(values, window):
+    """
+    Rolling mean and sample standard deviation of every column of a 2-D array.
+
+    Uses one cumulative sum of x and x^2 per column, so all windows end in
+    O(1) each. Each column is shifted by its first value first to keep the
+    difference of sums well conditioned. Missing values are skipped: a window
+    covers the last `window` observed values of its column, like pandas
+    rolling over that column with its NaNs dropped, and rows where the column
+    is missing give NaN.
+
+    Parameters:
+        values (array): Shape (T, N).
+        window (int): Window length, or None for the expanding full-sample moments.
+
+    Returns:
+        tuple: (mean, std) arrays of shape (T, N).
+    """
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    mean = np.full(values.shape, np.nan)
+    std = np.full(values.shape, np.nan)
+
+    # Columns without gaps share one pass; the others are compressed to their observed rows
+    dense = ~missing.any(axis=0)
+    if dense.any():
+        mean[:, dense], std[:, dense] = _moments(values[:, dense], window)
+    for column in np.flatnonzero(~dense):
+        rows = ~missing[:, column]
+        if rows.any():
+            column_mean, column_std = _moments(values[rows, column][:, None], window)
+            mean[rows, column], std[rows, column] = column_mean[:, 0], column_std[:, 0]
+    return mean, std
+
+
+def observed_returns(prices):
+    """
+    Simple returns of every column between consecutive observed prices.
+
+    A date missing for one ticker does not break its returns: the next
+    observed price is compared with the last one before the gap, like
+    pct_change on that ticker's own rows. Rows where the price is missing
+    give NaN.
+
+    Parameters:
+        prices (DataFrame): Date-indexed prices, one column per ticker.
+
+    Returns:
+        DataFrame: Returns with the same shape as `prices`.
+    """
+    values = prices.to_numpy(dtype=float)
+    previous = pd.DataFrame(values).ffill().shift(1).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(np.isnan(values), np.nan, values / previous - 1)
+    return pd.DataFrame(returns, index=prices.index, columns=prices.columns)
+
+
+def ewma_volatility(returns, decay=0.94):
+    """
+    RiskMetrics volatility sigma_t^2 = decay * sigma_{t-1}^2 + (1 - decay) * r_t^2 per column.
+
+    The recursion starts at each column's first valid return and skips missing
+    returns. It walks the rows once with N-wide vector operations, the same
+    update RollingFeatures applies to each new bar.
+    """
+    returns = np.asarray(returns, dtype=float)
+    variance = np.full(returns.shape[1], np.nan)
+    out = np.empty_like(returns)
+    for t, row in enumerate(returns):
+        variance = _ewma_step(variance, row, decay)
+        out[t] = variance
+    return np.sqrt(out)
+
+
+def _ewma_step(variance, row, decay):
+    squared = row ** 2
+    started = ~np.isnan(variance)
+    valid = ~np.isnan(row)
+    return np.where(valid & started, decay * variance + (1 - decay) * squared,
+                    np.where(valid, squared, variance))
+
+
+def _tidy(columns, index, tickers):
+    # (T, N) arrays per feature -> one row per (Date, Ticker)
+    data = {name: np.asarray(values).reshape(-1) for name, values in columns.items()}
+    rows = pd.MultiIndex.from_product([index, tickers], names=[index.name or 'Date', 'Ticker'])
+    return pd.DataFrame(data, index=rows)
+
+
+def rolling_features(prices, windows=(30,), stats=ROLLING_STATS, decay=0.94, field='Close'):
+    """
+    Computes rolling statistics for every ticker in one vectorized pass.
+
+    Prices of all tickers are aligned into one (T, N) array; returns, the
+    rolling mean, std and z-score of the price for every window and the EWMA
+    volatility of the returns are computed column-wise over that array.
+    Every ticker's statistics use only its own observed rows, so a date
+    missing for one ticker neither breaks its windows nor its returns.
+
+    Parameters:
+        prices (DataFrame or dict): Date-indexed prices with one column per ticker,
+            or ticker -> price Series / DataFrame with a `field` column.
+        windows (tuple): Window lengths; None means the full sample.
+        stats (tuple): Any of 'mean', 'std', 'zscore', 'ewma_vol'.
+        decay (float): Decay of the EWMA volatility.
+        field (str): Price column used when `prices` is a dict of DataFrames.
+
+    Returns:
+        DataFrame: Indexed by (Date, Ticker) with columns 'price', 'return',
+            '<stat>_<window>' for every window and 'ewma_vol'.
+    """
+    unknown = set(stats) - set(ROLLING_STATS)
+    if unknown:
+        raise ValueError(f"Unknown statistics {sorted(unknown)}, expected any of {ROLLING_STATS}")
+
+    prices = _as_price_frame(prices, field)
+    values = prices.to_numpy(dtype=float)
+    returns = observed_returns(prices).to_numpy()
+
+    columns = {'price': values, 'return': returns}
+    for window in windows:
+        if not {'mean', 'std', 'zscore'} & set(stats):
+            break
+        mean, std = rolling_moments(values, window)
+        label = _window_label(window)
+        if 'mean' in stats:
+            columns[f'mean_{label}'] = mean
+        if 'std' in stats:
+            columns[f'std_{label}'] = std
+        if 'zscore' in stats:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                columns[f'zscore_{label}'] = (values - mean) / std
+    if 'ewma_vol' in stats:
+        columns['ewma_vol'] = ewma_volatility(returns, decay)
+
+    return _tidy(columns, prices.index, list(prices.columns))
+
+
+class RollingFeatures:
+    """
+    Keeps the rolling statistics of rolling_features up to date one bar at a time.
+
+    Only the last max(windows) observed prices, the last observed price, the EWMA variance
+    and (for the full-sample window) a running Welford mean and M2 are kept per
+    ticker, so appending a bar costs O(N * max(windows)) and never rescans the
+    history. A missing price leaves that ticker's state untouched. Feeding the
+    same prices bar by bar gives the same features as rolling_features.
+
+    Parameters:
+        tickers (list): Ticker names, in the order of the bars passed to update.
+        windows (tuple): Window lengths; None means the full sample.
+        stats (tuple): Any of 'mean', 'std', 'zscore', 'ewma_vol'.
+        decay (float): Decay of the EWMA volatility.
+    """
+
+    def __init__(self, tickers, windows=(30,), stats=ROLLING_STATS, decay=0.94):
+        self.tickers = list(tickers)
+        self.windows = tuple(windows)
+        self.stats = tuple(stats)
+        self.decay = decay
+
+        n_assets = len(self.tickers)
+        depth = max([w for w in self.windows if w is not None], default=1)
+        self._buffer = np.full((depth, n_assets), np.nan)
+        self._last_price = np.full(n_assets, np.nan)
+        self._variance = np.full(n_assets, np.nan)
+        self._count = np.zeros(n_assets)
+        self._mean = np.zeros(n_assets)
+        self._m2 = np.zeros(n_assets)
+
+    @classmethod
+    def from_history(cls, prices, windows=(30,), stats=ROLLING_STATS, decay=0.94, field='Close'):
+        """
+        Computes the features of `prices` in one pass and returns an engine ready for new bars.
+
+        Returns:
+            tuple: (engine, features) where features is the rolling_features output.
+        """
+        prices = _as_price_frame(prices, field)
+        features = rolling_features(prices, windows, stats, decay)
+        engine = cls(prices.columns, windows, stats, decay)
+
+        values = prices.to_numpy(dtype=float)
+        valid = ~np.isnan(values)
+        depth = len(engine._buffer)
+        for column in range(values.shape[1]):
+            tail = values[valid[:, column], column][-depth:]
+            engine._buffer[depth - len(tail):, column] = tail
+            if len(tail):
+                engine._last_price[column] = tail[-1]
+
+        if 'ewma_vol' in stats:
+            vol = features['ewma_vol'].to_numpy().reshape(len(prices), -1)[-1]
+            engine._variance = vol ** 2
+        engine._count = valid.sum(axis=0).astype(float)
+        engine._mean = np.where(valid, values, 0).sum(axis=0) / np.maximum(engine._count, 1)
+        engine._m2 = np.where(valid, values - engine._mean, 0) ** 2
+        engine._m2 = engine._m2.sum(axis=0)
+        return engine, features
+
+    def update(self, bar, date=None):
+        """
+        Appends one bar of prices and returns its features.
+
+        Parameters:
+            bar (Series, dict or array): Price of every ticker (Series/dict keyed by ticker).
+            date: Label of the new row, e.g. its Timestamp.
+
+        Returns:
+            DataFrame: One row per ticker, with the columns of rolling_features.
+        """
+        if isinstance(bar, (pd.Series, dict)):
+            bar = [bar.get(ticker, np.nan) for ticker in self.tickers]
+        row = np.asarray(bar, dtype=float)
+        valid = ~np.isnan(row)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = row / self._last_price - 1
+        self._last_price = np.where(valid, row, self._last_price)
+
+        # Only the tickers with a price this bar move their window forward
+        self._buffer[:-1, valid] = self._buffer[1:, valid]
+        self._buffer[-1, valid] = row[valid]
+
+        # Welford update of the full-sample moments
+        self._count = self._count + valid
+        delta = np.where(valid, row - self._mean, 0)
+        self._mean = self._mean + np.divide(delta, self._count, out=np.zeros_like(delta), where=self._count > 0)
+        self._m2 = self._m2 + np.where(valid, delta * (row - self._mean), 0)
+
+        columns = {'price': row, 'return': ret}
+        for window in self.windows:
+            if not {'mean', 'std', 'zscore'} & set(self.stats):
+                break
+            if window is None:
+                complete = valid & (self._count > 0)
+                mean = np.where(complete, self._mean, np.nan)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    std = np.where(valid & (self._count > 1), np.sqrt(self._m2 / (self._count - 1)), np.nan)
+            else:
+                recent = self._buffer[-window:]
+                complete = valid & ~np.isnan(recent).any(axis=0)
+                mean = np.where(complete, recent.mean(axis=0), np.nan)
+                std = np.where(complete, recent.std(axis=0, ddof=1), np.nan) if window > 1 else np.full(len(row), np.nan)
+            label = _window_label(window)
+            if 'mean' in self.stats:
+                columns[f'mean_{label}'] = mean
+            if 'std' in self.stats:
+                columns[f'std_{label}'] = std
+            if 'zscore' in self.stats:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    columns[f'zscore_{label}'] = (row - mean) / std
+        if 'ewma_vol' in self.stats:
+            self._variance = _ewma_step(self._variance, ret, self.decay)
+            columns['ewma_vol'] = np.sqrt(self._variance)
+
+        index = pd.Index([date], name='Date')
+        return _tidy({name: values[None, :] for name, values in columns.items()}, index, self.tickers)
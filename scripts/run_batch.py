@@ -0,0 +1,487 @@
+"""
+Batch forecasting job over a ticker universe.
+
+Loads prices (through the Parquet price cache), forecasts every asset with
+ARIMA, SARIMA and LSTM in a pool of spawned worker processes, checkpoints each
+asset as soon as it finishes, and finally optimizes a portfolio from the
+forecasts. Re-running the same command resumes an interrupted run: assets
+with a checkpoint are not forecast again.
+
+Usage:
+    python -m scripts.run_batch universe.txt --output-dir data/runs/nightly --workers 4
+    python -m scripts.run_batch universe.csv --start 2015-01-01 --end 2025-01-31 --forecast-days 30 --fresh
+
+Output directory layout:
+    run.json                  run configuration (a resumed run must match it)
+    assets/<TICKER>.parquet   per-asset checkpoint: forecasts next to the actual prices
+    assets/<TICKER>.json      per-asset metrics and stage timings
+    models/<TICKER>/          fitted models, filtered up to the last price, and the prices (see save_models)
+    forecasts.parquet         all assets, one row per (ticker, date)
+    metrics.parquet           one row per (ticker, model) with MAE, RMSE, MAPE
+    stages.parquet            per-asset stage timings (scripts.instrumentation)
+    allocation.parquet        optimal weights per forecast scenario
+    statistics.parquet        historical statistics of each allocation
+    failures.json             assets that failed in the last run
+
+A run without --end on a new day, after a finished run, is built in
+<output-dir>.next and swapped in when it finishes; the run it replaces moves
+to <output-dir>.previous.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from scripts.forecast_portfolio import MODEL_FORECAST_KEYS
+from scripts.model_cache import load_model_file, save_model_file
+from scripts.price_store import DEFAULT_CACHE_DIR
+
+DEFAULT_RUN_DIR = os.path.join('data', 'runs')
+
+
+def read_universe(path):
+    """
+    Reads tickers from a text file (one per line, '#' comments) or a CSV with a 'ticker' column.
+    """
+    if path.endswith('.csv'):
+        frame = pd.read_csv(path)
+        column = next((c for c in frame.columns if c.lower() in ('ticker', 'symbol')), frame.columns[0])
+        tickers = frame[column].dropna().astype(str).str.strip()
+    else:
+        with open(path) as f:
+            tickers = [line.split('#', 1)[0].strip() for line in f]
+    return list(dict.fromkeys(t for t in tickers if t))
+
+
+def _write_atomic(path, write):
+    # Write to a temporary name and rename, so a crash never leaves a partial checkpoint
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_json(path, payload):
+    def write(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, indent=2, default=str)
+
+    _write_atomic(path, write)
+
+
+def _checkpoint_paths(output_dir, ticker):
+    base = os.path.join(output_dir, 'assets', ticker)
+    return base + '.parquet', base + '.json'
+
+
+def save_models(fitted, directory):
+    """
+    Persists the fitted models of one asset (as returned by forecast_models) in `directory`.
+
+    Keras models are stored as <name>.keras, everything else (including the
+    LSTM scaler) is pickled as <name>.pkl, with lower-case names.
+    """
+    for name, model in fitted.items():
+        save_model_file(model, directory, name.lower())
+
+
+def load_models(directory):
+    """
+    Loads the models written by save_models.
+
+    Returns:
+        dict: Model name ('ARIMA', 'SARIMA', 'LSTM', 'scaler', 'history') -> model.
+    """
+    names = {name.lower(): name for name in MODEL_FORECAST_KEYS}
+    models = {}
+    for filename in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(filename)
+        if filename.startswith('tmp-') or extension not in ('.keras', '.pkl'):
+            continue
+        models[names.get(stem, stem)] = load_model_file(os.path.join(directory, filename))
+    return models
+
+
+def _advance_models(fitted, prices):
+    # The models were fitted on the training split. ARIMA and SARIMA are filtered
+    # over the test segment with their fitted parameters, and the full history is
+    # kept for the LSTM window, so a later forecast starts at the last observed bar.
+    from scripts.features import split_data, update_arima, update_sarima
+
+    start = len(split_data(prices)[0])
+    # Positions continue those of the training series the models were fitted on
+    test = pd.Series(prices.to_numpy()[start:], index=pd.RangeIndex(start, len(prices)))
+    models = dict(fitted, history=prices)
+    if len(test) and 'ARIMA' in models:
+        models['ARIMA'] = update_arima(models['ARIMA'], test)
+    if len(test) and 'SARIMA' in models:
+        models['SARIMA'] = update_sarima(models['SARIMA'], test)
+    return models
+
+
+def _init_worker():
+    # Workers never draw: figures would block or pile up in a batch job
+    from scripts.rendering import configure_plotting
+
+    configure_plotting(mode='off')
+
+
+def forecast_asset(ticker, prices, config):
+    """
+    Forecasts one asset and writes its checkpoint. Runs inside a worker process.
+
+    Parameters:
+        ticker (str): Ticker symbol.
+        prices (Series): Date-indexed prices.
+        config (dict): Run configuration (see run_batch).
+
+    Returns:
+        dict: ticker, status and elapsed seconds.
+    """
+    from scripts.features import run_forecasting, split_data
+    from scripts.instrumentation import StageRecorder
+    from scripts.model_cache import ModelCache
+
+    start = time.perf_counter()
+    cache = ModelCache(config['model_cache']) if config['model_cache'] else None
+
+    # The models get positions, not dates: an exchange calendar with holidays has no
+    # frequency and statsmodels cannot forecast from such an index. The dates only
+    # label the output frame.
+    with StageRecorder() as recorder:
+        results = run_forecasting(pd.Series(prices.to_numpy()), ticker, seasonal_order=tuple(config['seasonal_order']),
+                                  forecast_days=config['forecast_days'], cache=cache,
+                                  lstm_mode=config['lstm_mode'], sarima_mode=config['sarima_mode'])
+
+    train, test = split_data(prices)
+    dates = test.index[:len(results['test_data'])]
+    frame = pd.DataFrame({'actual': np.ravel(results['test_data'])}, index=dates)
+    for model, key in MODEL_FORECAST_KEYS.items():
+        frame[model] = np.ravel(results[key])[:len(frame)]
+    frame.index.name = 'Date'
+
+    if config['save_models']:
+        # The prices travel with the models: they are the inputs a later forecast starts from
+        save_models(_advance_models(results['models'], prices), os.path.join(config['output_dir'], 'models', ticker))
+
+    data_path, meta_path = _checkpoint_paths(config['output_dir'], ticker)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    stages = recorder.frame()[['stage', 'parent', 'wall_s', 'cpu_s', 'peak_rss_mib', 'iterations']]
+    meta = {
+        'ticker': ticker,
+        'last_price': float(np.ravel(results['last_price'])[0]),
+        'train_end': str(train.index[-1].date()),
+        'metrics': {model: dict(zip(('MAE', 'RMSE', 'MAPE'), map(float, values)))
+                    for model, values in results['metrics'].items()},
+        'stages': stages.to_dict(orient='records'),
+        'elapsed_s': time.perf_counter() - start,
+    }
+    # The JSON sidecar is written first: the Parquet file marks the checkpoint as complete
+    _write_json(meta_path, meta)
+    _write_atomic(data_path, frame.to_parquet)
+
+    return {'ticker': ticker, 'status': 'done', 'elapsed_s': meta['elapsed_s']}
+
+
+def read_checkpoint(output_dir, ticker):
+    """
+    Reads a per-asset checkpoint back.
+
+    Returns:
+        tuple: (forecast frame, metadata dict), or (None, None) if the asset is not done.
+    """
+    data_path, meta_path = _checkpoint_paths(output_dir, ticker)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return pd.read_parquet(data_path), meta
+
+
+def _results_from_checkpoint(frame, meta):
+    # The subset of run_forecasting's results that forecast_portfolio needs
+    results = {key: frame[model].to_numpy() for model, key in MODEL_FORECAST_KEYS.items()}
+    results.update(test_data=frame['actual'].to_numpy(), last_price=meta['last_price'])
+    return results
+
+
+def _read_run(output_dir):
+    path = os.path.join(output_dir, 'run.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _staging_dir(output_dir):
+    return output_dir.rstrip(os.sep) + '.next'
+
+
+def _promote(staging, output_dir):
+    # Swap a finished staged run in; the run it replaces is kept as <output_dir>.previous
+    previous = output_dir.rstrip(os.sep) + '.previous'
+    if os.path.exists(output_dir):
+        if os.path.exists(previous):
+            shutil.rmtree(previous)
+        os.rename(output_dir, previous)
+    os.rename(staging, output_dir)
+    print(f"Moved the finished run into {output_dir}; the run it replaced is in {previous}")
+
+
+def _resolve_run(output_dir, end_date, fresh):
+    """
+    Picks the end of the price history and the directory the run writes to.
+
+    An explicit end_date always wins. Without one, an unfinished run resumes
+    with the end it recorded, even after midnight. When a finished run meets a
+    new day (the nightly job), the new run is written to <output_dir>.next and
+    only replaces output_dir once it has finished, so the previous forecasts
+    and models stay in place, and servable, until then.
+
+    Returns:
+        tuple: (end date string, run directory).
+    """
+    staging = _staging_dir(output_dir)
+    if fresh and os.path.exists(staging):
+        shutil.rmtree(staging)
+    staged = _read_run(staging)
+    if staged is not None and staged.get('finished'):
+        # A previous invocation finished the staged run but stopped before the swap
+        _promote(staging, output_dir)
+        staged = None
+
+    if end_date is not None:
+        return str(end_date), output_dir
+    today = str(pd.Timestamp.today().date())
+    if fresh:
+        return today, output_dir
+    if staged is not None:
+        return staged['end'], staging
+    previous = _read_run(output_dir)
+    if previous is None or not previous.get('end_default'):
+        return today, output_dir
+    if not previous.get('finished'):
+        return previous['end'], output_dir
+    if previous['end'] != today:
+        print(f"The run up to {previous['end']} in {output_dir} finished; building the run up to {today} in {staging}")
+        return today, staging
+    return today, output_dir
+
+
+def _check_config(output_dir, config, fresh):
+    path = os.path.join(output_dir, 'run.json')
+    if fresh and os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Only settings that change the forecasts must match for a resume
+    keys = ('start', 'end', 'field', 'forecast_days', 'seasonal_order', 'lstm_mode', 'sarima_mode')
+    previous = _read_run(output_dir)
+    if previous is not None:
+        # Runs recorded before the SARIMA mode existed used the fixed seasonal order
+        previous.setdefault('sarima_mode', 'fixed')
+        changed = {k: (previous.get(k), config[k]) for k in keys if previous.get(k) != config[k]}
+        if changed:
+            raise SystemExit(f"{output_dir} holds a run with different settings {changed}; "
+                             f"use --fresh or another --output-dir")
+    _write_json(path, dict({k: config[k] for k in keys + ('tickers', 'end_default')}, finished=False))
+
+
+def _mark_finished(output_dir):
+    # Every asset was attempted: a later run without an explicit end on a new day builds a new run
+    run = _read_run(output_dir)
+    run['finished'] = True
+    _write_json(os.path.join(output_dir, 'run.json'), run)
+
+
+def combine_outputs(output_dir, tickers):
+    """
+    Collects the per-asset checkpoints into forecasts, metrics and stages Parquet files.
+
+    Returns:
+        tuple: (ticker -> results dict usable by scripts.forecast_portfolio,
+            ticker -> checkpoint metadata).
+    """
+    forecasts, metrics, stages, results, metas = [], [], [], {}, {}
+    for ticker in tickers:
+        frame, meta = read_checkpoint(output_dir, ticker)
+        if frame is None:
+            continue
+        forecasts.append(frame.reset_index().assign(ticker=ticker))
+        metrics.extend({'ticker': ticker, 'model': model, **values} for model, values in meta['metrics'].items())
+        stages.extend({'ticker': ticker, **record} for record in meta['stages'])
+        results[ticker] = _results_from_checkpoint(frame, meta)
+        metas[ticker] = meta
+
+    if forecasts:
+        pd.concat(forecasts, ignore_index=True).to_parquet(os.path.join(output_dir, 'forecasts.parquet'))
+        pd.DataFrame(metrics).to_parquet(os.path.join(output_dir, 'metrics.parquet'))
+        pd.DataFrame(stages).to_parquet(os.path.join(output_dir, 'stages.parquet'))
+    return results, metas
+
+
+def optimize(results, metas, prices, output_dir, strategy='max_sharpe'):
+    """
+    Optimizes one allocation per forecast scenario and writes it next to the forecasts.
+    """
+    from scripts.forecast_portfolio import forecast_allocation
+    from scripts.returns import compute_returns
+
+    # Score every allocation on the common training history, which no forecast has seen
+    train_end = min(pd.Timestamp(meta['train_end']) for meta in metas.values())
+    history = compute_returns(prices[list(results)].loc[:train_end]).dropna()
+
+    allocation = forecast_allocation(results, historical_returns=history, strategy=strategy)
+    allocation['weights'].to_parquet(os.path.join(output_dir, 'allocation.parquet'))
+    allocation['expected_returns'].to_parquet(os.path.join(output_dir, 'expected_returns.parquet'))
+    allocation['statistics'].to_parquet(os.path.join(output_dir, 'statistics.parquet'))
+    return allocation
+
+
+def run_batch(tickers, output_dir, start_date='2015-01-01', end_date=None, field='Close', forecast_days=360,
+              seasonal_order=(1, 1, 1, 12), lstm_mode='recursive', sarima_mode='fixed', workers=None, fresh=False,
+              price_cache=DEFAULT_CACHE_DIR, model_cache=None, save_models=True, strategy='max_sharpe',
+              source=None):
+    """
+    Runs loading, forecasting and optimization for a ticker universe, resuming from checkpoints.
+
+    Assets are forecast in spawned worker processes (TensorFlow is not fork-safe)
+    and checkpointed one by one, so an interrupted run picks up where it
+    stopped. A failing asset is reported and skipped; it is retried by the
+    next run.
+
+    Parameters:
+        tickers (list of str): Universe.
+        output_dir (str): Run directory (see the module docstring for its layout).
+        start_date, end_date (str): Price history range. Without end_date an unfinished run
+            resumes with its recorded end, otherwise the history runs up to today and a
+            finished run is replaced only once the new one has finished (see _resolve_run).
+        field (str): Price column forecast, e.g. 'Close' or 'Adj Close'.
+        forecast_days (int): Forecast horizon.
+        seasonal_order (tuple): SARIMA seasonal order.
+        lstm_mode (str): See forecast_models.
+        sarima_mode (str): 'fixed' uses seasonal_order, 'fast' searches a seasonal grid (see forecast_models).
+        workers (int): Worker processes. 1 runs in this process.
+        fresh (bool): Delete previous checkpoints (and any staged run) first.
+        price_cache (str): Parquet price cache folder (None disables it).
+        model_cache (str): Optional fitted-model cache folder shared by the workers.
+        save_models (bool): Persist fitted models under output_dir/models.
+        strategy (str): 'max_sharpe' or 'min_variance' for the optimization step.
+        source (callable): Price source, defaults to yfinance.
+
+    Returns:
+        dict: 'done', 'skipped' (already checkpointed) and 'failed' tickers, and
+            'allocation' (None with fewer than two assets).
+    """
+    from scripts.data_loader import load_frames
+    from scripts.returns import align_prices
+
+    end_default = end_date is None
+    end_date, run_dir = _resolve_run(output_dir, end_date, fresh)
+    config = {
+        'tickers': list(tickers), 'start': str(start_date), 'end': end_date, 'end_default': end_default, 'field': field,
+        'forecast_days': forecast_days, 'seasonal_order': list(seasonal_order), 'lstm_mode': lstm_mode,
+        'sarima_mode': sarima_mode, 'output_dir': run_dir, 'model_cache': model_cache, 'save_models': save_models,
+    }
+    _check_config(run_dir, config, fresh)
+
+    frames = load_frames(tickers, start_date, end_date, cache_dir=price_cache, source=source, errors='skip')
+    prices = align_prices(frames, field)
+    failed = {ticker: 'no price data' for ticker in tickers if ticker not in frames}
+
+    skipped = [t for t in frames if read_checkpoint(run_dir, t)[0] is not None]
+    pending = [t for t in frames if t not in skipped]
+    print(f"{len(pending)} asset(s) to forecast, {len(skipped)} already checkpointed, {len(failed)} without data")
+
+    done = []
+
+    def finished(ticker, result=None, error=None):
+        if error is None:
+            done.append(ticker)
+            print(f"[{len(done)}/{len(pending)}] {ticker} done in {result['elapsed_s']:.1f}s")
+        else:
+            failed[ticker] = error
+            print(f"{ticker} failed: {error.strip().splitlines()[-1]}")
+
+    if workers == 1:
+        _init_worker()
+        for ticker in pending:
+            try:
+                finished(ticker, forecast_asset(ticker, frames[ticker][field].dropna(), config))
+            except Exception:
+                finished(ticker, error=traceback.format_exc())
+    elif pending:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as executor:
+            futures = {executor.submit(forecast_asset, t, frames[t][field].dropna(), config): t for t in pending}
+            for future in as_completed(futures):
+                try:
+                    finished(futures[future], future.result())
+                except Exception:
+                    finished(futures[future], error=traceback.format_exc())
+
+    _write_json(os.path.join(run_dir, 'failures.json'), failed)
+
+    results, metas = combine_outputs(run_dir, tickers)
+    allocation = None
+    if len(results) >= 2:
+        allocation = optimize(results, metas, prices, run_dir, strategy)
+        print("Optimal weights per forecast scenario:")
+        print(allocation['weights'].round(4))
+    else:
+        print("Fewer than two assets forecast; skipping the optimization step")
+
+    _mark_finished(run_dir)
+    if run_dir != output_dir:
+        _promote(run_dir, output_dir)
+
+    return {'done': done, 'skipped': skipped, 'failed': failed, 'allocation': allocation}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Forecast a ticker universe and optimize a portfolio from it.')
+    parser.add_argument('universe', help="text file with one ticker per line, or a CSV with a 'ticker' column")
+    parser.add_argument('--output-dir', help=f'run directory (default: {DEFAULT_RUN_DIR}/<universe name>)')
+    parser.add_argument('--start', default='2015-01-01', help='first date of the price history')
+    parser.add_argument('--end', help='end of the price history (exclusive, default: today, or the end of the '
+                                          'unfinished run being resumed)')
+    parser.add_argument('--field', default='Close', help='price column to forecast')
+    parser.add_argument('--forecast-days', type=int, default=360)
+    parser.add_argument('--seasonal-order', type=int, nargs=4, default=(1, 1, 1, 12), metavar=('P', 'D', 'Q', 'S'))
+    parser.add_argument('--lstm-mode', choices=('recursive', 'direct', 'one_step'), default='recursive')
+    parser.add_argument('--sarima-mode', choices=('fixed', 'fast'), default='fixed',
+                        help="'fast' searches a small seasonal grid with bounded, warm-started fits")
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--fresh', action='store_true', help='discard checkpoints of a previous run')
+    parser.add_argument('--price-cache', default=DEFAULT_CACHE_DIR, help='Parquet price cache folder')
+    parser.add_argument('--model-cache', help='fitted-model cache folder shared by the workers')
+    parser.add_argument('--no-save-models', action='store_true', help='do not persist fitted models')
+    parser.add_argument('--strategy', choices=('max_sharpe', 'min_variance'), default='max_sharpe')
+    args = parser.parse_args(argv)
+
+    tickers = read_universe(args.universe)
+    if not tickers:
+        parser.error(f"no tickers in {args.universe}")
+    output_dir = args.output_dir or os.path.join(DEFAULT_RUN_DIR, os.path.splitext(os.path.basename(args.universe))[0])
+
+    summary = run_batch(tickers, output_dir, start_date=args.start, end_date=args.end, field=args.field,
+                        forecast_days=args.forecast_days, seasonal_order=tuple(args.seasonal_order),
+                        lstm_mode=args.lstm_mode, sarima_mode=args.sarima_mode, workers=args.workers, fresh=args.fresh,
+                        price_cache=args.price_cache, model_cache=args.model_cache,
+                        save_models=not args.no_save_models, strategy=args.strategy)
+
+    print(f"Done: {len(summary['done'])}, resumed: {len(summary['skipped'])}, failed: {len(summary['failed'])}. "
+          f"Outputs in {output_dir}")
+    # A non-zero exit lets a scheduler notice failed assets
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
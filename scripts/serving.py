@@ -0,0 +1,283 @@
+"""
+Forecast serving: answers forecast requests from persisted models without refitting.
+
+ForecastServer loads the models a batch run saved (scripts.run_batch) once,
+precomputes every asset's forecast path up to a maximum horizon and answers
+requests by slicing those paths, so a request for many tickers costs a few
+dictionary lookups. Longer horizons are computed on first use and cached.
+
+serve() exposes a ForecastServer over a local JSON HTTP API:
+    GET  /health
+    GET  /tickers
+    GET  /forecast?tickers=AAPL,MSFT&horizon=21&models=ARIMA,ensemble
+    POST /forecast   {"tickers": ["AAPL", "MSFT"], "horizon": 21, "models": ["LSTM"]}
+
+Usage:
+    python -m scripts.serving data/runs/nightly --port 8000 --horizon 252
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from scripts.forecast_portfolio import MODEL_FORECAST_KEYS
+from scripts.run_batch import load_models
+
+SERVED_MODELS = tuple(MODEL_FORECAST_KEYS) + ('ensemble',)
+DEFAULT_HORIZON = 252
+
+
+def _forecast_paths(models, horizon, lstm_mode='recursive'):
+    """
+    Forecasts `horizon` steps with every model of one asset.
+
+    Returns:
+        dict: Model name -> price path (array). The ensemble is the mean of the others.
+    """
+    paths = {}
+    if 'ARIMA' in models:
+        paths['ARIMA'] = np.ravel(models['ARIMA'].predict(n_periods=horizon))[:horizon]
+    if 'SARIMA' in models:
+        paths['SARIMA'] = np.ravel(models['SARIMA'].forecast(steps=horizon))[:horizon]
+
+    lstm_model = models.get('LSTM')
+    if lstm_model is not None and 'scaler' in models and 'history' in models:
+        from scripts.features import direct_lstm_forecast, recursive_lstm_forecast
+
+        scaler = models['scaler']
+        time_step = lstm_model.input_shape[1]
+        history = np.asarray(models['history'], dtype=float)[-time_step:].reshape(-1, 1)
+        window = scaler.transform(history).reshape(1, time_step, 1)
+        scaled = None
+        if lstm_mode != 'direct':
+            scaled = recursive_lstm_forecast(lstm_model, window, horizon)
+        elif lstm_model.output_shape[-1] >= horizon:
+            # A direct model only covers the horizon it was trained for
+            scaled = direct_lstm_forecast(lstm_model, window, horizon)
+        if scaled is not None:
+            paths['LSTM'] = np.ravel(scaler.inverse_transform(scaled.reshape(-1, 1)))
+
+    if paths:
+        paths['ensemble'] = np.mean(list(paths.values()), axis=0)
+    return paths
+
+
+class ForecastServer:
+    """
+    Keeps the models of a batch run resident and serves precomputed forecast paths.
+
+    Parameters:
+        run_dir (str): Output directory of scripts.run_batch (needs models/ and run.json).
+        horizon (int): Horizon precomputed for every asset at load time.
+        tickers (list of str): Assets to serve; defaults to every asset with saved models.
+        lstm_mode (str): Overrides the LSTM mode recorded in run.json.
+    """
+
+    def __init__(self, run_dir, horizon=DEFAULT_HORIZON, tickers=None, lstm_mode=None):
+        self.run_dir = run_dir
+        self.horizon = horizon
+        self.lstm_mode = lstm_mode
+        self.models = {}
+        self.origins = {}
+        self._paths = {}
+        self._lock = threading.Lock()
+        self.load(tickers)
+
+    def load(self, tickers=None):
+        """
+        Loads the models and precomputes the forecast paths. Can be called again after a new run.
+        """
+        with open(os.path.join(self.run_dir, 'run.json')) as f:
+            run = json.load(f)
+        lstm_mode = self.lstm_mode or run.get('lstm_mode', 'recursive')
+
+        model_dir = os.path.join(self.run_dir, 'models')
+        tickers = tickers or sorted(os.listdir(model_dir))
+        models, origins, paths = {}, {}, {}
+        for ticker in tickers:
+            models[ticker] = load_models(os.path.join(model_dir, ticker))
+            history = models[ticker].get('history')
+            origins[ticker] = None if history is None else history.index[-1]
+            paths[ticker] = self._compute(models[ticker], self.horizon, lstm_mode)
+
+        # Swap everything at once so requests in flight see either the old or the new run
+        with self._lock:
+            self.models, self.origins, self._paths = models, origins, paths
+            self._lstm_mode = lstm_mode
+        return self
+
+    def _compute(self, models, horizon, lstm_mode):
+        paths = _forecast_paths(models, horizon, lstm_mode)
+        history = models.get('history')
+        origin = None if history is None else history.index[-1]
+
+        # Stored as lists so answering a request is slicing, not array conversion
+        entry = {model: path.tolist() for model, path in paths.items()}
+        entry['horizon'] = horizon
+        entry['dates'] = None if origin is None else [
+            str(date.date()) for date in pd.bdate_range(origin + pd.offsets.BDay(1), periods=horizon)]
+        return entry
+
+    def _entry(self, ticker, horizon):
+        entry = self._paths[ticker]
+        if entry['horizon'] >= horizon:
+            return entry
+        with self._lock:
+            entry = self._paths[ticker]
+            if entry['horizon'] < horizon:
+                # Grow geometrically so a sequence of longer requests recomputes rarely
+                entry = self._compute(self.models[ticker], max(horizon, 2 * entry['horizon']), self._lstm_mode)
+                self._paths[ticker] = entry
+        return entry
+
+    @property
+    def tickers(self):
+        return sorted(self._paths)
+
+    def describe(self):
+        """
+        Served assets with their forecast origin, models and precomputed horizon.
+        """
+        return {ticker: {'origin': None if self.origins[ticker] is None else str(self.origins[ticker].date()),
+                         'models': [model for model in SERVED_MODELS if model in self._paths[ticker]],
+                         'horizon': self._paths[ticker]['horizon']}
+                for ticker in self.tickers}
+
+    def forecast(self, tickers, horizon, models=SERVED_MODELS):
+        """
+        Forecast paths for a batch of tickers.
+
+        Parameters:
+            tickers (list of str): Assets.
+            horizon (int): Number of business days forecast.
+            models (iterable of str): Any of 'ARIMA', 'SARIMA', 'LSTM', 'ensemble'.
+
+        Returns:
+            dict: 'horizon', 'forecasts' (ticker -> dates and one price path per model)
+                and 'errors' (ticker -> message for unknown tickers).
+        """
+        horizon = int(horizon)
+        if horizon < 1:
+            raise ValueError(f"horizon must be a positive number of days, got {horizon}")
+        unknown = [model for model in models if model not in SERVED_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown models {unknown}; choose from {list(SERVED_MODELS)}")
+
+        forecasts, errors = {}, {}
+        for ticker in tickers:
+            if ticker not in self._paths:
+                errors[ticker] = 'unknown ticker'
+                continue
+            entry = self._entry(ticker, horizon)
+            forecast = {'dates': None if entry['dates'] is None else entry['dates'][:horizon]}
+            forecast.update({model: entry[model][:horizon] for model in models if model in entry})
+            forecasts[ticker] = forecast
+        return {'horizon': horizon, 'forecasts': forecasts, 'errors': errors}
+
+
+def _split(values):
+    # Accepts repeated query parameters and comma-separated lists
+    return [item.strip() for value in values for item in value.split(',') if item.strip()]
+
+
+def make_handler(server):
+    """
+    Builds the HTTP request handler class answering from `server` (a ForecastServer).
+    """
+
+    class ForecastHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _forecast(self, tickers, horizon, models):
+            if not tickers:
+                return self._send(400, {'error': 'no tickers requested'})
+            try:
+                start = time.perf_counter()
+                response = server.forecast(tickers, horizon, models or SERVED_MODELS)
+                response['elapsed_ms'] = (time.perf_counter() - start) * 1e3
+            except (TypeError, ValueError) as e:
+                return self._send(400, {'error': str(e)})
+            status = 404 if response['errors'] and not response['forecasts'] else 200
+            self._send(status, response)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                return self._send(200, {'status': 'ok', 'tickers': len(server.tickers)})
+            if url.path == '/tickers':
+                return self._send(200, server.describe())
+            if url.path == '/forecast':
+                query = parse_qs(url.query)
+                return self._forecast(_split(query.get('tickers', [])), query.get('horizon', [server.horizon])[0],
+                                      _split(query.get('models', [])))
+            self._send(404, {'error': f'unknown path {url.path}'})
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/forecast':
+                return self._send(404, {'error': f'unknown path {self.path}'})
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            except json.JSONDecodeError as e:
+                return self._send(400, {'error': f'invalid JSON: {e}'})
+            self._forecast(request.get('tickers', []), request.get('horizon', server.horizon),
+                           request.get('models'))
+
+        def log_message(self, format, *args):
+            # Request logging would dominate the latency of a local API
+            pass
+
+    return ForecastHandler
+
+
+def serve(server, host='127.0.0.1', port=8000):
+    """
+    Builds a threaded HTTP server for `server`; call serve_forever() on it (or use it in a thread for tests).
+
+    Returns:
+        ThreadingHTTPServer: Bound and ready; port 0 picks a free port (see server_address).
+    """
+    httpd = ThreadingHTTPServer((host, port), make_handler(server))
+    httpd.daemon_threads = True
+    return httpd
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve forecasts from the models of a batch run.')
+    parser.add_argument('run_dir', help='output directory of scripts.run_batch')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--horizon', type=int, default=DEFAULT_HORIZON, help='horizon precomputed at startup')
+    parser.add_argument('--tickers', nargs='+', help='assets to serve (default: all in the run)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    server = ForecastServer(args.run_dir, horizon=args.horizon, tickers=args.tickers)
+    print(f"Loaded {len(server.tickers)} asset(s) and precomputed {args.horizon} days "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    httpd = serve(server, args.host, args.port)
+    print(f"Serving on http://{args.host}:{httpd.server_address[1]}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
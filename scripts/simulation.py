@@ -0,0 +1,321 @@
+import numpy as np
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def _generator(seed):
+    # Accept an existing Generator so callers can control the random stream
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+
+
+def cholesky_factor(cov_matrix):
+    """
+    Returns the lower Cholesky factor of a covariance matrix.
+
+    Sample covariances of highly correlated assets can be numerically
+    semi-definite, so a small diagonal jitter is added until the factorisation
+    succeeds.
+    """
+    cov = np.asarray(cov_matrix, dtype=float)
+    jitter = 0.0
+    # Floored so an all-zero covariance (cash-like or constant assets) still gets a non-zero jitter
+    scale = max(np.mean(np.diag(cov)), np.finfo(float).eps) if cov.size else 1.0
+    for _ in range(10):
+        try:
+            return np.linalg.cholesky(cov + jitter * np.eye(len(cov)))
+        except np.linalg.LinAlgError:
+            jitter = scale * 1e-10 if jitter == 0 else jitter * 10
+    raise np.linalg.LinAlgError("Covariance matrix is not positive semi-definite")
+
+
+def simulate_portfolio_returns(mean_returns, cov_matrix, weights, num_simulations, num_days, seed=None):
+    """
+    Draws daily portfolio returns for all paths in one batched block.
+
+    The portfolio return of jointly normal asset returns is itself normal with
+    mean w'mu and standard deviation sqrt(w' Sigma w), so one standard normal
+    draw per path and day is enough; memory and random draws do not grow with
+    the number of assets.
+
+    Parameters:
+        mean_returns (array): Expected daily return per asset.
+        cov_matrix (array): Daily covariance matrix of the assets.
+        weights (array): Portfolio weights.
+        num_simulations (int): Number of paths.
+        num_days (int): Days per path.
+        seed (int or Generator): Seed or numpy Generator.
+
+    Returns:
+        array: Daily portfolio returns of shape (num_simulations, num_days).
+    """
+    rng = _generator(seed)
+    mean = np.asarray(mean_returns, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    cov = np.asarray(cov_matrix, dtype=float)
+    # Clipped: a numerically semi-definite covariance can give a tiny negative variance
+    sigma = np.sqrt(max(weights @ cov @ weights, 0.0))
+
+    z = rng.standard_normal((num_simulations, num_days))
+    return mean @ weights + sigma * z
+
+
+def simulate_portfolio_paths(mean_returns, cov_matrix, weights, num_simulations, num_days, seed=None):
+    """
+    Simulates compounded portfolio wealth paths starting from 1.
+
+    Returns:
+        array: Wealth of shape (num_simulations, num_days).
+    """
+    returns = simulate_portfolio_returns(mean_returns, cov_matrix, weights, num_simulations, num_days, seed)
+    return np.cumprod(1 + returns, axis=1)
+
+
+def summarize_terminal_returns(terminal_returns, quantiles=DEFAULT_QUANTILES, confidence_level=0.95):
+    """
+    Summarizes simulated terminal returns with quantiles, VaR and CVaR.
+
+    VaR follows the convention used elsewhere in the repo: it is the return at
+    the (1 - confidence_level) percentile, so losses are negative numbers. CVaR
+    is the mean return of the paths at or below VaR.
+    """
+    terminal_returns = np.asarray(terminal_returns, dtype=float)
+    var = np.quantile(terminal_returns, 1 - confidence_level)
+
+    return {
+        'num_simulations': len(terminal_returns),
+        'mean_return': terminal_returns.mean(),
+        'std_return': terminal_returns.std(ddof=1),
+        'quantiles': dict(zip(quantiles, np.quantile(terminal_returns, quantiles))),
+        'VaR': var,
+        'CVaR': terminal_returns[terminal_returns <= var].mean(),
+        'probability_of_loss': np.mean(terminal_returns < 0),
+    }
+
+
+def simulate_portfolio(mean_returns, cov_matrix, weights, num_simulations=100_000, num_days=252, seed=None,
+                       chunk_size=10_000, quantiles=DEFAULT_QUANTILES, confidence_level=0.95):
+    """
+    Runs a Monte Carlo simulation of portfolio wealth and returns risk statistics.
+
+    Paths are generated `chunk_size` at a time and only their terminal returns
+    are kept, so memory stays bounded by one chunk regardless of
+    `num_simulations`. Nothing is plotted.
+
+    Parameters:
+        mean_returns (array): Expected daily return per asset.
+        cov_matrix (array): Daily covariance matrix of the assets.
+        weights (array): Portfolio weights.
+        num_simulations (int): Number of paths.
+        num_days (int): Horizon in trading days.
+        seed (int or Generator): Seed or numpy Generator.
+        chunk_size (int): Paths generated per block.
+        quantiles (tuple): Quantiles of the terminal return to report.
+        confidence_level (float): Confidence level of VaR and CVaR.
+
+    Returns:
+        dict: See summarize_terminal_returns.
+    """
+    rng = _generator(seed)
+    terminal_returns = np.empty(num_simulations)
+
+    for start in range(0, num_simulations, chunk_size):
+        n_paths = min(chunk_size, num_simulations - start)
+        returns = simulate_portfolio_returns(mean_returns, cov_matrix, weights, n_paths, num_days, rng)
+        # Compound in log space to avoid materialising the cumulative product
+        terminal_returns[start:start + n_paths] = np.expm1(np.log1p(returns).sum(axis=1))
+
+    return summarize_terminal_returns(terminal_returns, quantiles, confidence_level)
+
+
+class HistogramSketch:
+    """
+    Mergeable quantile sketch backed by fixed-bin histograms.
+
+    One histogram is kept per column (e.g. per simulated day), all sharing the
+    same bin edges, so sketches built by different workers can be merged by
+    adding their counts. Values outside the edges are counted in under/overflow
+    bins. Quantiles are interpolated linearly inside a bin, so their resolution
+    is the bin width.
+
+    Parameters:
+        edges (array): Increasing bin edges.
+        n_columns (int): Number of independent histograms.
+    """
+
+    def __init__(self, edges, n_columns=1):
+        self.edges = np.asarray(edges, dtype=float)
+        self.n_columns = n_columns
+        self.counts = np.zeros((n_columns, len(self.edges) + 1), dtype=np.int64)
+        self.total = np.zeros(n_columns)
+
+    def update(self, values):
+        """
+        Adds observations; `values` has shape (n,) or (n, n_columns).
+        """
+        values = np.asarray(values, dtype=float).reshape(len(values), self.n_columns)
+        bins = np.searchsorted(self.edges, values, side='right')
+        # Offset every column into its own block so a single bincount fills all histograms
+        flat = (bins + np.arange(self.n_columns) * self.counts.shape[1]).ravel()
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self.total += values.sum(axis=0)
+        return self
+
+    def merge(self, other):
+        """
+        Adds the counts of another sketch with the same edges and columns.
+        """
+        if not np.array_equal(self.edges, other.edges) or self.n_columns != other.n_columns:
+            raise ValueError("Only sketches with identical edges and columns can be merged")
+        self.counts += other.counts
+        self.total += other.total
+        return self
+
+    @property
+    def count(self):
+        return self.counts[0].sum()
+
+    def mean(self):
+        return self.total / max(self.count, 1)
+
+    def quantile(self, q):
+        """
+        Returns the estimated quantile(s) of every column, shape (len(q), n_columns).
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        cumulative = np.cumsum(self.counts, axis=1)
+        result = np.empty((len(q), self.n_columns))
+
+        # Under/overflow bins collapse onto the outermost edges
+        lower = np.concatenate(([self.edges[0]], self.edges))
+        upper = np.concatenate((self.edges, [self.edges[-1]]))
+
+        for c in range(self.n_columns):
+            target = q * cumulative[c, -1]
+            bins = np.minimum(np.searchsorted(cumulative[c], target, side='left'), len(lower) - 1)
+            before = np.where(bins > 0, cumulative[c, bins - 1], 0)
+            in_bin = np.maximum(self.counts[c, bins], 1)
+            fraction = np.clip((target - before) / in_bin, 0, 1)
+            result[:, c] = lower[bins] + fraction * (upper[bins] - lower[bins])
+        return result
+
+    def tail_mean(self, threshold, column=0):
+        """
+        Estimates the mean of the observations at or below `threshold` from bin midpoints.
+        """
+        mids = np.concatenate(([self.edges[0]], (self.edges[:-1] + self.edges[1:]) / 2, [self.edges[-1]]))
+        mask = mids <= threshold
+        counts = self.counts[column, mask]
+        return np.dot(counts, mids[mask]) / counts.sum() if counts.sum() else np.nan
+
+
+def _wealth_edges(num_bins=4000):
+    # Log-spaced wealth grid from a 99.9% loss to a 1000x gain
+    return np.geomspace(1e-3, 1e3, num_bins)
+
+
+def _drawdown_edges(num_bins=2000):
+    return np.linspace(0, 1, num_bins)
+
+
+def simulate_chunk_sketches(mean_returns, cov_matrix, weights, num_simulations, num_days, seed_sequence,
+                            chunk_size=10_000, band_days=None):
+    """
+    Simulates paths in memory-bounded sub-chunks and folds them into sketches.
+
+    Returns:
+        dict: 'terminal' and 'max_drawdown' sketches, and a 'bands' sketch of
+            wealth on the days listed in `band_days`.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    band_days = np.arange(num_days) if band_days is None else np.asarray(band_days)
+    sketches = {
+        'terminal': HistogramSketch(_wealth_edges()),
+        'max_drawdown': HistogramSketch(_drawdown_edges()),
+        'bands': HistogramSketch(_wealth_edges(), n_columns=len(band_days)),
+    }
+
+    for start in range(0, num_simulations, chunk_size):
+        n_paths = min(chunk_size, num_simulations - start)
+        returns = simulate_portfolio_returns(mean_returns, cov_matrix, weights, n_paths, num_days, rng)
+        wealth = np.cumprod(1 + returns, axis=1)
+        drawdown = 1 - wealth / np.maximum(np.maximum.accumulate(wealth, axis=1), 1)
+
+        sketches['terminal'].update(wealth[:, -1])
+        sketches['max_drawdown'].update(drawdown.max(axis=1))
+        sketches['bands'].update(wealth[:, band_days])
+
+    return sketches
+
+
+def simulate_portfolio_parallel(mean_returns, cov_matrix, weights, num_simulations=1_000_000, num_days=756,
+                                seed=None, chunk_size=10_000, paths_per_task=100_000, band_every=21,
+                                quantiles=DEFAULT_QUANTILES, confidence_level=0.95, max_workers=None):
+    """
+    Runs a large Monte Carlo simulation across a process pool with streaming statistics.
+
+    Paths are split into tasks with independent random streams spawned from one
+    SeedSequence, so results are reproducible and do not depend on the number of
+    workers. No task ever holds more than `chunk_size` paths; terminal wealth,
+    maximum drawdown and percentile bands are aggregated through mergeable
+    histogram sketches instead of a full paths matrix.
+
+    Parameters:
+        mean_returns (array): Expected daily return per asset.
+        cov_matrix (array): Daily covariance matrix of the assets.
+        weights (array): Portfolio weights.
+        num_simulations (int): Number of paths.
+        num_days (int): Horizon in trading days.
+        seed (int): Root seed.
+        chunk_size (int): Paths held in memory at once by a worker.
+        paths_per_task (int): Paths per pool task.
+        band_every (int): Spacing in days of the percentile bands.
+        quantiles (tuple): Quantiles to report.
+        confidence_level (float): Confidence level of VaR and CVaR.
+        max_workers (int): Process pool size. 1 runs sequentially in this process.
+
+    Returns:
+        dict: 'terminal' (summary of the terminal return incl. VaR/CVaR),
+            'max_drawdown' (quantiles of the maximum drawdown) and 'bands'
+            (DataFrame of wealth quantiles, indexed by day).
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pandas as pd
+
+    band_days = np.unique(np.append(np.arange(band_every - 1, num_days, band_every), num_days - 1))
+    sizes = [min(paths_per_task, num_simulations - start) for start in range(0, num_simulations, paths_per_task)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(mean_returns, cov_matrix, weights, size, num_days, seed_sequence, chunk_size, band_days)
+            for size, seed_sequence in zip(sizes, seeds)]
+
+    if max_workers == 1:
+        results = [simulate_chunk_sketches(*a) for a in args]
+    else:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            results = list(executor.map(simulate_chunk_sketches, *zip(*args)))
+
+    merged = results[0]
+    for result in results[1:]:
+        for name, sketch in result.items():
+            merged[name].merge(sketch)
+
+    terminal = merged['terminal']
+    var = terminal.quantile(1 - confidence_level)[0, 0] - 1
+    terminal_summary = {
+        'num_simulations': terminal.count,
+        'mean_return': terminal.mean()[0] - 1,
+        'quantiles': dict(zip(quantiles, terminal.quantile(quantiles)[:, 0] - 1)),
+        'VaR': var,
+        'CVaR': terminal.tail_mean(var + 1) - 1,
+        'probability_of_loss': terminal.counts[0, :np.searchsorted(terminal.edges, 1.0, side='right')].sum()
+                               / terminal.count,
+    }
+
+    return {
+        'terminal': terminal_summary,
+        'max_drawdown': dict(zip(quantiles, merged['max_drawdown'].quantile(quantiles)[:, 0])),
+        'bands': pd.DataFrame(merged['bands'].quantile(quantiles).T, index=pd.Index(band_days + 1, name='Day'),
+                              columns=list(quantiles)),
+    }
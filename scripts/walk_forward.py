@@ -0,0 +1,102 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from scripts.features import MODEL_NAMES, calculate_metrics, forecast_models
+
+
+def forecast_origins(n_obs, horizon, initial_train, step):
+    """
+    Returns the forecast origins (training-set sizes) of a walk-forward backtest.
+
+    Every origin leaves at least `horizon` observations after it for scoring.
+    """
+    return list(range(initial_train, n_obs - horizon + 1, step))
+
+
+def evaluate_origin(series, origin, horizon, models=MODEL_NAMES, window=None, **model_kwargs):
+    """
+    Fits the models on the data before `origin` and scores the next `horizon` values.
+
+    Parameters:
+        series (Series): Full price history.
+        origin (int): Position of the first out-of-sample observation.
+        horizon (int): Number of steps forecast and scored.
+        models (iterable of str): Models to evaluate.
+        window (int): Rolling training window length. None uses an expanding window.
+        **model_kwargs: Passed to forecast_models (seasonal_order, time_step, lstm_epochs).
+
+    Returns:
+        list of dict: One metrics record per model.
+    """
+    start = 0 if window is None else max(0, origin - window)
+    train, test = series.iloc[start:origin], series.iloc[origin:origin + horizon]
+    actual = test.values
+
+    forecasts, _ = forecast_models(train, test, horizon, models=models, **model_kwargs)
+
+    records = []
+    for model in models:
+        mae, rmse, mape = calculate_metrics(actual, forecasts[model])
+        records.append({
+            'origin': series.index[origin],
+            'model': model,
+            'train_size': len(train),
+            'horizon': horizon,
+            'MAE': mae,
+            'RMSE': rmse,
+            'MAPE': mape,
+        })
+    return records
+
+
+def walk_forward_backtest(series, horizon=30, initial_train=None, step=None, window=None,
+                          models=MODEL_NAMES, max_workers=None, **model_kwargs):
+    """
+    Evaluates ARIMA, SARIMA and LSTM across many forecast origins in parallel.
+
+    Origins are fanned out over a process pool; each worker fits its own models,
+    so the results do not depend on the number of workers.
+
+    Parameters:
+        series (Series): Full price history (e.g. stock['Close']).
+        horizon (int): Forecast horizon scored at every origin.
+        initial_train (int): Size of the first training set. Defaults to 80% of the data,
+            matching split_data.
+        step (int): Distance between consecutive origins. Defaults to `horizon`.
+        window (int): Rolling training window length. None uses an expanding window.
+        models (iterable of str): Any of 'ARIMA', 'SARIMA', 'LSTM'.
+        max_workers (int): Process pool size. 1 runs sequentially in this process.
+        **model_kwargs: Passed to forecast_models (seasonal_order, time_step, lstm_epochs).
+
+    Returns:
+        DataFrame: One row per (origin, model) with MAE, RMSE and MAPE.
+    """
+    models = tuple(models)
+    initial_train = initial_train or int(len(series) * 0.8)
+    step = step or horizon
+    origins = forecast_origins(len(series), horizon, initial_train, step)
+    if not origins:
+        raise ValueError("Series is too short for the requested initial_train and horizon")
+
+    args = [(series, origin, horizon, models, window) for origin in origins]
+
+    if max_workers == 1:
+        per_origin = [evaluate_origin(*a, **model_kwargs) for a in args]
+    else:
+        # TensorFlow is not fork-safe once initialised, so workers are spawned fresh
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+            futures = [executor.submit(evaluate_origin, *a, **model_kwargs) for a in args]
+            per_origin = [future.result() for future in futures]
+
+    records = [record for origin_records in per_origin for record in origin_records]
+    return pd.DataFrame.from_records(records)
+
+
+def summarize_backtest(backtest):
+    """
+    Aggregates per-origin backtest metrics into mean and std per model.
+    """
+    return backtest.groupby('model')[['MAE', 'RMSE', 'MAPE']].agg(['mean', 'std'])
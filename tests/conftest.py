@@ -0,0 +1,12 @@
+import pytest
+
+from scripts.rendering import configure_plotting, plotting_enabled
+
+
+@pytest.fixture
+def no_plots():
+    # Plotting functions run their computations without drawing anything
+    previous = 'show' if plotting_enabled() else 'off'
+    configure_plotting(mode='off')
+    yield
+    configure_plotting(mode=previous)
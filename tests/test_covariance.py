@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.covariance import (StreamingCovariance, clear_covariance_cache, ewma_covariance, get_covariance,
+                                ledoit_wolf_covariance)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    mixing = rng.normal(size=(4, 4))
+    return 0.01 * rng.normal(size=(300, 4)) @ mixing + 0.001
+
+
+def test_streaming_update_matches_np_cov(returns):
+    estimator = StreamingCovariance(4)
+    # Single rows and blocks of different sizes exercise both halves of the merge
+    estimator.update(returns[0])
+    estimator.update(returns[1:50])
+    for row in returns[50:60]:
+        estimator.update(row)
+    estimator.update(returns[60:])
+
+    assert estimator.count == len(returns)
+    np.testing.assert_allclose(estimator.mean(), returns.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(estimator.cov(), np.cov(returns, rowvar=False), rtol=1e-10)
+
+
+def test_streaming_remove_tracks_a_sliding_window(returns):
+    window = 100
+    estimator = StreamingCovariance(4).update(returns[:window])
+    for start in range(0, 200, 25):
+        estimator.update(returns[start + window:start + window + 25])
+        estimator.remove(returns[start:start + 25])
+
+        expected = returns[start + 25:start + window + 25]
+        np.testing.assert_allclose(estimator.mean(), expected.mean(axis=0), rtol=1e-10)
+        np.testing.assert_allclose(estimator.cov(), np.cov(expected, rowvar=False), rtol=1e-8)
+
+
+def test_streaming_remove_everything_resets(returns):
+    estimator = StreamingCovariance(4).update(returns[:10])
+
+    estimator.remove(returns[:10])
+
+    assert estimator.count == 0
+    np.testing.assert_array_equal(estimator.mean(), np.zeros(4))
+
+
+def test_streaming_decay_matches_pandas_ewm(returns):
+    estimator = StreamingCovariance(4, decay=0.94).update(returns)
+
+    expected = pd.DataFrame(returns).ewm(alpha=0.06, adjust=False).cov(bias=True).iloc[-4:].to_numpy()
+    np.testing.assert_allclose(estimator.cov(), expected, rtol=1e-10)
+    with pytest.raises(ValueError):
+        estimator.remove(returns[:1])
+
+
+def test_ewma_covariance_matches_weighted_np_cov(returns):
+    weights = 0.97 ** np.arange(len(returns) - 1, -1, -1)
+
+    expected = np.cov(returns, rowvar=False, aweights=weights, bias=True)
+    np.testing.assert_allclose(ewma_covariance(returns, decay=0.97), expected, rtol=1e-10)
+
+
+def test_ledoit_wolf_matches_sklearn(returns):
+    sklearn_covariance = pytest.importorskip('sklearn.covariance')
+
+    expected = sklearn_covariance.LedoitWolf().fit(returns).covariance_
+    np.testing.assert_allclose(ledoit_wolf_covariance(returns), expected, rtol=1e-12)
+
+
+def test_get_covariance_uses_pairwise_rows_and_returns_copies(returns):
+    frame = pd.DataFrame(returns, columns=list('ABCD'))
+    frame.iloc[5, 2] = np.nan
+
+    first = get_covariance(frame)
+    first.iloc[0, 0] = 1e9
+    second = get_covariance(frame)
+
+    assert list(second.columns) == list('ABCD')
+    np.testing.assert_allclose(second.to_numpy(), frame.cov().to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(second.loc['A', 'B'], np.cov(returns[:, :2], rowvar=False)[0, 1], rtol=1e-12)
+
+
+def test_shrinkage_drops_incomplete_rows_and_says_so(returns, capsys):
+    frame = pd.DataFrame(returns, columns=list('ABCD'))
+    frame.iloc[5, 2] = np.nan
+
+    covariance = get_covariance(frame, 'ewma')
+
+    assert 'dropped 1 of 300 rows' in capsys.readouterr().out
+    np.testing.assert_allclose(covariance.to_numpy(), ewma_covariance(np.delete(returns, 5, axis=0)), rtol=1e-12)
+
+
+def test_clear_covariance_cache_recomputes(returns, monkeypatch):
+    from scripts import covariance
+
+    get_covariance(returns)
+    calls = []
+    monkeypatch.setattr(covariance, 'sample_covariance', lambda r: calls.append(1) or np.cov(r, rowvar=False))
+
+    get_covariance(returns)
+    clear_covariance_cache()
+    get_covariance(returns)
+
+    assert len(calls) == 1
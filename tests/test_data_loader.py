@@ -0,0 +1,38 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import fake_source
+from scripts.data_loader import load_frames, load_universe
+
+
+def failing_for(bad, source):
+    def load(ticker, start_date, end_date):
+        if ticker in bad:
+            raise ConnectionError(f'{ticker} unavailable')
+        return source(ticker, start_date, end_date)
+    return load
+
+
+def test_skipped_tickers_warn_and_the_rest_load(caplog):
+    source = failing_for({'SYN0001'}, fake_source())
+
+    with caplog.at_level(logging.WARNING, logger='scripts.data_loader'):
+        with pytest.warns(RuntimeWarning, match='SYN0001'):
+            panel = load_universe(['SYN0000', 'SYN0001'], '2020-01-01', '2020-03-01', fields=['Close'],
+                                  cache_dir=None, source=source, retries=1, backoff=0.0, errors='skip')
+
+    assert list(panel.columns) == [('SYN0000', 'Close')]
+    assert 'retrying' in caplog.text
+
+
+def test_universe_with_no_loadable_ticker_raises():
+    source = failing_for({'SYN0000', 'SYN0001'}, fake_source())
+
+    with pytest.warns(RuntimeWarning), pytest.raises(RuntimeError, match='None of the 2'):
+        load_universe(['SYN0000', 'SYN0001'], '2020-01-01', '2020-03-01', cache_dir=None, source=source,
+                      retries=0, errors='skip')
+
+    with pytest.raises(RuntimeError, match='Failed to load 2'):
+        load_frames(['SYN0000', 'SYN0001'], '2020-01-01', '2020-03-01', cache_dir=None, source=source, retries=0)
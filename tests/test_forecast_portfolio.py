@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.forecast_portfolio import forecast_allocation, forecast_error_covariance
+
+
+def synthetic_results(n_assets=3, steps=40, realized=True, seed=0):
+    rng = np.random.default_rng(seed)
+    results = {}
+    for i in range(n_assets):
+        drift = 1 + 0.0005 * (i + 1)
+        forecast = 100 * np.cumprod(np.full(steps, drift))
+        actual = 100 * np.cumprod(drift + 0.01 * (i + 1) * rng.normal(size=steps))
+        results[f'A{i}'] = {'arima_forecast': forecast, 'sarima_forecast': forecast * 1.001,
+                            'lstm_forecast': forecast * 0.999, 'test_data': actual if realized else np.array([]),
+                            'last_price': 100.0}
+    return results
+
+
+def historical_returns(columns, seed=1):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(0.01 * rng.normal(size=(250, len(columns))), columns=columns)
+
+
+@pytest.mark.parametrize('strategy', ['max_sharpe', 'min_variance'])
+def test_forecast_allocation_weights_are_a_budget_within_bounds(strategy):
+    results = synthetic_results()
+
+    allocation = forecast_allocation(results, strategy=strategy, bounds=(0.05, 0.6),
+                                     historical_returns=historical_returns(list(results)))
+
+    weights = allocation['weights']
+    assert list(weights.index) == ['ARIMA', 'SARIMA', 'LSTM', 'ensemble']
+    assert list(weights.columns) == list(results)
+    np.testing.assert_allclose(weights.sum(axis=1), 1, atol=1e-8)
+    assert (weights >= 0.05 - 1e-8).all().all() and (weights <= 0.6 + 1e-8).all().all()
+    assert list(allocation['statistics'].index) == list(weights.index)
+
+
+def test_unrealized_forecasts_need_a_fallback_covariance():
+    results = synthetic_results(realized=False)
+
+    with pytest.raises(ValueError, match='at least 2'):
+        forecast_error_covariance(results, 'ARIMA')
+
+    history = historical_returns(list(results))
+    covariance = forecast_error_covariance(results, 'ARIMA', method='sample', fallback_returns=history)
+    np.testing.assert_allclose(covariance.to_numpy(), history.cov().to_numpy())
+
+    allocation = forecast_allocation(results, historical_returns=history)
+    np.testing.assert_allclose(allocation['weights'].sum(axis=1), 1, atol=1e-8)
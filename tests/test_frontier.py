@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from scripts.frontier import (_negative_sharpe, _variance, closed_form_frontier, efficient_frontier,
+                              max_sharpe_portfolio, min_variance_portfolio)
+
+sco = pytest.importorskip('scipy.optimize')
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(0)
+    mixing = rng.normal(size=(4, 4))
+    # Daily scale: variances of order 1e-4 are below SLSQP's default tolerance
+    cov = 0.04 * (mixing @ mixing.T / 4 + 0.5 * np.eye(4)) / 252
+    mu = np.array([0.05, 0.08, 0.11, 0.07]) / 252
+    return mu, cov
+
+
+def test_analytic_gradients_match_finite_differences(market):
+    mu, cov = market
+    w = np.array([0.1, 0.4, 0.3, 0.2])
+
+    for objective, args in ((_variance, (cov,)), (_negative_sharpe, (mu, cov, 0.01))):
+        gradient = objective(w, *args)[1]
+        numeric = sco.approx_fprime(w, lambda x: objective(x, *args)[0], 1e-7)
+        np.testing.assert_allclose(gradient, numeric, rtol=1e-5, atol=1e-7)
+
+
+def test_unconstrained_frontier_matches_closed_form(market):
+    mu, cov = market
+    result = efficient_frontier(mu, cov, n_points=40, bounds=(-5, 5))
+    frontier = result['frontier']
+
+    weights, volatility = closed_form_frontier(mu, cov, frontier['return'])
+    # Wide bounds only bind towards the maximum return; the points before solve the short-sales-allowed problem
+    free = (np.abs(weights) < 5 - 1e-3).all(axis=1)
+    assert free.sum() >= 10
+    np.testing.assert_allclose(frontier[list(range(4))].to_numpy()[free], weights[free], atol=1e-4)
+    np.testing.assert_allclose(frontier['volatility'][free], volatility[free], rtol=1e-6)
+
+    inv_ones = np.linalg.solve(cov, np.ones(4))
+    np.testing.assert_allclose(result['min_variance'], inv_ones / inv_ones.sum(), atol=1e-4)
+    tangency = np.linalg.solve(cov, mu)
+    np.testing.assert_allclose(result['max_sharpe'], tangency / tangency.sum(), atol=1e-4)
+
+
+def test_bounded_portfolios_are_budgets_within_bounds(market):
+    mu, cov = market
+
+    for weights in (min_variance_portfolio(mu, cov, (0.1, 0.4)), max_sharpe_portfolio(mu, cov, 0.01, (0.1, 0.4))):
+        assert abs(weights.sum() - 1) < 1e-8
+        assert weights.min() >= 0.1 - 1e-8 and weights.max() <= 0.4 + 1e-8
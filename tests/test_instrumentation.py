@@ -0,0 +1,93 @@
+import types
+
+import pandas as pd
+import pytest
+
+from scripts import instrumentation
+from scripts.instrumentation import StageRecorder, add_hook, context, peak_rss_mib, remove_hook, stage
+
+
+def test_nested_stages_record_parent_and_context():
+    with StageRecorder() as recorder:
+        with context(asset='TSLA'), stage('fit', mode='fast') as info:
+            with stage('predict'):
+                pass
+            info['iterations'] = 7
+        with stage('report'):
+            pass
+
+    inner, outer, after = recorder.records
+    assert (inner['stage'], inner['parent'], inner['asset']) == ('predict', 'fit', 'TSLA')
+    assert (outer['stage'], outer['parent'], outer['asset']) == ('fit', None, 'TSLA')
+    assert outer['mode'] == 'fast' and outer['iterations'] == 7
+    assert 'asset' not in after and after['parent'] is None
+    assert outer['wall_s'] >= inner['wall_s'] >= 0
+
+
+def test_hooks_receive_every_record_until_removed():
+    first, second = [], []
+    add_hook(first.append)
+    add_hook(second.append)
+    try:
+        with stage('a'):
+            pass
+        remove_hook(second.append)
+        with stage('b'):
+            pass
+    finally:
+        remove_hook(first.append)
+        remove_hook(second.append)
+
+    assert [r['stage'] for r in first] == ['a', 'b']
+    assert [r['stage'] for r in second] == ['a']
+    with stage('unobserved') as info:
+        assert info == {}
+    assert len(first) == 2
+
+
+def test_failing_stage_is_recorded_and_reraised():
+    with StageRecorder() as recorder:
+        with pytest.raises(KeyError):
+            with stage('load'):
+                raise KeyError('TSLA')
+
+    assert recorder.records[0]['error'] == "KeyError('TSLA')"
+
+
+def test_report_aggregates_per_stage():
+    recorder = StageRecorder()
+    for wall, iterations, error in ((1.0, 3, None), (2.0, None, 'boom'), (0.5, 4, None)):
+        recorder({'stage': 'fit', 'wall_s': wall, 'cpu_s': wall / 2, 'peak_rss_mib': 100 + wall,
+                  'rss_growth_mib': wall, 'iterations': iterations, 'error': error})
+    recorder({'stage': 'predict', 'wall_s': 0.1, 'cpu_s': 0.1, 'peak_rss_mib': 90.0, 'rss_growth_mib': 0.0,
+              'iterations': None, 'error': None})
+
+    report = recorder.report()
+
+    assert list(report.index) == ['fit', 'predict']
+    fit = report.loc['fit']
+    assert fit['calls'] == 3 and fit['wall_total_s'] == 3.5 and fit['wall_max_s'] == 2.0
+    assert fit['cpu_per_wall'] == 0.5 and fit['peak_rss_mib'] == 102.0
+    assert fit['iterations'] == 7 and fit['errors'] == 1
+    assert pd.isna(report.loc['predict', 'iterations'])
+    assert StageRecorder().report().empty
+
+
+@pytest.mark.parametrize('platform, expected', [('linux', 1024.0), ('darwin', 1.0)])
+def test_peak_rss_units(monkeypatch, platform, expected):
+    usage = types.SimpleNamespace(ru_maxrss=2 ** 20)
+    fake = types.SimpleNamespace(RUSAGE_SELF=0, getrusage=lambda who: usage)
+    monkeypatch.setattr(instrumentation, 'resource', fake)
+    monkeypatch.setattr(instrumentation.sys, 'platform', platform)
+
+    assert peak_rss_mib() == expected
+
+
+def test_peak_rss_without_resource_module(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'resource', None)
+
+    with StageRecorder() as recorder, stage('fit'):
+        pass
+
+    assert peak_rss_mib() is None
+    assert recorder.records[0]['peak_rss_mib'] is None and recorder.records[0]['rss_growth_mib'] is None
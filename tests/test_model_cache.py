@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.model_cache import ModelCache
+
+
+@pytest.fixture
+def series():
+    return pd.Series(np.linspace(100, 120, 50), index=pd.bdate_range('2024-01-01', periods=50))
+
+
+def test_keys_are_stable_and_cover_data_index_and_params(series):
+    cache = ModelCache(cache_dir=None)
+    key = cache.key('ARIMA', series, order=(1, 1, 1), m=1)
+
+    assert key == cache.key('ARIMA', series.copy(), m=1, order=(1, 1, 1))
+    assert key.startswith('arima-')
+    assert key != cache.key('SARIMA', series, order=(1, 1, 1), m=1)
+    assert key != cache.key('ARIMA', series * 1.01, order=(1, 1, 1), m=1)
+    assert key != cache.key('ARIMA', series.reset_index(drop=True), order=(1, 1, 1), m=1)
+    assert key != cache.key('ARIMA', series, order=(2, 1, 1), m=1)
+    assert cache.key('LSTM', (series.to_numpy(), series.to_numpy()[:10])) != cache.key('LSTM', series.to_numpy())
+
+
+def test_eviction_removes_the_least_recently_used_model(tmp_path):
+    model = np.zeros(1000)
+    cache = ModelCache(cache_dir=str(tmp_path), max_bytes=10 ** 9)
+    cache.put('a', model)
+    cache.put('b', model)
+    size = os.path.getsize(tmp_path / 'a.pkl')
+    for age, name in ((300, 'a'), (200, 'b')):
+        stamp = os.path.getmtime(tmp_path / f'{name}.pkl') - age
+        os.utime(tmp_path / f'{name}.pkl', (stamp, stamp))
+
+    cache.max_bytes = 2 * size
+    assert cache.get('a') is not None
+    cache.put('c', model)
+
+    assert sorted(os.listdir(tmp_path)) == ['a.pkl', 'c.pkl']
+    assert cache.get('b') is None
+
+
+def test_pickled_models_round_trip_and_fit_once(tmp_path):
+    cache = ModelCache(cache_dir=str(tmp_path))
+    fits = []
+
+    def fit():
+        fits.append(1)
+        return {'order': (1, 1, 1), 'params': np.arange(3.0)}
+
+    first = cache.get_or_fit('arima-x', fit)
+    second = ModelCache(cache_dir=str(tmp_path)).get_or_fit('arima-x', fit)
+
+    assert len(fits) == 1
+    np.testing.assert_array_equal(second['params'], first['params'])
+
+
+def test_keras_models_round_trip_in_native_format(tmp_path):
+    keras = pytest.importorskip('tensorflow.keras')
+    model = keras.Sequential([keras.Input(shape=(4, 1)), keras.layers.LSTM(3), keras.layers.Dense(2)])
+    X = np.random.default_rng(0).normal(size=(5, 4, 1))
+
+    cache = ModelCache(cache_dir=str(tmp_path))
+    cache.put('lstm-x', model)
+    loaded = cache.get('lstm-x')
+
+    assert os.listdir(tmp_path) == ['lstm-x.keras']
+    np.testing.assert_allclose(loaded.predict(X, verbose=0), model.predict(X, verbose=0), rtol=1e-6)
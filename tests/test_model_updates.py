@@ -0,0 +1,100 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.features import update_arima, update_sarima
+
+pytest.importorskip('statsmodels')
+from statsmodels.tsa.statespace.sarimax import SARIMAX  # noqa: E402
+
+
+def holiday_prices(n_days=330, seed=0):
+    # Business days with a few holidays removed, like a real exchange calendar (no frequency)
+    index = pd.bdate_range('2020-01-01', periods=n_days).delete([20, 90, 200, 300])
+    values = 100 + np.cumsum(np.random.default_rng(seed).normal(size=len(index)))
+    return pd.Series(values, index=index)
+
+
+@pytest.fixture(autouse=True)
+def quiet():
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
+
+
+def test_update_sarima_on_holiday_calendar_can_forecast():
+    prices = holiday_prices()
+    assert prices.index.freq is None
+    fitted = SARIMAX(prices[:300], order=(1, 1, 0)).fit(disp=False)
+
+    updated = update_sarima(fitted, prices[300:310])
+
+    assert updated.nobs == 310
+    expected = SARIMAX(prices[:310].to_numpy(), order=(1, 1, 0)).filter(fitted.params).forecast(3)
+    np.testing.assert_allclose(np.asarray(updated.forecast(3)), expected)
+
+
+def test_update_sarima_keeps_frequency_index():
+    prices = pd.Series(holiday_prices().to_numpy()[:310], index=pd.bdate_range('2020-01-01', periods=310))
+    fitted = SARIMAX(prices[:300], order=(1, 1, 0)).fit(disp=False)
+
+    forecast = update_sarima(fitted, prices[300:]).forecast(2)
+
+    assert forecast.index[0] == prices.index[-1] + pd.offsets.BDay(1)
+
+
+def test_update_arima_returns_new_model():
+    pytest.importorskip('pmdarima')
+    from scripts.features import fit_arima
+
+    prices = holiday_prices()
+    model = fit_arima(prices[:300])
+
+    updated = update_arima(model, prices[300:310])
+
+    assert updated is not model
+    assert model.arima_res_.nobs == 300
+    assert updated.arima_res_.nobs == 310
+    assert np.all(np.isfinite(np.asarray(updated.predict(5))))
+
+
+class RecordingModel:
+    # Stands in for a Keras model: records the windows it is fitted on
+    optimizer = 'adam'
+
+    def __init__(self, horizon):
+        self.output_shape = (None, horizon)
+        self.fits = []
+
+    def fit(self, X, y, **kwargs):
+        self.fits.append((X, y))
+
+
+@pytest.mark.parametrize('horizon', [1, 5, 30])
+def test_fine_tune_lstm_trains_on_replay_plus_new_windows(horizon):
+    from sklearn.preprocessing import MinMaxScaler
+
+    from scripts.features import fine_tune_lstm
+
+    history, new_obs = np.arange(500.0), np.arange(500.0, 510.0)
+    scaler = MinMaxScaler().fit(history.reshape(-1, 1))
+    model = RecordingModel(horizon)
+
+    fine_tune_lstm(model, scaler, history, new_obs, time_step=20, replay=50)
+
+    X, y = model.fits[0]
+    assert X.shape == (50 + len(new_obs), 20, 1) and y.shape == (50 + len(new_obs), horizon)
+    np.testing.assert_allclose(scaler.inverse_transform(y[-1:, -1:]), [[509.0]])
+
+
+def test_fine_tune_lstm_rejects_a_history_too_short_for_one_window():
+    from sklearn.preprocessing import MinMaxScaler
+
+    from scripts.features import fine_tune_lstm
+
+    scaler = MinMaxScaler().fit(np.arange(30.0).reshape(-1, 1))
+
+    with pytest.raises(ValueError, match='no windows'):
+        fine_tune_lstm(RecordingModel(10), scaler, np.arange(20.0), np.arange(20.0, 25.0), time_step=20)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts import order_search
+
+pytest.importorskip('pmdarima')
+
+
+def test_failed_final_refit_is_reported_per_asset(monkeypatch):
+    rng = np.random.default_rng(0)
+    series = {asset: pd.Series(100 + np.cumsum(rng.normal(size=300))) for asset in ('A', 'B')}
+    fit_candidate = order_search.fit_candidate
+
+    def refit_fails_for_b(data, order, information_criterion='aic', return_model=False):
+        if return_model and data is series['B']:
+            raise RuntimeError('singular matrix')
+        return fit_candidate(data, order, information_criterion, return_model)
+
+    monkeypatch.setattr(order_search, 'fit_candidate', refit_fails_for_b)
+
+    models, report = order_search.select_orders(series, max_p=1, max_q=1, max_workers=1)
+
+    assert list(models) == ['A']
+    assert report.loc['A', 'status'] == 'ok'
+    assert report.loc['B', 'status'] == 'failed'
+    assert 'final refit' in report.loc['B', 'error']
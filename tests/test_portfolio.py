@@ -0,0 +1,69 @@
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from scripts.portfolio import conditional_value_at_risk, portfolio_statistics, return_columns, value_at_risk
+
+
+def test_value_at_risk_on_an_exact_sample():
+    # Returns -0.10, -0.09, ..., 0.10: with 21 points the 5% quantile is exactly the second smallest
+    returns = (np.arange(21) - 10) / 100
+
+    historical, parametric = value_at_risk(returns[:, None], 0.95)
+
+    np.testing.assert_allclose(historical[0], -0.09)
+    expected = returns.mean() + NormalDist().inv_cdf(0.05) * returns.std(ddof=1)
+    np.testing.assert_allclose(parametric[0], expected)
+
+
+def test_conditional_value_at_risk_is_the_tail_mean():
+    returns = (np.arange(20) - 10)[:, None] / 100
+    var, _ = value_at_risk(returns, 0.95)
+
+    cvar = conditional_value_at_risk(returns, var)
+
+    np.testing.assert_allclose(cvar[0], returns[returns <= var].mean())
+
+
+def test_value_at_risk_per_column_ignores_missing_values():
+    returns = np.column_stack([np.linspace(-0.05, 0.05, 101), np.linspace(-0.1, 0.1, 101)])
+    returns[3, 1] = np.nan
+
+    historical, _ = value_at_risk(returns, 0.9)
+
+    np.testing.assert_allclose(historical, [np.quantile(returns[:, 0], 0.1),
+                                            np.quantile(returns[~np.isnan(returns[:, 1]), 1], 0.1)])
+
+
+def test_portfolio_statistics_batch_matches_single_portfolios():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0.0005, 0.01, size=(500, 3))
+    weights = np.array([[1, 0, 0], [0.2, 0.3, 0.5]])
+
+    batch = portfolio_statistics(returns, weights)
+
+    for k, w in enumerate(weights):
+        portfolio = returns @ w
+        var, _ = value_at_risk(portfolio[:, None])
+        np.testing.assert_allclose(batch.loc[k, 'VaR (Historical)'], var[0])
+        np.testing.assert_allclose(batch.loc[k, 'CVaR'], portfolio[portfolio <= var[0]].mean())
+        np.testing.assert_allclose(batch.loc[k, 'Volatility (Daily)'], portfolio.std(ddof=1))
+
+
+def test_portfolio_comparisons_follow_the_return_columns(no_plots):
+    from scripts.plots import cumulative_returns_indiv_assets, risk_return_analysis
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(0.01 * rng.normal(size=(50, 2)), columns=['AAPL_daily_return', 'GLD_daily_return'])
+    df['Close'] = 100.0
+    portfolio = df[return_columns(df)] @ np.array([0.3, 0.7])
+
+    cumulative = cumulative_returns_indiv_assets(df, portfolio)
+    risk_return = risk_return_analysis(df, df[return_columns(df)].mean(), portfolio.mean(), portfolio.std())
+
+    assert list(cumulative.columns) == ['Portfolio', 'AAPL', 'GLD']
+    np.testing.assert_allclose(cumulative['GLD'].iloc[-1], np.prod(1 + df['GLD_daily_return']))
+    assert list(risk_return.index) == ['AAPL', 'GLD', 'Portfolio']
+    np.testing.assert_allclose(risk_return.loc['AAPL'], [df['AAPL_daily_return'].mean(), df['AAPL_daily_return'].std()])
+    np.testing.assert_allclose(risk_return.loc['Portfolio'], [portfolio.mean(), portfolio.std()])
@@ -0,0 +1,50 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import fake_source
+from scripts import price_store
+from scripts.price_store import load_prices, read_cache
+
+pytest.importorskip('pyarrow')
+
+
+def recording(source):
+    def load(ticker, start_date, end_date):
+        load.ranges.append((str(start_date.date()), str(end_date.date())))
+        return source(ticker, start_date, end_date)
+    load.ranges = []
+    return load
+
+
+def test_refresh_fetches_only_the_missing_ranges(tmp_path):
+    truth = fake_source()
+    source = recording(truth)
+
+    load_prices('SYN0000', '2020-03-02', '2020-06-01', cache_dir=tmp_path, source=source)
+    load_prices('SYN0000', '2020-04-01', '2020-05-01', cache_dir=tmp_path, source=source)
+    data = load_prices('SYN0000', '2020-01-02', '2020-08-03', cache_dir=tmp_path, source=source)
+
+    assert source.ranges == [('2020-03-02', '2020-06-01'), ('2020-01-02', '2020-03-02'), ('2020-06-01', '2020-08-03')]
+    expected = truth('SYN0000', pd.Timestamp('2020-01-02'), pd.Timestamp('2020-08-03'))
+    # Only the close path is the same whatever range the fake source is asked for
+    pd.testing.assert_series_equal(data['Close'], expected['Close'], check_freq=False)
+    assert read_cache('SYN0000', tmp_path)[1] == (pd.Timestamp('2020-01-02'), pd.Timestamp('2020-08-03'))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_failed_write_keeps_the_previous_cache(tmp_path, monkeypatch):
+    source = recording(fake_source())
+    before = load_prices('SYN0000', '2020-03-02', '2020-06-01', cache_dir=tmp_path, source=source)
+
+    def crash(src, dst):
+        raise OSError('disk full')
+    monkeypatch.setattr(price_store.os, 'replace', crash)
+    with pytest.raises(OSError):
+        load_prices('SYN0000', '2020-03-02', '2020-08-03', cache_dir=tmp_path, source=source)
+    monkeypatch.undo()
+
+    cached, covered = read_cache('SYN0000', tmp_path)
+    pd.testing.assert_frame_equal(cached, before, check_freq=False)
+    assert covered == (pd.Timestamp('2020-03-02'), pd.Timestamp('2020-06-01'))
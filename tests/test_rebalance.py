@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.rebalance import rebalance_backtest
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range('2022-01-03', periods=90)
+    return pd.DataFrame(0.01 * rng.normal(size=(90, 3)) + 0.0005, index=index, columns=['A', 'B', 'C'])
+
+
+def test_one_holding_period_matches_hand_computation(returns):
+    target = np.array([0.5, 0.3, 0.2])
+    seen = []
+
+    def strategy(mean, cov, previous):
+        seen.append((mean, cov, previous))
+        return target
+
+    result = rebalance_backtest(returns.iloc[:70], lookback=60, rebalance_every=10, strategy=strategy, cost_bps=25)
+
+    mean, cov, previous = seen[0]
+    window = returns.to_numpy()[:60]
+    np.testing.assert_allclose(mean, window.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(cov, np.cov(window, rowvar=False), rtol=1e-10)
+    assert previous is None
+
+    # Weights drift with the assets; the first day pays the cost of buying the whole target
+    holdings, expected = target.copy(), []
+    for row in returns.to_numpy()[60:70]:
+        day = holdings @ row
+        expected.append(day)
+        holdings = holdings * (1 + row) / (1 + day)
+    expected[0] -= target.sum() * 25 / 1e4 * (1 + expected[0])
+
+    np.testing.assert_allclose(result['returns'], expected, rtol=1e-12)
+    np.testing.assert_allclose(result['turnover'], [1.0])
+    np.testing.assert_allclose(result['equity'].iloc[-1], np.prod(1 + np.array(expected)))
+
+
+def test_sliding_window_and_drifted_weights_feed_each_rebalance(returns):
+    targets = [np.array([0.5, 0.3, 0.2]), np.array([0.2, 0.2, 0.6]), np.array([1 / 3] * 3)]
+    seen = []
+
+    def strategy(mean, cov, previous):
+        seen.append((cov, previous))
+        return targets[len(seen) - 1]
+
+    result = rebalance_backtest(returns, lookback=60, rebalance_every=10, strategy=strategy, cost_bps=10)
+
+    values = returns.to_numpy()
+    for k, (cov, previous) in enumerate(seen):
+        start = 60 + 10 * k
+        np.testing.assert_allclose(cov, np.cov(values[start - 60:start], rowvar=False), rtol=1e-8)
+        if k:
+            drifted = targets[k - 1] * np.prod(1 + values[start - 10:start], axis=0)
+            np.testing.assert_allclose(previous, drifted / drifted.sum(), rtol=1e-12)
+            np.testing.assert_allclose(result['turnover'].iloc[k], np.abs(targets[k] - previous).sum(), rtol=1e-12)
+    assert result['summary']['Rebalances'] == 3
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.plots import closePriceOverTime, dailyReturn, join_features, timeSeriesDecomposition, volatility_rolling
+from scripts.rolling import RollingFeatures, ewma_volatility, rolling_features, rolling_moments
+
+
+@pytest.fixture
+def prices():
+    # Three tickers on one calendar; B misses two dates, C starts late
+    index = pd.bdate_range('2021-01-01', periods=120)
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(1e4 + np.cumsum(rng.normal(size=(120, 3)), axis=0), index=index, columns=list('ABC'))
+    frame.iloc[[40, 75], 1] = np.nan
+    frame.iloc[:10, 2] = np.nan
+    frame.index.name = 'Date'
+    return frame
+
+
+def test_rolling_moments_match_pandas_on_each_column(prices):
+    values = prices.to_numpy()
+
+    for window, expected in ((30, lambda s: s.rolling(30)), (None, lambda s: s.expanding())):
+        mean, std = rolling_moments(values, window)
+        for column, name in enumerate(prices.columns):
+            observed = prices[name].dropna()
+            np.testing.assert_allclose(mean[:, column], expected(observed).mean().reindex(prices.index), rtol=1e-12)
+            np.testing.assert_allclose(std[:, column], expected(observed).std().reindex(prices.index), rtol=1e-7)
+
+
+def test_rolling_features_use_each_tickers_own_rows(prices):
+    features = rolling_features(prices, windows=(30,))
+
+    for name in prices.columns:
+        observed = prices[name].dropna()
+        feature = features.xs(name, level='Ticker').reindex(observed.index)
+        assert feature['mean_30'].isna().sum() == 29
+        np.testing.assert_allclose(feature['mean_30'], observed.rolling(30).mean(), rtol=1e-12)
+        np.testing.assert_allclose(feature['return'], observed.pct_change(), rtol=1e-12)
+
+
+def test_ewma_volatility_matches_pandas_ewm(prices):
+    returns = prices['A'].pct_change()
+
+    vol = ewma_volatility(returns.to_numpy()[:, None], decay=0.94)[:, 0]
+
+    expected = np.sqrt((returns ** 2).ewm(alpha=0.06, adjust=False).mean())
+    np.testing.assert_allclose(vol, expected, rtol=1e-12)
+
+
+def test_streaming_updates_match_batch_features(prices):
+    windows = (5, 30, None)
+    engine, _ = RollingFeatures.from_history(prices.iloc[:60], windows=windows)
+
+    streamed = pd.concat([engine.update(row, date) for date, row in prices.iloc[60:].iterrows()])
+
+    expected = rolling_features(prices, windows=windows).loc[prices.index[60:]]
+    pd.testing.assert_frame_equal(streamed, expected, check_exact=False, rtol=1e-9)
+
+
+def test_daily_return_leaves_inputs_untouched(prices, no_plots):
+    frames = [prices[name].dropna().rename('Close').rename_axis('Date').reset_index() for name in prices.columns]
+    before = [frame.copy() for frame in frames]
+
+    returns = dailyReturn(frames, list(prices.columns))
+    joined = join_features(frames, list(prices.columns), returns)
+
+    for frame, original in zip(frames, before):
+        pd.testing.assert_frame_equal(frame, original)
+    np.testing.assert_allclose(joined[1]['Daily_Return'], frames[1]['Close'].pct_change().fillna(0), rtol=1e-12)
+
+
+def test_plotting_helpers_return_their_data_when_plots_are_off(prices, no_plots):
+    tickers = list(prices.columns)
+    frames = [prices[name].dropna().rename('Adj Close').rename_axis('Date').reset_index() for name in tickers]
+    for frame in frames:
+        frame['Close'] = frame['Adj Close']
+
+    close = closePriceOverTime(frames, tickers)
+    pd.testing.assert_frame_equal(close, prices, check_freq=False)
+
+    rolling = volatility_rolling(20, frames, tickers)
+    for name in tickers:
+        observed = prices[name].dropna()
+        np.testing.assert_allclose(rolling.xs(name, level='Ticker')['Rolling_Std'], observed.rolling(20).std(),
+                                   rtol=1e-7)
+
+    long_frames = [pd.concat([frame] * 5, ignore_index=True) for frame in frames[:1]]
+    decompositions = timeSeriesDecomposition(long_frames, tickers[:1])
+    np.testing.assert_allclose(decompositions['A'].observed, long_frames[0]['Close'])
@@ -0,0 +1,118 @@
+import json
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.features import split_data
+from scripts.run_batch import forecast_asset, read_checkpoint
+
+
+def holiday_prices(n_days=330, seed=0):
+    # Business days with a few holidays removed, like a real exchange calendar (no frequency)
+    index = pd.bdate_range('2020-01-01', periods=n_days).delete([20, 90, 200, 300])
+    values = 100 + np.cumsum(np.random.default_rng(seed).normal(size=len(index)))
+    return pd.Series(values, index=index, name='Close')
+
+
+def batch_config(output_dir, **overrides):
+    config = {'seasonal_order': [1, 1, 1, 5], 'forecast_days': 20, 'model_cache': None, 'lstm_mode': 'recursive',
+              'sarima_mode': 'fixed', 'save_models': False, 'output_dir': str(output_dir)}
+    config.update(overrides)
+    return config
+
+
+@pytest.mark.parametrize('sarima_mode', ['fixed', 'fast'])
+def test_forecast_asset_on_holiday_calendar(tmp_path, no_plots, sarima_mode):
+    pytest.importorskip('pmdarima')
+    pytest.importorskip('tensorflow')
+    prices = holiday_prices()
+    assert prices.index.freq is None
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        status = forecast_asset('TEST', prices, batch_config(tmp_path, sarima_mode=sarima_mode))
+
+    frame, meta = read_checkpoint(str(tmp_path), 'TEST')
+    assert status['status'] == 'done'
+    # Forecasts are labelled with the real trading dates that follow the training split
+    train, test = split_data(prices)
+    pd.testing.assert_index_equal(frame.index, test.index[:20], check_names=False)
+    np.testing.assert_allclose(frame['actual'], test.iloc[:20])
+    assert frame[['ARIMA', 'SARIMA', 'LSTM']].notna().all().all()
+    assert meta['train_end'] == str(train.index[-1].date())
+
+
+def test_saved_models_start_at_the_last_observed_price(tmp_path, no_plots):
+    pytest.importorskip('pmdarima')
+    pytest.importorskip('tensorflow')
+    from scripts.serving import ForecastServer
+
+    prices = holiday_prices()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        forecast_asset('TEST', prices, batch_config(tmp_path, save_models=True))
+        with open(tmp_path / 'run.json', 'w') as f:
+            json.dump({'lstm_mode': 'recursive'}, f)
+        server = ForecastServer(str(tmp_path), horizon=5)
+
+    models = server.models['TEST']
+    assert models['ARIMA'].arima_res_.nobs == len(prices)
+    assert models['SARIMA'].nobs == len(prices)
+    pd.testing.assert_series_equal(models['history'], prices)
+    forecast = server.forecast(['TEST'], 5)['forecasts']['TEST']
+    assert forecast['dates'][0] == str((prices.index[-1] + pd.offsets.BDay(1)).date())
+    sarima = models['SARIMA'].model
+    expected = sarima.clone(prices.to_numpy()).filter(models['SARIMA'].params).forecast(5)
+    np.testing.assert_allclose(forecast['SARIMA'], expected)
+
+
+def run_json(output_dir):
+    with open(output_dir / 'run.json') as f:
+        return json.load(f)
+
+
+def test_resume_keeps_the_recorded_end_and_finished_runs_move_on(tmp_path, monkeypatch):
+    from benchmarks.synthetic import fake_source
+    from scripts import run_batch
+
+    monkeypatch.setattr(run_batch, 'forecast_asset', lambda ticker, prices, config: {'elapsed_s': 0.0})
+    today = str(pd.Timestamp.today().date())
+    output_dir = tmp_path / 'nightly'
+
+    def run():
+        return run_batch.run_batch(['AAA'], str(output_dir), start_date='2020-01-01', workers=1, price_cache=None,
+                                   save_models=False, source=fake_source())
+
+    run()
+    assert run_json(output_dir)['end'] == today
+    assert run_json(output_dir)['finished']
+
+    # A run started before midnight and interrupted resumes with its own end date
+    run_batch._write_json(str(output_dir / 'run.json'), dict(run_json(output_dir), end='2021-06-01', finished=False))
+    run()
+    assert run_json(output_dir)['end'] == '2021-06-01'
+    assert run_json(output_dir)['finished']
+
+    # On a new day the next run is built aside: a crash leaves the finished run in place
+    (output_dir / 'previous.txt').write_text('last good run')
+    combine_outputs = run_batch.combine_outputs
+    monkeypatch.setattr(run_batch, 'combine_outputs', lambda *args: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        run()
+    assert run_json(output_dir)['end'] == '2021-06-01'
+    assert (output_dir / 'previous.txt').exists()
+
+    # Resuming finishes the staged run and only then swaps it in
+    monkeypatch.setattr(run_batch, 'combine_outputs', combine_outputs)
+    run()
+    assert run_json(output_dir)['end'] == today
+    assert run_json(output_dir)['finished']
+    assert not (tmp_path / 'nightly.next').exists()
+    assert (tmp_path / 'nightly.previous' / 'previous.txt').exists()
+
+    # An explicit end that differs from the recorded run still refuses to mix runs
+    with pytest.raises(SystemExit):
+        run_batch.run_batch(['AAA'], str(output_dir), start_date='2020-01-01', end_date='2021-06-01', workers=1,
+                            price_cache=None, save_models=False, source=fake_source())
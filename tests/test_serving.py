@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.run_batch import save_models
+from scripts.serving import ForecastServer, serve
+
+
+class LinearModel:
+    # Stands in for a fitted ARIMA: a straight line from the last price, counting the paths computed
+    calls = 0
+
+    def __init__(self, last, slope):
+        self.last, self.slope = last, slope
+
+    def predict(self, n_periods):
+        type(self).calls += 1
+        time.sleep(0.01)
+        return self.last + self.slope * np.arange(1, n_periods + 1)
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    index = pd.bdate_range('2024-01-01', periods=30)
+    for ticker, slope in (('AAA', 1.0), ('BBB', -1.0)):
+        history = pd.Series(100.0 + np.arange(30), index=index)
+        save_models({'ARIMA': LinearModel(history.iloc[-1], slope), 'history': history}, str(tmp_path / 'models' / ticker))
+    with open(tmp_path / 'run.json', 'w') as f:
+        json.dump({'lstm_mode': 'recursive'}, f)
+    return tmp_path
+
+
+@pytest.fixture
+def forecast_server(run_dir):
+    return ForecastServer(str(run_dir), horizon=5)
+
+
+@pytest.fixture
+def url(forecast_server):
+    httpd = serve(forecast_server, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(url, path, payload=None, raw=None):
+    data = raw if raw is not None else (None if payload is None else json.dumps(payload).encode())
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url + path, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_get_routes(url):
+    assert request(url, '/health') == (200, {'status': 'ok', 'tickers': 2})
+
+    status, tickers = request(url, '/tickers')
+    assert status == 200
+    assert tickers['AAA'] == {'origin': '2024-02-09', 'models': ['ARIMA', 'ensemble'], 'horizon': 5}
+
+    status, body = request(url, '/forecast?tickers=AAA,BBB&horizon=3&models=ARIMA')
+    assert status == 200
+    assert body['forecasts']['AAA'] == {'dates': ['2024-02-12', '2024-02-13', '2024-02-14'],
+                                        'ARIMA': [130.0, 131.0, 132.0]}
+    assert body['forecasts']['BBB']['ARIMA'] == [128.0, 127.0, 126.0]
+
+
+def test_post_forecast_matches_get(url):
+    status, body = request(url, '/forecast', {'tickers': ['AAA'], 'horizon': 3, 'models': ['ensemble']})
+
+    assert status == 200
+    assert body['forecasts']['AAA']['ensemble'] == [130.0, 131.0, 132.0]
+
+
+@pytest.mark.parametrize('path, payload, raw, status', [
+    ('/forecast?tickers=ZZZ', None, None, 404),
+    ('/forecast?tickers=AAA&horizon=0', None, None, 400),
+    ('/forecast?tickers=AAA&horizon=soon', None, None, 400),
+    ('/forecast?tickers=AAA&models=GARCH', None, None, 400),
+    ('/forecast', None, None, 400),
+    ('/forecast', {'tickers': ['AAA'], 'horizon': -1}, None, 400),
+    ('/forecast', None, b'{not json', 400),
+    ('/nothing', None, None, 404),
+    ('/nothing', {}, None, 404),
+])
+def test_error_codes(url, path, payload, raw, status):
+    code, body = request(url, path, payload, raw)
+
+    assert code == status
+    assert 'error' in body or body['errors']
+
+
+def test_partly_unknown_tickers_are_reported_next_to_the_forecasts(url):
+    status, body = request(url, '/forecast?tickers=AAA,ZZZ&horizon=2')
+
+    assert status == 200
+    assert list(body['forecasts']) == ['AAA']
+    assert body['errors'] == {'ZZZ': 'unknown ticker'}
+
+
+def test_longer_horizons_are_computed_once_per_ticker(forecast_server):
+    LinearModel.calls = 0
+    results = []
+
+    def ask():
+        results.append(forecast_server.forecast(['AAA', 'BBB'], 8, ('ARIMA',)))
+
+    threads = [threading.Thread(target=ask) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # One recomputation per ticker, grown geometrically past the request
+    assert LinearModel.calls == 2
+    assert forecast_server.describe()['AAA']['horizon'] == 10
+    assert all(len(result['forecasts']['AAA']['ARIMA']) == 8 for result in results)
+    forecast_server.forecast(['AAA'], 10)
+    assert LinearModel.calls == 2
@@ -0,0 +1,70 @@
+import numpy as np
+
+from scripts.simulation import HistogramSketch, cholesky_factor, simulate_portfolio_returns
+
+
+def test_cholesky_factor_of_semidefinite_covariance():
+    cov = np.array([[1e-4, 1e-4], [1e-4, 1e-4]])
+
+    factor = cholesky_factor(cov)
+
+    np.testing.assert_allclose(factor @ factor.T, cov, atol=1e-12)
+
+
+def test_cholesky_factor_of_zero_covariance():
+    factor = cholesky_factor(np.zeros((3, 3)))
+
+    assert np.all(np.isfinite(factor))
+    assert np.abs(factor).max() < 1e-10
+
+
+def test_constant_assets_simulate_their_mean():
+    returns = simulate_portfolio_returns(np.array([1e-4, 2e-4]), np.zeros((2, 2)), np.array([0.5, 0.5]),
+                                         num_simulations=10, num_days=5, seed=0)
+
+    np.testing.assert_allclose(returns, 1.5e-4, atol=1e-10)
+
+
+def test_histogram_sketch_quantiles_within_one_bin():
+    values = np.random.default_rng(0).normal(size=(20_000, 2)) * [1.0, 2.0]
+    edges = np.linspace(-10, 10, 2001)
+    sketch = HistogramSketch(edges, n_columns=2).update(values)
+
+    q = [0.01, 0.05, 0.5, 0.95, 0.99]
+    np.testing.assert_allclose(sketch.quantile(q), np.quantile(values, q, axis=0), atol=edges[1] - edges[0])
+    np.testing.assert_allclose(sketch.mean(), values.mean(axis=0))
+
+
+def test_histogram_sketch_merge_equals_single_sketch():
+    values = np.random.default_rng(1).normal(size=5_000)
+    edges = np.linspace(-4, 4, 801)
+    whole = HistogramSketch(edges).update(values)
+    merged = HistogramSketch(edges).update(values[:1_234]).merge(HistogramSketch(edges).update(values[1_234:]))
+
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    np.testing.assert_allclose(merged.quantile([0.05, 0.5]), whole.quantile([0.05, 0.5]))
+
+
+def test_histogram_sketch_tail_mean_within_one_bin():
+    values = np.random.default_rng(2).normal(size=20_000)
+    edges = np.linspace(-6, 6, 1201)
+    sketch = HistogramSketch(edges).update(values)
+
+    threshold = np.quantile(values, 0.05)
+    assert abs(sketch.tail_mean(threshold) - values[values <= threshold].mean()) < edges[1] - edges[0]
+    assert np.isnan(sketch.tail_mean(-100))
+
+
+def test_simulated_returns_match_portfolio_mean_and_volatility():
+    rng = np.random.default_rng(3)
+    mixing = rng.normal(size=(200, 200))
+    cov = 1e-4 * mixing @ mixing.T / 200
+    mean = rng.normal(scale=1e-3, size=200)
+    weights = rng.dirichlet(np.ones(200))
+
+    returns = simulate_portfolio_returns(mean, cov, weights, num_simulations=4_000, num_days=50, seed=0)
+
+    assert returns.shape == (4_000, 50)
+    sigma = np.sqrt(weights @ cov @ weights)
+    assert abs(returns.mean() - mean @ weights) < 5 * sigma / np.sqrt(returns.size)
+    np.testing.assert_allclose(returns.std(), sigma, rtol=0.01)
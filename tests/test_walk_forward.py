@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts import walk_forward
+from scripts.walk_forward import forecast_origins, walk_forward_backtest
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    # A perfect forecaster for a linear series: any misaligned origin or horizon shows up as error
+    calls = []
+
+    def forecast_models(train, test, forecast_days, models=(), **kwargs):
+        calls.append((train, test))
+        return {model: train.iloc[-1] + np.arange(1.0, forecast_days + 1) for model in models}, {}
+
+    monkeypatch.setattr(walk_forward, 'forecast_models', forecast_models)
+    return calls
+
+
+def test_forecast_origins_leave_a_full_horizon():
+    assert forecast_origins(20, 3, 10, 3) == [10, 13, 16]
+    assert forecast_origins(20, 3, 18, 3) == []
+
+
+@pytest.mark.parametrize('window', [None, 5])
+def test_walk_forward_aligns_origins_and_horizons(calls, window):
+    series = pd.Series(np.arange(20.0), index=pd.bdate_range('2024-01-01', periods=20))
+
+    backtest = walk_forward_backtest(series, horizon=3, initial_train=10, step=4, window=window,
+                                     models=('ARIMA', 'LSTM'), max_workers=1)
+
+    assert list(backtest['origin'].unique()) == [series.index[10], series.index[14]]
+    np.testing.assert_allclose(backtest['MAE'], 0)
+    for (train, test), origin in zip(calls, (10, 14)):
+        assert train.index[-1] == series.index[origin - 1] and test.index[0] == series.index[origin]
+        assert len(test) == 3 and len(train) == (origin if window is None else window)
+    assert list(backtest['train_size']) == [len(train) for train, _ in calls for _ in range(2)]
+
+
+def test_walk_forward_rejects_a_series_without_origins(calls):
+    with pytest.raises(ValueError, match='too short'):
+        walk_forward_backtest(pd.Series(np.arange(10.0)), horizon=5, initial_train=8, max_workers=1)
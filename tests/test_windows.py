@@ -0,0 +1,48 @@
+import numpy as np
+
+from scripts.features import make_windows, prepare_lstm_data
+
+
+def loop_windows(data, time_step, horizon=1, target_col=0):
+    # The original loop-based construction
+    data = np.asarray(data).reshape(len(data), -1)
+    X, Y = [], []
+    for i in range(len(data) - time_step - horizon + 1):
+        X.append(data[i:i + time_step])
+        Y.append(data[i + time_step:i + time_step + horizon, target_col])
+    return np.array(X), np.array(Y)
+
+
+def test_make_windows_matches_loop():
+    data = np.arange(50, dtype=float)
+
+    for time_step, horizon in [(1, 1), (5, 1), (10, 7)]:
+        X, Y = make_windows(data, time_step, horizon)
+        X_loop, Y_loop = loop_windows(data, time_step, horizon)
+        np.testing.assert_array_equal(X, X_loop)
+        np.testing.assert_array_equal(Y, Y_loop)
+
+
+def test_make_windows_with_several_features():
+    data = np.random.default_rng(0).normal(size=(40, 3))
+
+    X, Y = make_windows(data, 6, horizon=2, target_col=2)
+
+    X_loop, Y_loop = loop_windows(data, 6, 2, target_col=2)
+    assert X.shape == (33, 6, 3)
+    np.testing.assert_array_equal(X, X_loop)
+    np.testing.assert_array_equal(Y, Y_loop)
+
+
+def test_make_windows_too_short():
+    X, Y = make_windows(np.arange(5.0), 5, horizon=1)
+
+    assert X.shape == (0, 5, 1)
+    assert Y.shape == (0, 1)
+
+
+def test_prepare_lstm_data_shapes():
+    X, Y = prepare_lstm_data(np.arange(20.0).reshape(-1, 1), time_step=3)
+
+    np.testing.assert_array_equal(X[0], [0, 1, 2])
+    np.testing.assert_array_equal(Y[:3], [3, 4, 5])